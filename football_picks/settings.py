@@ -100,6 +100,24 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Rendered fragments and their versions (predictions.fragments, predictions.versions)
+# must be shared by the web server, ingestion scripts, the live score poller and
+# the workers, which run in separate processes. Production uses Redis; without
+# CACHE_URL the database cache (table created by a predictions migration) is
+# shared as well. Never use the local-memory cache here.
+
+CACHE_URL = config('CACHE_URL', default='')
+
+CACHES = {
+    'default': (
+        {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': CACHE_URL}
+        if CACHE_URL else
+        {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'predictions_cache'}
+    )
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -140,3 +158,15 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# API-Football
+# https://www.api-football.com/documentation-v3#section/Rate-Limit
+
+API_FOOTBALL_URL = config('API_FOOTBALL_URL', default="https://v3.football.api-sports.io")
+API_FOOTBALL_REQUESTS_PER_MINUTE = config('API_FOOTBALL_REQUESTS_PER_MINUTE', default=10, cast=int)
+API_FOOTBALL_REQUESTS_PER_DAY = config('API_FOOTBALL_REQUESTS_PER_DAY', default=100, cast=int)
+API_FOOTBALL_MAX_WORKERS = config('API_FOOTBALL_MAX_WORKERS', default=4, cast=int)
+
+API_FOOTBALL_CACHE_DIR = config('API_FOOTBALL_CACHE_DIR', default=str(BASE_DIR / '.api_cache'))
+API_FOOTBALL_CACHE_LIVE_TTL = config('API_FOOTBALL_CACHE_LIVE_TTL', default=300, cast=int)
+API_FOOTBALL_OFFLINE = config('API_FOOTBALL_OFFLINE', default=False, cast=bool)
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import League, Season, Team, UserGroup, Fixture, Prediction
+from .models import League, Season, Team, UserGroup, Fixture, Prediction, SyncState, Job, GroupStanding, RoundStanding
+from .scoring import RESULT_FIELDS, score_fixtures
 
 class LeagueAdmin(admin.ModelAdmin):
     list_display = ['id', 'name', 'country', 'level', 'api_id']
@@ -25,14 +26,39 @@ class FixtureAdmin(admin.ModelAdmin):
     search_fields = ['home_team__name', 'away_team__name']
     list_filter = ['season', 'date', 'status']
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and set(form.changed_data) & set(RESULT_FIELDS):
+            score_fixtures([obj.pk])
+
 class PredictionAdmin(admin.ModelAdmin):
     list_display = ['id', 'user', 'fixture', 'predicted_home_score', 'predicted_away_score','points_awarded' ,'created_at']
     search_fields = ['user__username', 'fixture__home_team__name', 'fixture__away_team__name']
     list_filter = ['created_at']
 
+class SyncStateAdmin(admin.ModelAdmin):
+    list_display = ['id', 'season', 'last_synced_at', 'window_start', 'window_end']
+    list_filter = ['season__league']
+
+class GroupStandingAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user_group', 'user', 'points', 'exact_hits', 'outcome_hits', 'predictions_count']
+    list_filter = ['user_group']
+
+class RoundStandingAdmin(admin.ModelAdmin):
+    list_display = ['id', 'user_group', 'round', 'rank', 'user', 'points', 'round_points']
+    list_filter = ['user_group', 'round']
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'status', 'attempts', 'locked_by', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['kind', 'status']
+
 admin.site.register(League, LeagueAdmin)
 admin.site.register(Season, SeasonAdmin)
 admin.site.register(Team, TeamAdmin)
 admin.site.register(UserGroup, UserGroupAdmin)
 admin.site.register(Fixture, FixtureAdmin)
-admin.site.register(Prediction, PredictionAdmin)
\ No newline at end of file
+admin.site.register(Prediction, PredictionAdmin)
+admin.site.register(SyncState, SyncStateAdmin)
+admin.site.register(Job, JobAdmin)
+admin.site.register(GroupStanding, GroupStandingAdmin)
+admin.site.register(RoundStanding, RoundStandingAdmin)
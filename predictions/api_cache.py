@@ -0,0 +1,185 @@
+"""
+On-disk cache of API-Football responses.
+
+Responses are stored content-addressed: the file name is a hash of the endpoint
+and its sorted query parameters, so the same request always maps to the same
+file no matter which script sent it. How long a response stays fresh depends on
+the endpoint and on whether the requested season is already finished
+(see `ttl_for`).
+
+In offline mode (API_FOOTBALL_OFFLINE=True) cached responses are served
+regardless of their age and a missing response raises OfflineCacheMiss, which
+allows ingestion to be re-run and benchmarked without a network.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import date
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+
+SEASONS_TTL = 24 * 60 * 60
+TEAMS_TTL = 24 * 60 * 60
+RECENT_FIXTURES_TTL = 24 * 60 * 60
+
+
+class OfflineCacheMiss(Exception):
+    """Raised in offline mode when a response is not in the cache."""
+
+
+def is_finished_season(season_year, today=None):
+    """
+    Checks whether a season can't change anymore.
+
+    Args:
+        season_year (int): The starting year of the season (e.g., 2023 for 2023-2024).
+        today (date): The current date (defaults to date.today()).
+
+    Returns:
+        bool: True if the season ended before today.
+    """
+    today = today or date.today()
+    return (today.year, today.month) > (int(season_year) + 1, 7)
+
+
+def ttl_for(endpoint, params, today=None):
+    """
+    Returns how many seconds a response stays fresh.
+
+    Args:
+        endpoint (str): The API endpoint (e.g., "/fixtures").
+        params (dict): The query parameters of the request.
+        today (date): The current date (defaults to date.today()).
+
+    Returns:
+        int: The number of seconds, or None if the response never expires.
+    """
+    today = today or date.today()
+    params = params or {}
+
+    if endpoint == '/leagues/seasons':
+        return SEASONS_TTL
+
+    season_year = params.get('season')
+    if season_year is not None and is_finished_season(season_year, today):
+        return None
+
+    if endpoint == '/teams':
+        return TEAMS_TTL
+
+    end_date = params.get('to')
+    if endpoint == '/fixtures' and end_date and (today - date.fromisoformat(end_date)).days > 2:
+        return RECENT_FIXTURES_TTL
+
+    return settings.API_FOOTBALL_CACHE_LIVE_TTL
+
+
+def cache_key(endpoint, params):
+    """Returns the content address of a request."""
+    raw = json.dumps([endpoint, sorted((params or {}).items())], default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    Stores raw response bodies in a subdirectory of `directory` named after the API host,
+    one file per request, so responses of a stand-in server never mix with real ones.
+
+    Args:
+        directory (str): The cache directory (defaults to API_FOOTBALL_CACHE_DIR).
+        offline (bool): Serve only from the cache (defaults to API_FOOTBALL_OFFLINE).
+        base_url (str): The API root URL the responses come from (defaults to API_FOOTBALL_URL).
+    """
+
+    def __init__(self, directory=None, offline=None, base_url=None):
+        host = urlsplit(base_url or settings.API_FOOTBALL_URL).netloc.replace(':', '_')
+        self.directory = os.path.join(str(directory or settings.API_FOOTBALL_CACHE_DIR), host)
+        self.offline = settings.API_FOOTBALL_OFFLINE if offline is None else offline
+
+    def path(self, endpoint, params):
+        key = cache_key(endpoint, params)
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def open(self, endpoint, params):
+        """
+        Opens the cached body of a request for reading.
+
+        Returns:
+            file: A binary file object, or None if the response is missing or expired.
+
+        Raises:
+            OfflineCacheMiss: In offline mode when the response is not cached.
+        """
+        path = self.path(endpoint, params)
+        try:
+            modified_at = os.path.getmtime(path)
+        except OSError:
+            if self.offline:
+                raise OfflineCacheMiss(f"{endpoint} {params} is not cached")
+            return None
+
+        ttl = ttl_for(endpoint, params)
+        if not self.offline and ttl is not None and time.time() - modified_at > ttl:
+            return None
+
+        return open(path, 'rb')
+
+    def get(self, endpoint, params):
+        """
+        Returns the cached body of a request.
+
+        Returns:
+            bytes: The response body, or None if it is missing or expired.
+
+        Raises:
+            OfflineCacheMiss: In offline mode when the response is not cached.
+        """
+        f = self.open(endpoint, params)
+        if f is None:
+            return None
+        with f:
+            return f.read()
+
+    def set(self, endpoint, params, body):
+        """Stores a response body atomically, so concurrent readers never see partial files."""
+        writer = self.writer(endpoint, params)
+        writer.write(body)
+        writer.commit()
+
+    def writer(self, endpoint, params):
+        """Returns a CacheWriter that stores a body written in chunks."""
+        return CacheWriter(self.path(endpoint, params))
+
+
+class CacheWriter:
+    """
+    Writes a response body to a temporary file that replaces the cache entry on commit().
+
+    Args:
+        path (str): The final path of the cache entry.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        self.file = os.fdopen(fd, 'wb')
+
+    def write(self, chunk):
+        self.file.write(chunk)
+
+    def commit(self):
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def discard(self):
+        self.file.close()
+        os.remove(self.tmp_path)
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,282 @@
+"""
+Shared client for all API-Football requests.
+
+One ApiFootballClient instance (`client`) is used by every fetch function in
+predictions.utils and predictions/scripts. It keeps a pooled keep-alive session,
+so batch runs reuse TLS connections, and it rides out transient failures:
+429 and 5xx responses and connection errors are retried with jittered exponential
+backoff, honouring the Retry-After header. When retries are exhausted
+ApiFootballError is raised instead of silently returning empty data.
+
+Requests are served from the on-disk response cache when possible (see
+predictions.api_cache). Only cache misses take a token from the shared rate
+limiter and go over the network.
+
+Requires:
+    requests: For HTTP requests to API-Football.
+    python-decouple: For loading API key from .env.
+
+Example:
+    >>> from predictions.api_football import client, RequestTimer
+    >>> timer = RequestTimer()
+    >>> client.add_hook(timer)
+    >>> client.get_json('/teams', {'league': 106, 'season': 2023})['response']
+    >>> timer.count, timer.total_seconds
+"""
+
+import json
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from decouple import config
+from django.conf import settings
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from predictions.api_cache import response_cache
+from predictions.fetch_executor import api_rate_limiter
+from predictions.json_stream import iter_array_items
+
+
+API_KEY = config('API_FOOTBALL_KEY')
+API_URL = settings.API_FOOTBALL_URL
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class ApiFootballError(Exception):
+    """Raised when a request to API-Football fails permanently or retries are exhausted."""
+
+
+class RequestTimer:
+    """
+    Request hook collecting the number and total duration of sent requests.
+
+    Attributes:
+        count (int): The number of sent requests (retries included).
+        failures (int): The number of requests that didn't return status 200.
+        total_seconds (float): The total time spent waiting for responses.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.failures = 0
+        self.total_seconds = 0.0
+        self.lock = threading.Lock()
+
+    def __call__(self, endpoint, params, status_code, elapsed, attempt):
+        with self.lock:
+            self.count += 1
+            self.total_seconds += elapsed
+            if status_code != 200:
+                self.failures += 1
+
+
+class ApiFootballClient:
+    """
+    Pooled, retrying HTTP client for API-Football.
+
+    Args:
+        base_url (str): The API root URL.
+        api_key (str): The API-Football key.
+        cache (ResponseCache): The response cache (None disables caching).
+        rate_limiter (RateLimiter): The limiter every network request takes a token from.
+        max_retries (int): How many times a failed request is retried.
+        backoff (float): The base delay in seconds of the exponential backoff.
+        max_backoff (float): The longest delay between two attempts.
+        timeout (tuple): Connect and read timeouts in seconds.
+        pool_size (int): The number of kept-alive connections (at least the number of fetch threads).
+    """
+
+    def __init__(self, base_url=API_URL, api_key=API_KEY, cache=response_cache, rate_limiter=api_rate_limiter,
+                 max_retries=4, backoff=1.0, max_backoff=60.0, timeout=(5, 30), pool_size=None):
+        self.base_url = base_url.rstrip('/')
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.hooks = []
+
+        pool_size = pool_size or settings.API_FOOTBALL_MAX_WORKERS
+        self.session = requests.Session()
+        self.session.headers['x-apisports-key'] = api_key
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def add_hook(self, hook):
+        """
+        Registers a callable run after every attempt.
+
+        The hook is called with (endpoint, params, status_code, elapsed_seconds, attempt);
+        status_code is None when the connection failed.
+        """
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def retry_delay(self, attempt, response=None):
+        """
+        Returns the number of seconds to wait before the next attempt.
+
+        The Retry-After header (seconds or HTTP date) wins, otherwise the delay is
+        drawn uniformly from [0, backoff * 2 ** attempt] ("full jitter").
+        """
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                try:
+                    wait = (parsedate_to_datetime(retry_after) - timezone.now()).total_seconds()
+                    return min(max(wait, 0.0), self.max_backoff)
+                except (TypeError, ValueError):
+                    pass
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def request(self, endpoint, params=None, stream=False):
+        """
+        Sends a GET request, retrying transient failures.
+
+        Args:
+            endpoint (str): The API endpoint (e.g., "/fixtures").
+            params (dict): The query parameters.
+            stream (bool): Don't read the body up front (see stream_json).
+
+        Returns:
+            requests.Response: A response with status 200.
+
+        Raises:
+            ApiFootballError: For non-retryable statuses or when retries are exhausted.
+        """
+        url = f"{self.base_url}{endpoint}"
+
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            response = None
+            error = None
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout, stream=stream)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                error = exc
+            elapsed = time.perf_counter() - started
+
+            status_code = response.status_code if response is not None else None
+            for hook in self.hooks:
+                hook(endpoint, params, status_code, elapsed, attempt)
+
+            if status_code == 200:
+                return response
+            if status_code is not None and status_code not in RETRY_STATUSES:
+                response.close()
+                raise ApiFootballError(f"GET {endpoint} {params} returned {status_code}")
+            if attempt == self.max_retries:
+                if response is not None:
+                    response.close()
+                raise ApiFootballError(
+                    f"GET {endpoint} {params} failed after {attempt + 1} attempts ({status_code or error})"
+                ) from error
+
+            delay = self.retry_delay(attempt, response)
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+
+    def get_json(self, endpoint, params=None):
+        """
+        Returns the decoded body of a request, using the response cache.
+
+        API-Football reports some errors (e.g. rate limits) with status 200 and an
+        'errors' member; rate limit errors are retried, other errors raise.
+
+        Raises:
+            ApiFootballError: When the request fails permanently.
+            OfflineCacheMiss: In offline mode when the response is not cached.
+        """
+        if self.cache is not None:
+            body = self.cache.get(endpoint, params)
+            if body is not None:
+                return json.loads(body)
+
+        for attempt in range(self.max_retries + 1):
+            response = self.request(endpoint, params)
+            data = response.json()
+            errors = data.get('errors')
+            if not errors:
+                break
+            if 'rateLimit' not in errors or attempt == self.max_retries:
+                raise ApiFootballError(f"GET {endpoint} {params} returned errors: {errors}")
+            time.sleep(self.retry_delay(attempt, response))
+
+        if self.cache is not None:
+            self.cache.set(endpoint, params, response.content)
+        return data
+
+    def stream_json(self, endpoint, params=None, key='response', chunk_size=64 * 1024):
+        """
+        Streams the items of the `key` array of a response.
+
+        The body is parsed chunk by chunk from the cache file or from the socket,
+        so memory use doesn't depend on the size of the response. Bodies read from
+        the network are written to the response cache while they are parsed.
+
+        Yields:
+            dict: Items of the array.
+
+        Raises:
+            ApiFootballError: When the request fails or the body reports errors.
+            OfflineCacheMiss: In offline mode when the response is not cached.
+        """
+        cached = self.cache.open(endpoint, params) if self.cache is not None else None
+        if cached is not None:
+            with cached:
+                yield from iter_array_items(iter(lambda: cached.read(chunk_size), b''), key)
+            return
+
+        with self.request(endpoint, params, stream=True) as response:
+            chunks = response.iter_content(chunk_size)
+            writer = self.cache.writer(endpoint, params) if self.cache is not None else None
+            if writer is not None:
+                chunks = _tee(chunks, writer)
+
+            other = {}
+            try:
+                yield from iter_array_items(chunks, key, other)
+            except BaseException:
+                if writer is not None:
+                    writer.discard()
+                raise
+
+            if other.get('errors'):
+                if writer is not None:
+                    writer.discard()
+                raise ApiFootballError(f"GET {endpoint} {params} returned errors: {other['errors']}")
+            if writer is not None:
+                writer.commit()
+
+
+def _tee(chunks, writer):
+    """Passes chunks through while writing them to a cache writer."""
+    for chunk in chunks:
+        writer.write(chunk)
+        yield chunk
+
+
+client = ApiFootballClient()
+
+
+def get_json(endpoint, params=None):
+    """Shortcut for client.get_json()."""
+    return client.get_json(endpoint, params)
+
+
+def stream_json(endpoint, params=None, key='response', chunk_size=64 * 1024):
+    """Shortcut for client.stream_json()."""
+    return client.stream_json(endpoint, params, key, chunk_size)
@@ -0,0 +1,359 @@
+"""
+Local stand-in for API-Football used for load tests and ingestion benchmarks.
+
+`Standin` answers /leagues/seasons, /teams and /fixtures requests from
+recorded payloads (a response cache directory, see predictions.api_cache) or
+from deterministic synthetic data of any size (`StandinData`). It can inject
+latency, rate limits (429 with Retry-After) and server errors.
+
+It is available in two forms:
+    - `StandinAdapter`, an in-process requests transport that can be mounted on
+      ApiFootballClient.session (see `standin_transport`), and
+    - an HTTP server started by `python manage.py api_standin`, usable by
+      setting API_FOOTBALL_URL=http://127.0.0.1:8001.
+
+Example:
+    >>> from predictions.api_football import client
+    >>> from predictions.utils import fetch_and_save_fixtures_for_seasons
+    >>> standin = Standin(StandinData(leagues=20), faults=Faults(latency=0.05, error_rate=0.01))
+    >>> with standin_transport(client, standin):
+    ...     fetch_and_save_fixtures_for_seasons(seasons, "2023-01-01", "2024-12-31", "2023-12-31")
+"""
+
+import io
+import json
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from predictions.api_cache import OfflineCacheMiss, ResponseCache
+from predictions.fetch_executor import RateLimiter
+
+
+FIRST_LEAGUE_API_ID = 10_000
+RECORDED_URL = "https://v3.football.api-sports.io"  # host whose cached responses are replayed
+
+
+def round_robin(teams):
+    """
+    Returns the pairings of a double round-robin tournament (circle method).
+
+    Args:
+        teams (list): An even number of team ids.
+
+    Returns:
+        list: Rounds, each a list of (home, away) pairs.
+    """
+    rotation = list(teams)
+    rounds = []
+    for _ in range(len(rotation) - 1):
+        half = len(rotation) // 2
+        rounds.append(list(zip(rotation[:half], reversed(rotation[half:]))))
+        rotation.insert(1, rotation.pop())
+    return rounds + [[(away, home) for home, away in pairs] for pairs in rounds]
+
+
+class StandinData:
+    """
+    Deterministic synthetic API-Football data.
+
+    Every league has `teams_per_league` teams playing a double round robin, one
+    round per week from August 1st of the season year. Fixtures before `now` are
+    finished, fixtures within two hours after kickoff are in play.
+
+    Args:
+        leagues (int): The number of leagues.
+        teams_per_league (int): An even number of teams per league (at most 32).
+        season_years (iterable): The available season years.
+        now (datetime): The simulated current time (defaults to the real one).
+    """
+
+    def __init__(self, leagues=1, teams_per_league=18, season_years=(2021, 2022, 2023), now=None):
+        self.league_api_ids = [FIRST_LEAGUE_API_ID + i for i in range(leagues)]
+        self.teams_per_league = teams_per_league
+        self.season_years = list(season_years)
+        self.now = now
+
+    def current_time(self):
+        return self.now or datetime.now(dt_timezone.utc)
+
+    def team_ids(self, league_id):
+        return [league_id * 100 + i for i in range(self.teams_per_league)]
+
+    def teams(self, league_id):
+        return [
+            {'team': {'id': team_id, 'name': f"Team {team_id}"}, 'venue': {}}
+            for team_id in self.team_ids(league_id)
+        ]
+
+    def fixture_id(self, league_id, season_year, index):
+        return league_id * 100_000 + season_year % 100 * 1000 + index
+
+    def fixtures(self, league_id, season_year):
+        """Returns all /fixtures items of a league season."""
+        now = self.current_time()
+        first_kickoff = datetime(season_year, 8, 1, 18, tzinfo=dt_timezone.utc)
+        items = []
+        index = 0
+        for round_index, pairs in enumerate(round_robin(self.team_ids(league_id))):
+            kickoff = first_kickoff + timedelta(weeks=round_index)
+            for home, away in pairs:
+                fixture_id = self.fixture_id(league_id, season_year, index)
+                if kickoff + timedelta(hours=2) <= now:
+                    status, goals = 'FT', {'home': fixture_id % 4, 'away': fixture_id // 7 % 3}
+                elif kickoff <= now:
+                    status, goals = '1H', {'home': 0, 'away': 0}
+                else:
+                    status, goals = 'NS', {'home': None, 'away': None}
+                items.append({
+                    'fixture': {'id': fixture_id, 'date': kickoff.isoformat(), 'status': {'short': status}},
+                    'league': {'id': league_id, 'season': season_year, 'round': f"Regular Season - {round_index + 1}"},
+                    'teams': {'home': {'id': home}, 'away': {'id': away}},
+                    'goals': goals,
+                })
+                index += 1
+        return items
+
+    def fixtures_by_ids(self, ids):
+        items = []
+        for fixture_id in ids:
+            league_id = fixture_id // 100_000
+            season_year = 2000 + fixture_id // 1000 % 100
+            if league_id not in self.league_api_ids or season_year not in self.season_years:
+                continue
+            season_items = self.fixtures(league_id, season_year)
+            index = fixture_id % 1000
+            if index < len(season_items):
+                items.append(season_items[index])
+        return items
+
+    def response(self, endpoint, params):
+        """
+        Returns the 'response' member for a request.
+
+        Returns:
+            list: The response items, or None if the endpoint is unknown.
+        """
+        if endpoint == '/leagues/seasons':
+            return self.season_years
+
+        league_id = int(params.get('league', 0))
+        season_year = int(params.get('season', 0))
+        known = league_id in self.league_api_ids and season_year in self.season_years
+
+        if endpoint == '/teams':
+            return self.teams(league_id) if known else []
+
+        if endpoint == '/fixtures':
+            if params.get('ids'):
+                return self.fixtures_by_ids(int(fixture_id) for fixture_id in str(params['ids']).split('-'))
+            if not known:
+                return []
+            items = self.fixtures(league_id, season_year)
+            start, end = params.get('from'), params.get('to')
+            return [
+                item for item in items
+                if (not start or item['fixture']['date'][:10] >= start)
+                and (not end or item['fixture']['date'][:10] <= end)
+            ]
+
+        return None
+
+
+class Faults:
+    """
+    Failures injected by the stand-in.
+
+    Args:
+        latency (float): Seconds added to every response.
+        jitter (float): Maximum random seconds added on top of latency.
+        error_rate (float): Probability of a 500 response.
+        requests_per_minute (int): Requests above this rate get 429 with Retry-After.
+        seed (int): Seed of the random generator, for reproducible runs.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, requests_per_minute=None, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests_per_minute = requests_per_minute
+        self.random = random.Random(seed)
+
+
+class Standin:
+    """
+    Answers API-Football requests from recorded payloads or synthetic data.
+
+    Args:
+        data (StandinData): Synthetic data (defaults to a single league).
+        recorded (ResponseCache): Recorded responses served before synthetic data
+            (see `recorded_responses`).
+        faults (Faults): Injected failures (defaults to none).
+    """
+
+    def __init__(self, data=None, recorded=None, faults=None):
+        self.data = data or StandinData()
+        self.recorded = recorded
+        self.faults = faults or Faults()
+        self.request_times = deque()
+        self.lock = threading.Lock()
+
+    def rate_limited(self, now):
+        """Returns seconds until the next allowed request, or 0 if this request is allowed."""
+        limit = self.faults.requests_per_minute
+        if not limit:
+            return 0
+        with self.lock:
+            while self.request_times and now - self.request_times[0] >= 60:
+                self.request_times.popleft()
+            if len(self.request_times) >= limit:
+                return 60 - (now - self.request_times[0])
+            self.request_times.append(now)
+            return 0
+
+    def handle(self, endpoint, params):
+        """
+        Builds the response to a GET request.
+
+        Args:
+            endpoint (str): The API endpoint (e.g., "/fixtures").
+            params (dict): The query parameters.
+
+        Returns:
+            tuple: (status code, headers dict, body bytes).
+        """
+        faults = self.faults
+        delay = faults.latency + (faults.random.uniform(0, faults.jitter) if faults.jitter else 0)
+        if delay:
+            time.sleep(delay)
+
+        retry_after = self.rate_limited(time.monotonic())
+        if retry_after:
+            body = {'message': "Too many requests"}
+            return 429, {'Retry-After': str(int(retry_after) + 1)}, json.dumps(body).encode()
+
+        if faults.error_rate and faults.random.random() < faults.error_rate:
+            return 500, {}, json.dumps({'message': "Internal error"}).encode()
+
+        if self.recorded is not None:
+            try:
+                body = self.recorded.get(endpoint, params)
+            except OfflineCacheMiss:
+                body = None
+            if body is not None:
+                return 200, {'Content-Type': 'application/json'}, body
+
+        items = self.data.response(endpoint, params)
+        if items is None:
+            return 404, {}, json.dumps({'message': f"Endpoint '{endpoint}' does not exist"}).encode()
+
+        body = {
+            'get': endpoint.lstrip('/'),
+            'parameters': params,
+            'errors': [],
+            'results': len(items),
+            'paging': {'current': 1, 'total': 1},
+            'response': items,
+        }
+        return 200, {'Content-Type': 'application/json'}, json.dumps(body).encode()
+
+
+def recorded_responses(directory=None, base_url=RECORDED_URL):
+    """Returns an offline ResponseCache replaying responses recorded from `base_url`."""
+    return ResponseCache(directory=directory, offline=True, base_url=base_url)
+
+
+class StandinAdapter(BaseAdapter):
+    """
+    In-process requests transport answering from a Standin.
+
+    Args:
+        standin (Standin): The stand-in answering requests.
+        base_url (str): The API root URL stripped from request URLs.
+    """
+
+    def __init__(self, standin, base_url=''):
+        super().__init__()
+        self.standin = standin
+        self.base_path = urlsplit(base_url).path.rstrip('/')
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        url = urlsplit(request.url)
+        endpoint = url.path[len(self.base_path):]
+        status_code, headers, body = self.standin.handle(endpoint, dict(parse_qsl(url.query)))
+
+        response = requests.Response()
+        response.status_code = status_code
+        response.headers = CaseInsensitiveDict(headers)
+        response.raw = io.BytesIO(body)
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+@contextmanager
+def standin_transport(client, standin):
+    """
+    Temporarily answers all requests of an ApiFootballClient from a stand-in.
+
+    The response cache and the API quota limiter of the client are disabled
+    for the duration, so every call reaches the stand-in at full speed.
+
+    Args:
+        client (ApiFootballClient): The client to redirect (usually api_football.client).
+        standin (Standin): The stand-in answering requests.
+    """
+    adapters = dict(client.session.adapters)
+    cache, rate_limiter = client.cache, client.rate_limiter
+    client.session.mount(client.base_url, StandinAdapter(standin, client.base_url))
+    client.cache = None
+    client.rate_limiter = RateLimiter(per_minute=10**9, per_day=10**12)
+    try:
+        yield standin
+    finally:
+        client.session.adapters.clear()
+        client.session.adapters.update(adapters)
+        client.cache, client.rate_limiter = cache, rate_limiter
+
+
+def make_server(standin, host='127.0.0.1', port=8001):
+    """
+    Returns an HTTP server answering from a stand-in (call serve_forever() to run it).
+
+    Args:
+        standin (Standin): The stand-in answering requests.
+        host (str): The interface to listen on.
+        port (int): The port to listen on.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive, like the real API
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            status_code, headers, body = standin.handle(url.path, dict(parse_qsl(url.query)))
+            self.send_response(status_code)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ThreadingHTTPServer((host, port), Handler)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class PredictionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'predictions'
+
+    def ready(self):
+        from . import standings  # noqa: F401 - registers the membership signal receiver
+        from . import versions  # noqa: F401 - registers the version bumping receivers
@@ -0,0 +1,111 @@
+"""
+Batch submission of a matchday's predictions.
+
+save_matchday_predictions() validates and writes the predictions of a user for
+any number of fixtures of a group with a fixed number of queries:
+
+    1. the group, if the user is a member,
+    2. the submitted fixtures (season, round and status),
+    3. the fixtures the user already predicted in the group,
+    4. one INSERT ... ON CONFLICT (user, user_group, fixture) DO UPDATE
+       of all accepted predictions, in one transaction.
+
+Fixtures that can't be predicted are reported per fixture instead of failing
+the whole batch. It backs the api/predictions/batch/ endpoint and the "save all"
+action of the fixtures partial.
+
+Example:
+    >>> save_matchday_predictions(user, 3, [
+    ...     {'fixture': 41, 'predicted_home_score': 2, 'predicted_away_score': 1},
+    ...     {'fixture': 42, 'predicted_home_score': 0, 'predicted_away_score': 0},
+    ... ], round_number=7)
+    [{'fixture': 41, 'result': 'created'}, {'fixture': 42, 'result': 'updated'}]
+"""
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from predictions.models import Fixture, Prediction, UserGroup
+from predictions.versions import bump_predictions
+
+
+MAX_BATCH_SIZE = 500
+
+
+def fixture_error(fixture, user_group, round_number):
+    """Returns why the fixture can't be predicted in the group, or None."""
+    if fixture is None:
+        return "Fixture does not exist."
+    if fixture['season_id'] != user_group.season_id:
+        return "Fixture is not in the season of this group."
+    if round_number is not None and fixture['round'] != round_number:
+        return f"Fixture is not in round {round_number}."
+    if fixture['status'] != 'NS':
+        return "You can only predict matches with status 'NS' (Not Started)."
+    return None
+
+
+def save_matchday_predictions(user, user_group_id, predictions, round_number=None):
+    """
+    Creates or updates the user's predictions for many fixtures of a group.
+
+    Args:
+        user (User): The predicting user.
+        user_group_id (int): The group the predictions are made in.
+        predictions (iterable): Dicts with 'fixture' (id), 'predicted_home_score'
+            and 'predicted_away_score'; for a fixture submitted twice the last one wins.
+        round_number (int): If given, all fixtures must belong to this round.
+
+    Returns:
+        list: One dict per submitted fixture, in submission order, with 'fixture',
+            'result' ('created', 'updated' or 'rejected') and 'error' for rejected ones.
+
+    Raises:
+        ValidationError: If the user isn't a member of the group or the group has no season.
+    """
+    user_group = UserGroup.objects.filter(pk=user_group_id, members=user).first()
+    if user_group is None:
+        raise ValidationError("You are not a member of this group.")
+    if user_group.season_id is None:
+        raise ValidationError("Invalid group or no season associated")
+
+    submitted = {item['fixture']: item for item in predictions}
+    fixtures = {
+        fixture['id']: fixture
+        for fixture in Fixture.objects.filter(id__in=submitted.keys()).values('id', 'season_id', 'round', 'status')
+    }
+
+    results = {}
+    accepted = []
+    for fixture_id, item in submitted.items():
+        error = fixture_error(fixtures.get(fixture_id), user_group, round_number)
+        if error:
+            results[fixture_id] = {'fixture': fixture_id, 'result': 'rejected', 'error': error}
+        else:
+            accepted.append(Prediction(
+                user=user,
+                user_group=user_group,
+                fixture_id=fixture_id,
+                predicted_home_score=item['predicted_home_score'],
+                predicted_away_score=item['predicted_away_score'],
+            ))
+
+    if accepted:
+        with transaction.atomic():
+            existing = set(
+                Prediction.objects
+                .filter(user=user, user_group=user_group, fixture__in=[prediction.fixture_id for prediction in accepted])
+                .values_list('fixture_id', flat=True)
+            )
+            Prediction.objects.bulk_create(
+                accepted,
+                update_conflicts=True,
+                unique_fields=['user', 'user_group', 'fixture'],
+                update_fields=['predicted_home_score', 'predicted_away_score'],
+            )
+            bump_predictions([(user.pk, user_group.pk)])  # bulk_create doesn't send post_save
+        for prediction in accepted:
+            result = 'updated' if prediction.fixture_id in existing else 'created'
+            results[prediction.fixture_id] = {'fixture': prediction.fixture_id, 'result': result}
+
+    return [results[fixture_id] for fixture_id in submitted]
@@ -0,0 +1,58 @@
+"""
+Conditional GET (ETag / If-None-Match) for polled list endpoints.
+
+A view lists the versions its response depends on (see predictions.versions)
+and the ETag is a hash of their tokens, the user and the full URL (which holds
+the filters, the cursor and the host of the absolute links). Checking a poll
+therefore costs one cache read and, for views of a group, the memoized
+resolve_group() query; the querysets and serializers of the view only run when
+the ETag doesn't match. Authentication and permissions are checked first, as
+for any other request.
+
+The versions are bumped by the workers, the live poller and ingestion, which
+run in other processes, so ETags are only sent with a shared cache backend;
+with a process-local one the web server would answer 304 to stale clients.
+
+Example:
+    GET /api/fixtures/?access_code=abc&round=7
+    200, ETag: "5d41402abc4b2a76b9719d911017c592"
+    GET /api/fixtures/?access_code=abc&round=7  (If-None-Match: "5d41402abc4b2a76b9719d911017c592")
+    304
+"""
+
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+from predictions.versions import current_versions, process_local_cache
+
+
+class ConditionalGetMixin:
+    """
+    Answers GET requests with a matching If-None-Match with 304 Not Modified.
+
+    Views override get_version_keys().
+    """
+
+    def get_version_keys(self, request):
+        """Returns the version keys of the response, or None to always answer in full."""
+        return None
+
+    def get_etag(self, request):
+        keys = self.get_version_keys(request)
+        if keys is None or process_local_cache():
+            return None
+        versions = current_versions(keys)
+        parts = [request.build_absolute_uri(), str(request.user.pk)]
+        parts += [f"{key}={versions[key]}" for key in keys]
+        return '"%s"' % hashlib.md5('|'.join(parts).encode(), usedforsecurity=False).hexdigest()
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        response = get_conditional_response(request, etag=etag) if etag else None
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if etag and response.status_code in (200, 304):
+            response['ETag'] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,131 @@
+"""
+Concurrent fetching of API-Football resources with a shared rate limiter.
+
+API calls for many (league, season) pairs are independent, so they run in a
+bounded thread pool, while the results are handed back to the calling thread.
+That way fetches overlap but all database writes stay on a single writer.
+
+Every HTTP call to API-Football takes a token from `api_rate_limiter` first,
+which keeps all threads of a process within the per-minute and per-day quota.
+
+Example:
+    >>> from predictions.fetch_executor import FetchExecutor
+    >>> for (league_id, season_year), teams in FetchExecutor().map(fetch_teams, [(106, 2023), (39, 2023)]):
+    ...     save(teams)
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a token can't be obtained within the allowed waiting time."""
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `capacity` tokens per `period` seconds.
+
+    Attributes:
+        capacity (int): The maximum number of tokens (burst size).
+        period (float): The number of seconds in which the bucket refills completely.
+    """
+
+    def __init__(self, capacity, period):
+        self.capacity = capacity
+        self.period = period
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now):
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.capacity / self.period)
+        self.updated_at = now
+
+    def wait_time(self, now):
+        """Returns the number of seconds until a token is available (0 if available now)."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.period / self.capacity
+
+    def take(self):
+        self.tokens -= 1
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter combining a per-minute and a per-day token bucket.
+
+    Args:
+        per_minute (int): Allowed requests per minute.
+        per_day (int): Allowed requests per day.
+        max_wait (float): The longest time acquire() may block before raising RateLimitExceeded.
+    """
+
+    def __init__(self, per_minute, per_day, max_wait=120):
+        self.buckets = [TokenBucket(per_minute, 60), TokenBucket(per_day, 24 * 60 * 60)]
+        self.max_wait = max_wait
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Blocks until a request may be sent and consumes a token from every bucket."""
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                wait = max(bucket.wait_time(now) for bucket in self.buckets)
+                if wait == 0:
+                    for bucket in self.buckets:
+                        bucket.take()
+                    return
+            if now + wait > deadline:
+                raise RateLimitExceeded(f"API-Football quota exhausted, next request possible in {wait:.0f}s")
+            time.sleep(wait)
+
+
+class FetchExecutor:
+    """
+    Runs fetch functions concurrently in a bounded thread pool.
+
+    Args:
+        max_workers (int): The maximum number of concurrent fetches (defaults to API_FOOTBALL_MAX_WORKERS).
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or settings.API_FOOTBALL_MAX_WORKERS
+
+    def map(self, func, args_list, return_exceptions=False):
+        """
+        Calls func(*args) for every args tuple and yields results as they complete.
+
+        The generator runs in the caller's thread, so the caller can safely write
+        every result to the database before the next one is consumed.
+
+        Args:
+            func (callable): A fetch function that doesn't touch the database.
+            args_list (iterable): Tuples of positional arguments for func.
+            return_exceptions (bool): Yield exceptions raised by func as results instead of raising them.
+
+        Yields:
+            tuple: (args, result) pairs in completion order.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(func, *args): args for args in args_list}
+            for future in as_completed(futures):
+                exception = future.exception()
+                if exception is not None:
+                    if not return_exceptions:
+                        raise exception
+                    yield futures[future], exception
+                else:
+                    yield futures[future], future.result()
+
+
+api_rate_limiter = RateLimiter(
+    per_minute=settings.API_FOOTBALL_REQUESTS_PER_MINUTE,
+    per_day=settings.API_FOOTBALL_REQUESTS_PER_DAY,
+)
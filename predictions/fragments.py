@@ -0,0 +1,104 @@
+"""
+Fragment cache of rendered fixture cards.
+
+fixtures_partial renders one partials/fixture_card.html per fixture. A card
+depends only on the fixture (and the team names), the group and the scores
+the user predicted, so it is cached under
+
+    card:<CARD_VERSION>:<fixture>:<fixture version>:<reference version>:<group>:<prediction>
+
+where the versions come from predictions.versions and <prediction> is the
+predicted score ('-' when there is none). A saved prediction changes the key
+by itself, fixture and team writes bump the versions, so cached cards are never
+stale. Cards don't contain anything user specific besides the prediction (the
+CSRF token is sent by HTMX from the hx-headers of base.html), which lets all
+members with the same prediction share a card.
+
+A page costs two cache round trips (versions and cards) plus one set_many for
+the cards rendered on a miss. With a process-local cache, which never sees the
+bumps of the live poller, ingestion and the workers, cards are always rendered. Hits and misses are counted for hit_stats(),
+exposed by the api/cache_stats/ endpoint.
+"""
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from predictions.versions import REFERENCE_KEY, current_versions, fixture_key, process_local_cache
+
+
+CARD_TEMPLATE = 'partials/fixture_card.html'
+CARD_VERSION = 2  # bump when partials/fixture_card.html changes
+CARD_TIMEOUT = 24 * 60 * 60
+HITS_KEY = 'fragments:cards:hits'
+MISSES_KEY = 'fragments:cards:misses'
+
+
+def card_key(fixture, user_group, versions):
+    prediction = fixture['user_prediction']
+    predicted = f"{prediction['predicted_home_score']}-{prediction['predicted_away_score']}" if prediction else '-'
+    return ':'.join(map(str, [
+        'card', CARD_VERSION, fixture['id'], versions[fixture_key(fixture['id'])], versions[REFERENCE_KEY],
+        user_group.id if user_group else '-', predicted,
+    ]))
+
+
+def render_cards(fixtures, user_group):
+    """
+    Returns the card HTML of every fixture, rendering only the ones missing from the cache.
+
+    Args:
+        fixtures (list): Fixture dicts of serialize_fixtures (with 'user_prediction').
+        user_group (UserGroup): The group the predictions are made in.
+
+    Returns:
+        list: Safe HTML strings in the order of the fixtures.
+    """
+    if process_local_cache():
+        record_hits(0, len(fixtures))
+        return [
+            mark_safe(render_to_string(CARD_TEMPLATE, {'fixture': fixture, 'user_group': user_group}))
+            for fixture in fixtures
+        ]
+
+    versions = current_versions([fixture_key(fixture['id']) for fixture in fixtures] + [REFERENCE_KEY])
+    keys = [card_key(fixture, user_group, versions) for fixture in fixtures]
+    cached = cache.get_many(keys)
+
+    rendered = {}
+    cards = []
+    for key, fixture in zip(keys, fixtures):
+        html = cached.get(key)
+        if html is None:
+            html = rendered[key] = render_to_string(CARD_TEMPLATE, {'fixture': fixture, 'user_group': user_group})
+        cards.append(mark_safe(html))
+
+    if rendered:
+        cache.set_many(rendered, CARD_TIMEOUT)
+    record_hits(len(cards) - len(rendered), len(rendered))
+    return cards
+
+
+def record_hits(hits, misses):
+    for key, count in ((HITS_KEY, hits), (MISSES_KEY, misses)):
+        if count:
+            cache.add(key, 0, timeout=None)
+            try:
+                cache.incr(key, count)
+            except ValueError:  # evicted between add and incr
+                pass
+
+
+def hit_stats():
+    """Returns the numbers of card cache hits and misses and the hit rate."""
+    counts = cache.get_many([HITS_KEY, MISSES_KEY])
+    hits, misses = counts.get(HITS_KEY, 0), counts.get(MISSES_KEY, 0)
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None,
+    }
+
+
+def reset_hit_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
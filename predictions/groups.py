@@ -0,0 +1,48 @@
+"""
+Request-scoped resolution of the user group selected by `access_code`.
+
+Views, serializers and HTMX partials all need the group the current user opened
+by its access code. resolve_group() validates the code and the membership with
+one query and memoizes the result on the underlying HttpRequest, so every DRF
+Request wrapping it, every view instance built for it and every serializer
+rendering it share the same lookup.
+
+Example:
+    >>> from predictions.groups import resolve_group
+    >>> user_group = resolve_group(request)  # access_code from the query string
+    >>> user_group = resolve_group(request, request.POST.get('access_code'))
+"""
+
+from predictions.models import UserGroup
+
+
+def resolve_group(request, access_code=None):
+    """
+    Returns the group with the access code if the request user is a member of it.
+
+    Args:
+        request (HttpRequest or rest_framework.request.Request): The current request.
+        access_code (str): The access code (defaults to the 'access_code' query parameter).
+
+    Returns:
+        UserGroup: The group with its season selected, or None for a missing or invalid
+            code or if the user is not a member.
+    """
+    http_request = getattr(request, '_request', request)  # DRF Request wraps the HttpRequest
+    if access_code is None:
+        access_code = http_request.GET.get('access_code')
+    if not access_code:
+        return None
+
+    resolved = http_request.__dict__.setdefault('_resolved_user_groups', {})
+    if access_code not in resolved:
+        user = http_request.user
+        resolved[access_code] = None
+        if user.is_authenticated:
+            resolved[access_code] = (
+                UserGroup.objects
+                .filter(access_code=access_code, members=user)
+                .select_related('season')
+                .first()
+            )
+    return resolved[access_code]
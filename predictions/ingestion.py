@@ -0,0 +1,315 @@
+"""
+Bulk ingestion helpers for API-Football payloads.
+
+The functions in this module resolve all related rows of a batch with a fixed
+number of queries and write the whole batch with a single statement, so the
+number of queries does not grow with the number of fixtures, teams or leagues.
+
+Example:
+    >>> from predictions.ingestion import bulk_upsert_fixtures, bulk_upsert_teams
+    >>> bulk_upsert_fixtures(season, fixtures, split_date="2023-10-02")
+    {'inserted': 12, 'updated': 3, 'unchanged': 290, 'skipped': 1}
+    >>> bulk_upsert_teams(season, teams)
+    {'inserted': 2, 'updated': 16}
+"""
+
+import hashlib
+
+from predictions.models import League, Season, Team, Fixture
+from predictions.scoring import RESULT_FIELDS, result_changed, score_fixtures
+from predictions.snapshots import closes_round, snapshot_finished_rounds
+from predictions.versions import bump_fixtures, bump_reference, bump_rounds
+
+
+FIXTURE_UPDATE_FIELDS = [
+    'season', 'date', 'home_team', 'away_team', 'home_score', 'away_score',
+    'status', 'round', 'round_name', 'payload_hash',
+]
+
+HASHED_FIELDS = [
+    'date', 'home_team_api_id', 'away_team_api_id', 'home_score', 'away_score', 'status', 'round_name',
+]
+
+
+def parse_round(round_name):
+    """
+    Extracts the round number from an API-Football round name.
+
+    Args:
+        round_name (str): The round name (e.g., "Regular Season - 12").
+
+    Returns:
+        int: The round number, or None if it can't be parsed.
+    """
+    if not round_name:
+        return None
+    try:
+        return int(round_name.split('-')[-1].strip())
+    except ValueError:
+        return None
+
+
+def payload_hash(data):
+    """
+    Returns a compact hash of the normalized fixture fields that ingestion writes.
+
+    Args:
+        data (dict): Fixture field values as returned by parse_fixture.
+
+    Returns:
+        str: 16 hex characters.
+    """
+    raw = '|'.join('' if data[field] is None else str(data[field]) for field in HASHED_FIELDS)
+    return hashlib.blake2b(raw.encode(), digest_size=8).hexdigest()
+
+
+def parse_fixture(fixture_info, split_date):
+    """
+    Normalizes a single item of the /fixtures response.
+
+    Args:
+        fixture_info (dict): A single item of the API-Football 'response' list.
+        split_date (str): The date simulating today in "YYYY-MM-DD" format - only in demo version without payment plan.
+
+    Returns:
+        dict: Fixture field values with team api_ids instead of Team instances.
+        None if the fixture has no date.
+    """
+    fixture_data = fixture_info.get('fixture', {})
+    teams_data = fixture_info.get('teams', {})
+    goals_data = fixture_info.get('goals', {})
+    league_data = fixture_info.get('league', {})
+
+    date = fixture_data.get('date')
+    if not date:
+        return None
+
+    # status = fixture_data['status']['short'] it will be used in main app with payment plan
+    if date[:10] > split_date:  # in demo version without payment plan
+        status = 'NS'
+        home_score = None
+        away_score = None
+    else:
+        status = 'FT'
+        home_score = goals_data.get('home')
+        away_score = goals_data.get('away')
+
+    data = {
+        'api_id': fixture_data.get('id'),
+        'date': date,
+        'home_team_api_id': teams_data.get('home', {}).get('id'),
+        'away_team_api_id': teams_data.get('away', {}).get('id'),
+        'home_score': home_score,
+        'away_score': away_score,
+        'status': status,
+        'round': parse_round(league_data.get('round')),
+        'round_name': league_data.get('round'),
+    }
+    data['payload_hash'] = payload_hash(data)
+    return data
+
+
+def bulk_upsert_fixtures(season, fixtures, split_date, batch_size=None):
+    """
+    Saves a batch of /fixtures items for one season with a constant number of queries.
+
+    Team api_ids of the whole batch are resolved with one query and the payload
+    hashes and results of existing fixtures are loaded with one query. Only new
+    fixtures and fixtures whose hash changed are written, with a single
+    INSERT ... ON CONFLICT (api_id) DO UPDATE statement. Predictions of fixtures
+    whose result changed are rescored with one more query (see predictions.scoring).
+
+    Args:
+        season (Season): The season the fixtures belong to.
+        fixtures (iterable): Items of the API-Football /fixtures 'response' list.
+        split_date (str): The date simulating today in "YYYY-MM-DD" format - only in demo version without payment plan.
+        batch_size (int): Optional maximum number of rows per INSERT statement.
+
+    Returns:
+        dict: Numbers of 'inserted', 'updated', 'unchanged' (not written) and 'skipped' (invalid) fixtures.
+    """
+    skipped = 0
+    parsed = {}
+
+    for fixture_info in fixtures:
+        data = parse_fixture(fixture_info, split_date)
+        if data is None or data['api_id'] is None:
+            skipped += 1
+            continue
+        parsed[data['api_id']] = data  # the same fixture twice in one statement is rejected by ON CONFLICT
+
+    if not parsed:
+        return {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': skipped}
+
+    team_api_ids = set()
+    for data in parsed.values():
+        team_api_ids.add(data['home_team_api_id'])
+        team_api_ids.add(data['away_team_api_id'])
+
+    teams = dict(Team.objects.filter(api_id__in=team_api_ids).values_list('api_id', 'id'))
+    existing = {
+        row['api_id']: row
+        for row in Fixture.objects.filter(api_id__in=parsed.keys()).values(
+            'api_id', 'id', 'payload_hash', 'season_id', 'round', *RESULT_FIELDS,
+        )
+    }
+
+    objs = []
+    rescore_ids = []
+    closed_ids = []
+    unchanged = 0
+    for data in parsed.values():
+        previous = existing.get(data['api_id'])
+        if previous is not None and previous['payload_hash'] == data['payload_hash']:
+            unchanged += 1
+            continue
+
+        home_team_id = teams.get(data['home_team_api_id'])
+        away_team_id = teams.get(data['away_team_api_id'])
+        if home_team_id is None or away_team_id is None:
+            skipped += 1
+            continue
+
+        objs.append(Fixture(
+            api_id=data['api_id'],
+            season=season,
+            date=data['date'],
+            home_team_id=home_team_id,
+            away_team_id=away_team_id,
+            home_score=data['home_score'],
+            away_score=data['away_score'],
+            status=data['status'],
+            round=data['round'],
+            round_name=data['round_name'],
+            payload_hash=data['payload_hash'],
+        ))
+        if previous is not None and result_changed(
+            [previous[name] for name in RESULT_FIELDS], [data[name] for name in RESULT_FIELDS]
+        ):
+            rescore_ids.append(previous['id'])
+        elif previous is not None and closes_round(previous['status'], data['status']):
+            closed_ids.append(previous['id'])
+
+    if objs:
+        Fixture.objects.bulk_create(
+            objs,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=['api_id'],
+            update_fields=FIXTURE_UPDATE_FIELDS,
+        )
+    # bulk_create doesn't send post_save, bump the versions of the rewritten fixtures here
+    bump_fixtures(existing[obj.api_id]['id'] for obj in objs if obj.api_id in existing)
+    bump_rounds(
+        [(season.id, obj.round) for obj in objs]
+        + [(existing[obj.api_id]['season_id'], existing[obj.api_id]['round']) for obj in objs if obj.api_id in existing]
+    )
+    score_fixtures(rescore_ids)
+    snapshot_finished_rounds(closed_ids)
+
+    updated = sum(1 for obj in objs if obj.api_id in existing)
+    return {'inserted': len(objs) - updated, 'updated': updated, 'unchanged': unchanged, 'skipped': skipped}
+
+
+def bulk_upsert_teams(season, teams):
+    """
+    Saves a /teams response and links all teams to the season with a constant number of queries.
+
+    Teams are upserted with a single INSERT ... ON CONFLICT (api_id) DO UPDATE
+    statement and the Team.season through-table rows are inserted with a single
+    INSERT ... ON CONFLICT DO NOTHING statement.
+
+    Args:
+        season (Season): The season the teams play in.
+        teams (iterable): Items of the API-Football /teams 'response' list.
+
+    Returns:
+        dict: Numbers of 'inserted' and 'updated' teams.
+    """
+    names = {}
+    for team_info in teams:
+        team_data = team_info.get('team', {})
+        if team_data:
+            names[team_data['id']] = team_data['name']
+
+    if not names:
+        return {'inserted': 0, 'updated': 0}
+
+    existing = set(Team.objects.filter(api_id__in=names.keys()).values_list('api_id', flat=True))
+    Team.objects.bulk_create(
+        [Team(api_id=api_id, name=name) for api_id, name in names.items()],
+        update_conflicts=True,
+        unique_fields=['api_id'],
+        update_fields=['name'],
+    )
+
+    TeamSeason = Team.season.through
+    team_ids = Team.objects.filter(api_id__in=names.keys()).values_list('id', flat=True)
+    TeamSeason.objects.bulk_create(
+        [TeamSeason(team_id=team_id, season_id=season.id) for team_id in team_ids],
+        ignore_conflicts=True,
+    )
+    bump_reference()
+
+    updated = len(existing)
+    return {'inserted': len(names) - updated, 'updated': updated}
+
+
+def seed_seasons(years, league_ids=None):
+    """
+    Creates the missing seasons of every league for the given years with a constant number of queries.
+
+    Existing (league, start_year) pairs are read with one query and all missing
+    seasons are inserted with one statement.
+
+    Args:
+        years (iterable): Starting years of the seasons (e.g., [2021, 2022, 2023]).
+        league_ids (iterable): IDs of the leagues to seed (defaults to all leagues).
+
+    Returns:
+        int: The number of seasons created.
+    """
+    years = sorted(set(years))
+    if league_ids is None:
+        league_ids = League.objects.values_list('id', flat=True)
+    league_ids = list(league_ids)
+
+    if not years or not league_ids:
+        return 0
+
+    existing = set(
+        Season.objects.filter(league_id__in=league_ids, start_year__in=years).values_list('league_id', 'start_year')
+    )
+    missing = [
+        Season(league_id=league_id, start_year=year, year=f"{year}-{year+1}")
+        for league_id in league_ids
+        for year in years
+        if (league_id, year) not in existing
+    ]
+    Season.objects.bulk_create(missing)
+    if missing:
+        bump_reference()
+    return len(missing)
+
+
+API_STATUSES = {
+    'TBD': 'NS', 'NS': 'NS',
+    '1H': '1H', 'HT': 'HT', '2H': '2H',
+    'ET': 'LIVE', 'BT': 'LIVE', 'P': 'LIVE', 'SUSP': 'LIVE', 'INT': 'LIVE', 'LIVE': 'LIVE',
+    'FT': 'FT', 'AET': 'FT', 'PEN': 'FT', 'AWD': 'FT', 'WO': 'FT',
+    'PST': 'PST',
+    'CANC': 'CANC', 'ABD': 'CANC',
+}
+
+
+def normalize_status(short_status):
+    """
+    Maps an API-Football short status to one of STATUS_CHOICES.
+
+    Args:
+        short_status (str): The 'fixture.status.short' value (e.g., "ET").
+
+    Returns:
+        str: The fixture status stored in the database, or None if it is unknown.
+    """
+    return API_STATUSES.get(short_status)
@@ -0,0 +1,223 @@
+"""
+Database-backed background jobs.
+
+Long running work (scoring, fixture and team sync) is enqueued as a Job row and
+executed by `python manage.py run_worker`, so it never runs inside an HTTP request.
+Workers claim jobs with SELECT ... FOR UPDATE SKIP LOCKED, so any number of
+workers can drain the queue concurrently without taking the same job twice.
+Failed jobs are retried with a growing delay up to MAX_ATTEMPTS times.
+
+A running job is locked by its worker (Job.locked_by), which refreshes
+Job.heartbeat_at every HEARTBEAT_INTERVAL from a background thread, however long
+the handler runs. Only jobs whose heartbeat is older than HEARTBEAT_TIMEOUT
+(the worker died) are claimed again; a reclaim counts as an attempt, so a job
+that keeps killing its worker fails after MAX_ATTEMPTS. A worker whose job was
+reclaimed in the meantime discards its outcome.
+
+Handlers are registered with the @handler decorator and receive the job payload
+as keyword arguments; their return value (JSON serializable) is stored in Job.result.
+
+Example:
+    >>> from predictions.jobs import enqueue
+    >>> enqueue('sync_fixtures', {'today': '2023-10-02'})
+    <Job: sync_fixtures #12 (queued)>
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from predictions.models import Job, Season
+
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+RETRY_DELAY = timedelta(seconds=30)  # doubled after every failed attempt
+HEARTBEAT_INTERVAL = timedelta(seconds=30)
+HEARTBEAT_TIMEOUT = timedelta(minutes=5)
+
+HANDLERS = {}
+
+
+def handler(kind):
+    """Registers a function as the handler of jobs of the given kind."""
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+# handlers import their modules lazily, so views enqueuing jobs don't load the API client
+
+@handler('score')
+def score_job(fixture_ids=None):
+    from predictions.scoring import score_fixtures, score_pending_predictions
+    if fixture_ids is not None:
+        return {'scored': score_fixtures(fixture_ids)}
+    return {'scored': score_pending_predictions()}
+
+
+@handler('sync_fixtures')
+def sync_fixtures_job(today=None):
+    from predictions.sync import sync_fixtures
+    results = sync_fixtures(today=date.fromisoformat(today) if today else None)
+    return {f"{league_id}/{season_year}": counts for (league_id, season_year), counts in results.items()}
+
+
+@handler('sync_teams')
+def sync_teams_job(season_years=(2021, 2022, 2023)):
+    from predictions.utils import fetch_and_save_teams_for_seasons
+    seasons = Season.objects.filter(start_year__in=season_years).select_related('league')
+    return {'inserted': fetch_and_save_teams_for_seasons(seasons)}
+
+
+def enqueue(kind, payload=None, user=None, unique=False):
+    """
+    Adds a job to the queue.
+
+    Args:
+        kind (str): The name of a registered handler.
+        payload (dict): Keyword arguments for the handler.
+        user (User): The user enqueuing the job.
+        unique (bool): Return an already queued job of the same kind and payload instead of adding another one.
+
+    Returns:
+        Job: The queued job.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind '{kind}'")
+    payload = payload or {}
+    if unique:
+        job = Job.objects.filter(kind=kind, payload=payload, status='queued').order_by('id').first()
+        if job is not None:
+            return job
+    return Job.objects.create(kind=kind, payload=payload, created_by=user)
+
+
+def worker_name():
+    """Identifies the worker process in Job.locked_by."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_job(worker=None):
+    """
+    Claims the next due job, skipping jobs locked by other workers.
+
+    Queued jobs are due after run_after, running jobs when their worker stopped
+    sending heartbeats. An abandoned job that already used MAX_ATTEMPTS attempts
+    is marked as failed instead.
+
+    Args:
+        worker (str): The name stored in Job.locked_by (defaults to worker_name()).
+
+    Returns:
+        Job: The claimed job (already marked as running), or None if the queue is empty.
+    """
+    now = timezone.now()
+    due = (
+        Job.objects
+        .select_for_update(skip_locked=True)
+        .filter(Q(status='queued', run_after__lte=now) | Q(status='running', heartbeat_at__lt=now - HEARTBEAT_TIMEOUT))
+        .order_by('run_after', 'id')
+    )
+    with transaction.atomic():
+        while True:
+            job = due.first()
+            if job is None:
+                return None
+            if job.status == 'queued' or job.attempts < MAX_ATTEMPTS:
+                break
+            job.status = 'failed'
+            job.error = f"Worker {job.locked_by} stopped sending heartbeats during attempt {job.attempts}."
+            job.finished_at = now
+            job.save(update_fields=['status', 'error', 'finished_at'])
+            logger.error("Job %s abandoned by worker %s", job, job.locked_by)
+
+        job.status = 'running'
+        job.attempts += 1
+        job.started_at = now
+        job.heartbeat_at = now
+        job.locked_by = worker or worker_name()
+        job.save(update_fields=['status', 'attempts', 'started_at', 'heartbeat_at', 'locked_by'])
+    return job
+
+
+@contextmanager
+def heartbeat(job):
+    """Refreshes the heartbeat of a claimed job from a background thread while the block runs."""
+    stopped = threading.Event()
+
+    def beat():
+        try:
+            while not stopped.wait(HEARTBEAT_INTERVAL.total_seconds()):
+                Job.objects.filter(pk=job.pk, locked_by=job.locked_by).update(heartbeat_at=timezone.now())
+        finally:
+            connection.close()  # the thread's own connection
+
+    thread = threading.Thread(target=beat, name=f"heartbeat-{job.pk}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def run_job(job):
+    """Runs a claimed job and stores its result, or schedules a retry if it fails."""
+    try:
+        with heartbeat(job):
+            result = HANDLERS[job.kind](**job.payload)
+    except Exception:
+        job.error = traceback.format_exc()
+        if job.attempts < MAX_ATTEMPTS:
+            job.status = 'queued'
+            job.run_after = timezone.now() + RETRY_DELAY * 2 ** (job.attempts - 1)
+        else:
+            job.status = 'failed'
+            job.finished_at = timezone.now()
+        logger.exception("Job %s failed (attempt %s)", job, job.attempts)
+    else:
+        job.status = 'done'
+        job.result = result
+        job.finished_at = timezone.now()
+
+    fields = ['status', 'result', 'error', 'run_after', 'finished_at']
+    saved = Job.objects.filter(pk=job.pk, status='running', locked_by=job.locked_by).update(
+        **{name: getattr(job, name) for name in fields}
+    )
+    if not saved:
+        logger.warning("Job %s was reclaimed by another worker, its outcome is discarded", job)
+    return job
+
+
+def work(once=False, poll_interval=1.0, log=None):
+    """
+    Runs jobs until interrupted (or until the queue is empty).
+
+    Args:
+        once (bool): Return when there are no more due jobs.
+        poll_interval (float): Seconds to wait when the queue is empty.
+        log (callable): Receives a status line after every job.
+    """
+    worker = worker_name()
+    while True:
+        job = claim_job(worker)
+        if job is None:
+            if once:
+                return
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        if log is not None:
+            log(f"{timezone.now():%H:%M:%S} {job}")
@@ -0,0 +1,139 @@
+"""
+Incremental parsing of large API-Football JSON bodies.
+
+API-Football wraps every result in an object like
+{"get": ..., "parameters": {...}, "errors": [], "results": 380, "paging": {...}, "response": [...]}.
+`iter_array_items` walks that top-level object chunk by chunk and yields the
+items of the "response" array one at a time, so only a single item (plus one
+chunk of raw text) is held in memory at once.
+
+Example:
+    >>> with open('fixtures.json', 'rb') as f:
+    ...     for batch in batched(iter_array_items(iter(lambda: f.read(65536), b'')), 500):
+    ...         bulk_upsert_fixtures(season, batch, split_date)
+"""
+
+import codecs
+import json
+from itertools import islice
+
+
+WHITESPACE = ' \t\n\r'
+
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Buffers decoded text from an iterable of byte chunks."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Appends the next chunk to the buffer, dropping the consumed part. Returns False at the end."""
+        if self.eof:
+            return False
+        try:
+            chunk = next(self.chunks)
+        except StopIteration:
+            self.eof = True
+            self.buf = self.buf[self.pos:] + self.decoder.decode(b'', final=True)
+            self.pos = 0
+            return False
+        if isinstance(chunk, bytes):
+            chunk = self.decoder.decode(chunk)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Returns the next non-whitespace character without consuming it."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} at stream position, found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        """Decodes and consumes one complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # a number at the very end of the buffer may continue in the next chunk
+            if end == len(self.buf) and isinstance(value, (int, float)) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_array_items(chunks, key='response', other=None):
+    """
+    Yields items of the array stored under `key` in a top-level JSON object.
+
+    Args:
+        chunks (iterable): Byte (or str) chunks of the JSON document.
+        key (str): The name of the array to stream.
+        other (dict): If given, receives all other top-level members (e.g. 'errors').
+
+    Yields:
+        The decoded items of the array.
+
+    Raises:
+        ValueError: If the document is malformed or truncated.
+    """
+    reader = _Reader(chunks)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+
+    while True:
+        name = reader.value()
+        reader.expect(':')
+        if name == key:
+            reader.expect('[')
+            if reader.peek() == ']':
+                reader.pos += 1
+            else:
+                while True:
+                    yield reader.value()
+                    separator = reader.peek()
+                    reader.pos += 1
+                    if separator == ']':
+                        break
+                    if separator != ',':
+                        raise ValueError(f"Expected ',' or ']' in array, found {separator!r}")
+        else:
+            value = reader.value()
+            if other is not None:
+                other[name] = value
+
+        separator = reader.peek()
+        reader.pos += 1
+        if separator == '}':
+            return
+        if separator != ',':
+            raise ValueError(f"Expected ',' or '}}' in object, found {separator!r}")
+
+
+def batched(iterable, size):
+    """Yields lists of at most `size` consecutive items."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
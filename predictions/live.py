@@ -0,0 +1,212 @@
+"""
+Live score polling for fixtures in play.
+
+Every poll selects only fixtures that are in play or kick off soon (using the
+status and (status, date) indexes), asks API-Football for exactly those fixtures
+in batches of IDS_PER_REQUEST ids and writes status and score changes with a
+single bulk update. The pause between polls depends on the number of polled
+fixtures and the API quota, so API calls and database writes scale with the
+number of live matches instead of the size of the season.
+
+Statuses come from 'fixture.status.short', which requires the paid plan; the
+demo version derives statuses from split_date in predictions.ingestion instead.
+
+Example:
+    python manage.py poll_live_scores
+    python manage.py poll_live_scores --once
+"""
+
+import asyncio
+import math
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from predictions.api_football import ApiFootballClient, ApiFootballError
+from predictions.ingestion import normalize_status
+from predictions.models import Fixture
+from predictions.scoring import RESULT_FIELDS, result_changed, score_fixtures
+from predictions.snapshots import closes_round, snapshot_finished_rounds
+from predictions.versions import bump_fixtures, bump_rounds
+
+
+LIVE_STATUSES = ['1H', 'HT', '2H', 'LIVE']
+IDS_PER_REQUEST = 20  # the maximum of the API-Football `ids` parameter
+KICKOFF_WINDOW = timedelta(minutes=15)
+STARTED_WINDOW = timedelta(hours=3)  # fixtures past kickoff still reported as NS
+MIN_INTERVAL = 15  # API-Football refreshes live data every 15 seconds
+UPCOMING_INTERVAL = 60
+MAX_INTERVAL = 15 * 60
+QUOTA_SHARE = 0.5  # part of the API quota the poller may use
+
+# live data must never come from the response cache
+live_client = ApiFootballClient(cache=None)
+
+
+def fixtures_to_poll(now):
+    """
+    Returns fixtures in play or kicking off within KICKOFF_WINDOW.
+
+    Returns:
+        list: Dicts with 'id', 'api_id', 'season_id', 'round', 'status', 'home_score' and 'away_score'.
+    """
+    return list(
+        Fixture.objects
+        .filter(
+            Q(status__in=LIVE_STATUSES)
+            | Q(status='NS', date__gte=now - STARTED_WINDOW, date__lte=now + KICKOFF_WINDOW)
+        )
+        .values('id', 'api_id', 'season_id', 'round', 'status', 'home_score', 'away_score')
+    )
+
+
+def next_kickoff(now):
+    """Returns the date of the next fixture that hasn't started, or None."""
+    return (
+        Fixture.objects
+        .filter(status='NS', date__gt=now)
+        .order_by('date')
+        .values_list('date', flat=True)
+        .first()
+    )
+
+
+def apply_live_updates(fixtures, items):
+    """
+    Writes status and score changes of polled fixtures with one bulk update,
+    rescores predictions of fixtures that reached FT or got a corrected score
+    and snapshots rounds closed by cancelled or postponed fixtures.
+
+    Args:
+        fixtures (list): Polled fixtures as returned by fixtures_to_poll.
+        items (list): Items of the API-Football /fixtures 'response' list.
+
+    Returns:
+        list: Updated Fixture instances (only id, status, scores and the cleared payload_hash are set).
+    """
+    current = {fixture['api_id']: fixture for fixture in fixtures}
+    changed = []
+    changed_rounds = set()
+    rescore_ids = []
+    closed_ids = []
+
+    for item in items:
+        fixture = current.get(item.get('fixture', {}).get('id'))
+        status = normalize_status(item.get('fixture', {}).get('status', {}).get('short'))
+        if fixture is None or status is None:
+            continue
+
+        goals = item.get('goals', {})
+        values = {'status': status, 'home_score': goals.get('home'), 'away_score': goals.get('away')}
+        if all(fixture[name] == value for name, value in values.items()):
+            continue
+
+        changed.append(Fixture(id=fixture['id'], payload_hash='', **values))
+        changed_rounds.add((fixture['season_id'], fixture['round']))
+        if result_changed([fixture[name] for name in RESULT_FIELDS], [values[name] for name in RESULT_FIELDS]):
+            rescore_ids.append(fixture['id'])
+        elif closes_round(fixture['status'], status):
+            closed_ids.append(fixture['id'])
+
+    if changed:
+        # the stored hash no longer describes the row, the next ingestion must rewrite it
+        Fixture.objects.bulk_update(changed, [*RESULT_FIELDS, 'payload_hash'])
+        bump_fixtures(fixture.id for fixture in changed)
+        bump_rounds(changed_rounds)
+    score_fixtures(rescore_ids)
+    snapshot_finished_rounds(closed_ids)
+    return changed
+
+
+def next_interval(live_count, polled_count, seconds_to_kickoff=None):
+    """
+    Computes the pause before the next poll.
+
+    With nothing to poll the poller sleeps until shortly before the next kickoff.
+    Otherwise it polls as often as API-Football refreshes live data, slowed down
+    when the number of requests per poll would exceed QUOTA_SHARE of the quota.
+
+    Args:
+        live_count (int): The number of fixtures in play.
+        polled_count (int): The number of fixtures polled (live and kicking off soon).
+        seconds_to_kickoff (float): Seconds until the next kickoff, if any.
+
+    Returns:
+        float: The number of seconds to sleep.
+    """
+    if polled_count == 0:
+        if seconds_to_kickoff is None:
+            return MAX_INTERVAL
+        return min(MAX_INTERVAL, max(MIN_INTERVAL, seconds_to_kickoff - KICKOFF_WINDOW.total_seconds()))
+
+    requests_per_poll = math.ceil(polled_count / IDS_PER_REQUEST)
+    quota_interval = max(
+        60 * requests_per_poll / (settings.API_FOOTBALL_REQUESTS_PER_MINUTE * QUOTA_SHARE),
+        24 * 60 * 60 * requests_per_poll / (settings.API_FOOTBALL_REQUESTS_PER_DAY * QUOTA_SHARE),
+    )
+    base_interval = MIN_INTERVAL if live_count else UPCOMING_INTERVAL
+    return min(MAX_INTERVAL, max(base_interval, quota_interval))
+
+
+async def fetch_live_items(fixtures):
+    """Fetches the polled fixtures in concurrent batched requests; failed batches are skipped."""
+    api_ids = [fixture['api_id'] for fixture in fixtures]
+    batches = [api_ids[i:i + IDS_PER_REQUEST] for i in range(0, len(api_ids), IDS_PER_REQUEST)]
+    responses = await asyncio.gather(
+        *(
+            asyncio.to_thread(live_client.get_json, '/fixtures', {'ids': '-'.join(map(str, batch))})
+            for batch in batches
+        ),
+        return_exceptions=True,
+    )
+
+    items = []
+    for response in responses:
+        if isinstance(response, ApiFootballError):
+            continue
+        if isinstance(response, BaseException):
+            raise response
+        items.extend(response.get('response', []))
+    return items
+
+
+async def poll_once():
+    """
+    Polls all fixtures in play once and applies the changes.
+
+    Returns:
+        tuple: (list of changed fixtures, seconds to sleep before the next poll).
+    """
+    now = timezone.now()
+    fixtures = await sync_to_async(fixtures_to_poll)(now)
+
+    if not fixtures:
+        kickoff = await sync_to_async(next_kickoff)(now)
+        seconds_to_kickoff = (kickoff - now).total_seconds() if kickoff else None
+        return [], next_interval(0, 0, seconds_to_kickoff)
+
+    items = await fetch_live_items(fixtures)
+    changed = await sync_to_async(apply_live_updates)(fixtures, items)
+
+    live_count = sum(1 for fixture in fixtures if fixture['status'] in LIVE_STATUSES)
+    return changed, next_interval(live_count, len(fixtures))
+
+
+async def run_poller(once=False, log=None):
+    """
+    Polls until cancelled (or once).
+
+    Args:
+        once (bool): Run a single poll and return.
+        log (callable): Receives a status line after every poll.
+    """
+    while True:
+        changed, interval = await poll_once()
+        if log is not None:
+            log(f"{timezone.now():%H:%M:%S} updated {len(changed)} fixtures, next poll in {interval:.0f}s")
+        if once:
+            return
+        await asyncio.sleep(interval)
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from predictions.api_standin import Faults, Standin, StandinData, make_server, recorded_responses
+
+
+class Command(BaseCommand):
+    help = "Serves recorded or synthetic API-Football responses locally (set API_FOOTBALL_URL to use it)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8001)
+        parser.add_argument('--leagues', type=int, default=1, help="Number of synthetic leagues.")
+        parser.add_argument('--teams', type=int, default=18, help="Number of teams per synthetic league.")
+        parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response.")
+        parser.add_argument('--jitter', type=float, default=0.0, help="Maximum random seconds added to the latency.")
+        parser.add_argument('--error-rate', type=float, default=0.0, help="Probability of a 500 response.")
+        parser.add_argument('--rate-limit', type=int, default=None, help="Requests per minute before 429 responses.")
+        parser.add_argument('--recorded', default=None, help="Response cache directory served before synthetic data.")
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        recorded = recorded_responses(options['recorded']) if options['recorded'] else None
+        standin = Standin(
+            StandinData(leagues=options['leagues'], teams_per_league=options['teams']),
+            recorded=recorded,
+            faults=Faults(
+                latency=options['latency'],
+                jitter=options['jitter'],
+                error_rate=options['error_rate'],
+                requests_per_minute=options['rate_limit'],
+                seed=options['seed'],
+            ),
+        )
+        server = make_server(standin, options['host'], options['port'])
+        self.stdout.write(f"API-Football stand-in listening on http://{options['host']}:{options['port']}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
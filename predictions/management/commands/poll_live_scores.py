@@ -0,0 +1,18 @@
+import asyncio
+
+from django.core.management.base import BaseCommand
+
+from predictions.live import run_poller
+
+
+class Command(BaseCommand):
+    help = "Polls API-Football for fixtures in play and applies status and score changes in bulk."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Run a single poll and exit.")
+
+    def handle(self, *args, **options):
+        try:
+            asyncio.run(run_poller(once=options['once'], log=self.stdout.write))
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from predictions.snapshots import snapshot_all_rounds
+from predictions.standings import rebuild_standings, standings_mismatches
+
+
+class Command(BaseCommand):
+    help = "Recomputes group standings from predictions (use --check to only report differences)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--group', type=int, action='append', dest='groups', help="Only this user group id (repeatable).")
+        parser.add_argument('--check', action='store_true', help="Report differing standings without fixing them.")
+        parser.add_argument('--snapshots', action='store_true', help="Also rewrite the snapshots of all finished rounds.")
+
+    def handle(self, *args, **options):
+        mismatches = standings_mismatches(options['groups'])
+        for user_group_id, user_id, stored, expected in mismatches:
+            self.stdout.write(f"group {user_group_id} user {user_id}: stored {stored}, expected {expected}")
+
+        if options['check']:
+            if mismatches:
+                self.stderr.write(f"{len(mismatches)} standings differ")
+                raise SystemExit(1)
+            self.stdout.write(self.style.SUCCESS("Standings are consistent"))
+            return
+
+        rebuild_standings(options['groups'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt standings ({len(mismatches)} fixed)"))
+
+        if options['snapshots']:
+            self.stdout.write(self.style.SUCCESS(f"Wrote {snapshot_all_rounds()} round snapshots"))
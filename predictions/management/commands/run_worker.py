@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from predictions.jobs import work
+
+
+class Command(BaseCommand):
+    help = "Runs queued background jobs (scoring, fixture and team sync). Start several to drain the queue faster."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Exit when the queue is empty.")
+        parser.add_argument('--poll-interval', type=float, default=1.0, help="Seconds to wait when the queue is empty.")
+
+    def handle(self, *args, **options):
+        try:
+            work(once=options['once'], poll_interval=options['poll_interval'], log=self.stdout.write)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.5 on 2026-10-17 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0004_alter_prediction_points_awarded'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_synced_at', models.DateTimeField()),
+                ('window_start', models.DateField()),
+                ('window_end', models.DateField()),
+                ('season', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='sync_state', to='predictions.season')),
+            ],
+        ),
+    ]
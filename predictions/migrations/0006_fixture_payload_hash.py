@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0005_syncstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fixture',
+            name='payload_hash',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-17 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0006_fixture_payload_hash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fixture',
+            index=models.Index(fields=['status', 'date'], name='predictions_status_5447a0_idx'),
+        ),
+    ]
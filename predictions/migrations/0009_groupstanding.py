@@ -0,0 +1,32 @@
+# Generated by Django 5.2.5 on 2026-10-17 10:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0008_job'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('points', models.IntegerField(default=0)),
+                ('exact_hits', models.IntegerField(default=0)),
+                ('outcome_hits', models.IntegerField(default=0)),
+                ('predictions_count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to=settings.AUTH_USER_MODEL)),
+                ('user_group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='predictions.usergroup')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_group', '-points', '-exact_hits', '-outcome_hits'], name='predictions_user_gr_c849d4_idx')],
+                'unique_together': {('user_group', 'user')},
+            },
+        ),
+    ]
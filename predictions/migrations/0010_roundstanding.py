@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-17 10:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0009_groupstanding'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoundStanding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('round', models.IntegerField()),
+                ('points', models.IntegerField(default=0)),
+                ('exact_hits', models.IntegerField(default=0)),
+                ('outcome_hits', models.IntegerField(default=0)),
+                ('round_points', models.IntegerField(default=0)),
+                ('rank', models.IntegerField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='round_standings', to=settings.AUTH_USER_MODEL)),
+                ('user_group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='round_standings', to='predictions.usergroup')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_group', 'round', 'rank'], name='predictions_user_gr_0238ef_idx')],
+                'unique_together': {('user_group', 'user', 'round')},
+            },
+        ),
+    ]
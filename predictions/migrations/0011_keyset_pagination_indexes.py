@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0010_roundstanding'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fixture',
+            index=models.Index(fields=['season', 'status', 'date', 'id'], name='predictions_season__3cb442_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prediction',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='predictions_user_id_c3c5d0_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='groupstanding',
+            name='predictions_user_gr_c849d4_idx',
+        ),
+        migrations.AddIndex(
+            model_name='groupstanding',
+            index=models.Index(fields=['user_group', '-points', '-exact_hits', '-outcome_hits', '-user'], name='predictions_user_gr_0b884d_idx'),
+        ),
+    ]
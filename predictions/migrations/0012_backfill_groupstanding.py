@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-17 10:00
+
+from django.db import migrations
+
+
+# predictions.standings.REBUILD_SQL for all groups, spelled out so later changes
+# of the module don't change what this migration did
+BACKFILL_SQL = """
+    INSERT INTO predictions_groupstanding AS s
+        (user_group_id, user_id, points, exact_hits, outcome_hits, predictions_count)
+    SELECT
+        m.usergroup_id,
+        m.user_id,
+        COALESCE(SUM(p.points_awarded), 0),
+        COUNT(*) FILTER (WHERE p.points_awarded = 3),
+        COUNT(*) FILTER (WHERE p.points_awarded = 1),
+        COUNT(p.points_awarded)
+    FROM predictions_usergroup_members AS m
+    LEFT JOIN predictions_prediction AS p
+        ON p.user_group_id = m.usergroup_id AND p.user_id = m.user_id
+    GROUP BY m.usergroup_id, m.user_id
+    ON CONFLICT (user_group_id, user_id) DO UPDATE SET
+        points = EXCLUDED.points,
+        exact_hits = EXCLUDED.exact_hits,
+        outcome_hits = EXCLUDED.outcome_hits,
+        predictions_count = EXCLUDED.predictions_count
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0011_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(BACKFILL_SQL, reverse_sql=migrations.RunSQL.noop),
+    ]
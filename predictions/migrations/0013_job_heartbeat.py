@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0012_backfill_groupstanding'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='locked_by',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        # jobs running during the deploy are reclaimable once their last sign of life gets old
+        migrations.RunSQL(
+            "UPDATE predictions_job SET heartbeat_at = started_at WHERE status = 'running'",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
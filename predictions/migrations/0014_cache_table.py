@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-17 10:00
+
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_table(apps, schema_editor):
+    # the table of the default DatabaseCache (CACHES in settings); a no-op with Redis
+    call_command('createcachetable', database=schema_editor.connection.alias, verbosity=0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0013_job_heartbeat'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
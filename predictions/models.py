@@ -9,8 +9,16 @@ STATUS_CHOICES = [
     ('CANC', 'odwołany'),
 ]
 
+JOB_STATUS_CHOICES = [
+    ('queued', 'w kolejce'),
+    ('running', 'w trakcie'),
+    ('done', 'zakończone'),
+    ('failed', 'nieudane'),
+]
+
 from django.contrib.auth.models import User
 from django.db import models
+from django.utils import timezone
 
 
 #class Country(models.Model): UZUPEŁNIĆ
@@ -86,6 +94,7 @@ class Fixture(models.Model):
         status (CharField): The current status of the fixture, with choices defined in STATUS_CHOICES.
         round (IntegerField): The round number of the fixture (nullable).
         round_name (CharField): The name of the round (nullable).
+        payload_hash (CharField): Hash of the normalized API payload the fixture was last written from.
     
     Meta:
         indexes: Defines database indexes for optimized queries."""
@@ -100,12 +109,15 @@ class Fixture(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='NS')
     round = models.IntegerField(null=True, blank=True)
     round_name = models.CharField(max_length=50, null=True, blank=True)
+    payload_hash = models.CharField(max_length=16, blank=True, default='')
 
     class Meta:
         indexes = [
             models.Index(fields=['api_id','status']),
             models.Index(fields=['status']),
             models.Index(fields=['season', 'round']),
+            models.Index(fields=['status', 'date']),
+            models.Index(fields=['season', 'status', 'date', 'id']),
         ] 
 
     def __str__(self):
@@ -175,8 +187,33 @@ class Prediction(models.Model):
         indexes = [
             models.Index(fields=['user_group', 'fixture']),
             models.Index(fields=['user', 'user_group']),
+            models.Index(fields=['user', 'created_at', 'id']),
         ]
 
+    def compute_points(self):
+        """
+        Returns the points for the prediction based on the actual fixture result.
+        
+        Scoring System:
+            - Exact score prediction: 3
+            - Correct outcome (win/loss/draw) but wrong score: 1
+            - Incorrect outcome: 0
+        Returns None while the fixture has no score. These are the rules of
+        calculate_points(), applied in bulk by predictions.scoring.
+        """
+        fixture = self.fixture
+        if fixture.home_score is None or fixture.away_score is None:
+            return None
+        if (self.predicted_home_score == fixture.home_score and
+            self.predicted_away_score == fixture.away_score):
+            return 3
+        if ((self.predicted_home_score - self.predicted_away_score) *
+              (fixture.home_score - fixture.away_score) > 0 or
+              (self.predicted_home_score == self.predicted_away_score and
+               fixture.home_score == fixture.away_score)):
+            return 1
+        return 0
+
     def calculate_points(self):
         """
         Calculates points for the prediction based on the actual fixture result.
@@ -185,21 +222,149 @@ class Prediction(models.Model):
             - Exact score prediction: 3
             - Correct outcome (win/loss/draw) but wrong score: 1
             - Incorrect outcome: 0
-        Updates the points_awarded attribute and saves the instance.
+        Updates the points_awarded attribute and saves the instance, and applies
+        the change to the group standing of the user (see predictions.standings).
         """
-        fixture = self.fixture
-        if fixture.home_score is not None and fixture.away_score is not None:
-            if (self.predicted_home_score == fixture.home_score and
-                self.predicted_away_score == fixture.away_score):
-                self.points_awarded = 3
-            elif ((self.predicted_home_score - self.predicted_away_score) *
-                  (fixture.home_score - fixture.away_score) > 0 or
-                  (self.predicted_home_score == self.predicted_away_score and
-                   fixture.home_score == fixture.away_score)):
-                self.points_awarded = 1
-            else:
-                self.points_awarded = 0
-            self.save()    
+        from predictions.standings import apply_points_change  # predictions.standings imports the models
+        points = self.compute_points()
+        if points is not None:
+            old_points, self.points_awarded = self.points_awarded, points
+            self.save()
+            apply_points_change(self.user_group_id, self.user_id, old_points, points)
 
     def __str__(self):
         return f"{self.user.username}'s prediction: {self.predicted_home_score}-{self.predicted_away_score} for {self.fixture}"
+
+class GroupStanding(models.Model):
+    """
+    Standing of a member in a user group, kept up to date by the scoring queries (see predictions.standings).
+    
+    Attributes:
+        user_group (ForeignKey): The user group.
+        user (ForeignKey): The member of the group.
+        points (IntegerField): The sum of points awarded to the member's predictions in the group.
+        exact_hits (IntegerField): The number of exact score predictions (3 points).
+        outcome_hits (IntegerField): The number of correct outcome predictions (1 point).
+        predictions_count (IntegerField): The number of scored predictions.
+        
+    Meta:
+        unique_together: One standing per member of a group.
+        indexes: The ranking order of a group (points, then exact and outcome hits).
+    """
+
+    user_group = models.ForeignKey(UserGroup, on_delete=models.CASCADE, related_name='standings')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='standings')
+    points = models.IntegerField(default=0)
+    exact_hits = models.IntegerField(default=0)
+    outcome_hits = models.IntegerField(default=0)
+    predictions_count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user_group', 'user')
+        indexes = [
+            models.Index(fields=['user_group', '-points', '-exact_hits', '-outcome_hits', '-user']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} in {self.user_group.name}: {self.points} pts"
+
+class RoundStanding(models.Model):
+    """
+    Snapshot of a member's standing in a user group after a round, written when the round finishes (see predictions.snapshots).
+    
+    Attributes:
+        user_group (ForeignKey): The user group.
+        user (ForeignKey): The member of the group.
+        round (IntegerField): The round after which the snapshot was taken.
+        points (IntegerField): Points of the member's predictions up to and including the round.
+        exact_hits (IntegerField): Exact score predictions up to and including the round.
+        outcome_hits (IntegerField): Correct outcome predictions up to and including the round.
+        round_points (IntegerField): Points of the member's predictions of the round only.
+        rank (IntegerField): The position in the group after the round (ties share a rank).
+        
+    Meta:
+        unique_together: One snapshot per member of a group and round.
+        indexes: The history of a group ordered by round and rank.
+    """
+
+    user_group = models.ForeignKey(UserGroup, on_delete=models.CASCADE, related_name='round_standings')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='round_standings')
+    round = models.IntegerField()
+    points = models.IntegerField(default=0)
+    exact_hits = models.IntegerField(default=0)
+    outcome_hits = models.IntegerField(default=0)
+    round_points = models.IntegerField(default=0)
+    rank = models.IntegerField()
+
+    class Meta:
+        unique_together = ('user_group', 'user', 'round')
+        indexes = [
+            models.Index(fields=['user_group', 'round', 'rank']),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} in {self.user_group.name} after round {self.round}: #{self.rank}"
+
+class SyncState(models.Model):
+    """
+    Watermark of the last successful fixture sync of a season (league and start year).
+    
+    Attributes:
+        season (OneToOneField): The synced season.
+        last_synced_at (DateTimeField): The timestamp when the last sync finished.
+        window_start (DateField): The first day of the last synced date window.
+        window_end (DateField): The last day of the last synced date window.
+    """
+
+    season = models.OneToOneField(Season, on_delete=models.CASCADE, related_name='sync_state')
+    last_synced_at = models.DateTimeField()
+    window_start = models.DateField()
+    window_end = models.DateField()
+
+    def __str__(self):
+        return f"{self.season} synced {self.window_start} - {self.window_end} at {self.last_synced_at}"
+
+class Job(models.Model):
+    """
+    A background job stored in the database and executed by `manage.py run_worker` (see predictions.jobs).
+    
+    Attributes:
+        kind (CharField): The name of the handler running the job (e.g. 'score').
+        payload (JSONField): Keyword arguments passed to the handler.
+        status (CharField): The state of the job, with choices defined in JOB_STATUS_CHOICES.
+        result (JSONField): The value returned by the handler (nullable).
+        error (TextField): The traceback of the last failed attempt.
+        attempts (IntegerField): The number of times the job was claimed by a worker.
+        locked_by (CharField): The worker running (or that last ran) the job.
+        heartbeat_at (DateTimeField): The last sign of life of the worker running the job (nullable).
+        run_after (DateTimeField): The job is not claimed before this time (used for retries).
+        created_by (ForeignKey): The user who enqueued the job (nullable).
+        created_at (DateTimeField): The timestamp when the job was enqueued.
+        started_at (DateTimeField): The timestamp when the last attempt started (nullable).
+        finished_at (DateTimeField): The timestamp when the job finished or failed (nullable).
+    
+    Meta:
+        indexes: Defines database indexes for optimized queries.
+    """
+
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=JOB_STATUS_CHOICES, default='queued')
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    attempts = models.IntegerField(default=0)
+    locked_by = models.CharField(max_length=100, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    run_after = models.DateTimeField(default=timezone.now)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.id} ({self.status})"
@@ -0,0 +1,187 @@
+"""
+Keyset (seek) pagination for list endpoints.
+
+Pages are selected with a WHERE condition on the ordering columns of the last
+row of the previous page instead of OFFSET, so with an index matching the
+ordering every page costs the same, however deep in the list it is. The
+ordering always ends with a unique column, which makes it a total order:
+rows inserted between requests never cause duplicates or gaps.
+
+When all ordering columns have the same direction the condition is a row value
+comparison, e.g. (date, id) > (%s, %s), which PostgreSQL answers with a single
+index seek. Mixed directions fall back to the equivalent OR expansion.
+
+The cursor is an opaque token holding the ordering values of the last row.
+DRF's CursorPagination only keeps the first ordering column in the cursor and
+skips ties with an offset, which degrades for rankings with many equal points.
+
+Example:
+    GET /api/predictions/?page_size=20
+    {"next": "http://.../api/predictions/?cursor=WyIyMDIz...&page_size=20", "results": [...]}
+"""
+
+import base64
+import datetime
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Field, Func, Q, Value
+from django.db.models.lookups import GreaterThan, LessThan
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class Row(Func):
+    """SQL row value constructor, e.g. (date, id)."""
+    template = '(%(expressions)s)'
+    output_field = Field()
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """
+    JSON encoder of cursor values.
+
+    DjangoJSONEncoder cuts datetimes and times down to milliseconds; a cursor
+    must round-trip exactly, or rows within the same millisecond as the last
+    row of a page are skipped.
+    """
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginates a queryset by the values of `ordering`.
+
+    Attributes:
+        ordering (tuple): Field names ('-' for descending), the last one unique.
+        page_size (int): The default number of rows per page.
+        max_page_size (int): The largest page a client may request with page_size.
+    """
+
+    ordering = ('id',)
+    page_size = 50
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def encode_cursor(self, values):
+        return base64.urlsafe_b64encode(json.dumps(values, cls=CursorEncoder).encode()).decode()
+
+    def decode_cursor(self, request, model):
+        """Returns the ordering values stored in the cursor parameter, or None for the first page."""
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering, values)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def after(self, values, model):
+        """
+        Builds the condition selecting rows after the given ordering values.
+
+        For ordering (a, b) that is (a, b) > (x, y), for ordering (-a, -b) (a, b) < (x, y)
+        and for mixed ordering (a, -b, c) a > x OR (a = x AND b < y) OR (a = x AND b = y AND c > z).
+        """
+        names = [field.lstrip('-') for field in self.ordering]
+        descending = {field.startswith('-') for field in self.ordering}
+        if len(descending) == 1:
+            compare = LessThan if descending.pop() else GreaterThan
+            return compare(
+                Row(*[F(name) for name in names]),
+                Row(*[Value(value, output_field=model._meta.get_field(name)) for name, value in zip(names, values)]),
+            )
+
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            term = Q(**{f"{name}__{lookup}": values[i]})
+            for previous, value in zip(self.ordering[:i], values[:i]):
+                term &= Q(**{previous.lstrip('-'): value})
+            condition |= term
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.after(position, queryset.model))
+
+        rows = list(queryset[:page_size + 1])
+        self.page = rows[:page_size]
+        self.has_next = len(rows) > page_size
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        if isinstance(last, dict):  # values() rows
+            values = [last[field.lstrip('-')] for field in self.ordering]
+        else:
+            values = [getattr(last, field.lstrip('-')) for field in self.ordering]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(values))
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'first': self.get_first_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'first': {'type': 'string', 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class PredictionPagination(KeysetPagination):
+    """Newest predictions first, served by the (user, created_at, id) index."""
+    ordering = ('-created_at', '-id')
+
+
+class FixturePagination(KeysetPagination):
+    """Fixtures by kickoff, served by the (season, status, date, id) index."""
+    ordering = ('date', 'id')
+
+
+class RankingPagination(KeysetPagination):
+    """Group standings by points with tie-breakers, served by the standings ranking index."""
+    ordering = ('-points', '-exact_hits', '-outcome_hits', '-user_id')
+    page_size = 100
+    max_page_size = 500
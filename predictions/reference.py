@@ -0,0 +1,116 @@
+"""
+In-process cache of the reference data: leagues, seasons and teams.
+
+These tables only change during ingestion, yet every fixture row needs its team
+names and the league of its season. reference_data() keeps them in memory as
+id-indexed dicts, so serializers read names with a dict lookup instead of
+joining the tables.
+
+The snapshot is tied to the reference data version (see predictions.versions),
+which the ingestion functions and the League/Season/Team signal receivers bump.
+The version is checked at most every VERSION_CHECK_INTERVAL seconds and a
+bumped version reloads the whole snapshot (three queries). An id missing from
+the snapshot (a row created since, e.g. in the current transaction) also
+forces a reload, so lookups never fail for existing rows.
+
+Teams and leagues are renamed by ingestion and sync jobs in other processes, so
+the version must live in a shared cache. With a process-local cache their bumps
+never arrive, and the snapshot is reloaded every LOCAL_CACHE_MAX_AGE seconds instead.
+
+Example:
+    >>> from predictions.reference import league_data, team_name
+    >>> team_name(fixture.home_team_id)
+    'Legia Warszawa'
+    >>> league_data(season.league_id)
+    {'id': 1, 'name': 'Ekstraklasa', 'country': 'Poland', 'level': 1, 'api_id': 106}
+"""
+
+import threading
+import time
+
+from predictions.models import League, Season, Team
+from predictions.versions import REFERENCE_KEY, current_versions, process_local_cache
+
+
+VERSION_CHECK_INTERVAL = 1.0  # seconds
+LOCAL_CACHE_MAX_AGE = 60.0  # seconds
+
+
+class ReferenceData:
+    """
+    Snapshot of the reference tables.
+
+    Attributes:
+        version (str): The reference data version the snapshot was loaded for.
+        loaded_at (float): time.monotonic() when the snapshot was loaded.
+        leagues (dict): League dicts (as in SeasonSerializer.league) by id.
+        seasons (dict): (league id, year, start year) tuples by id.
+        league_seasons (dict): Season ids of every league id, in id order.
+        teams (dict): Team names by id.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.leagues = {
+            row['id']: row
+            for row in League.objects.order_by('id').values('id', 'name', 'country', 'level', 'api_id')
+        }
+        self.seasons = {}
+        self.league_seasons = {league_id: [] for league_id in self.leagues}
+        for season_id, league_id, year, start_year in (
+            Season.objects.order_by('id').values_list('id', 'league_id', 'year', 'start_year')
+        ):
+            self.seasons[season_id] = (league_id, year, start_year)
+            self.league_seasons[league_id].append(season_id)
+        self.teams = dict(Team.objects.values_list('id', 'name'))
+
+
+_snapshot = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def reference_data(reload=False):
+    """
+    Returns the current reference data snapshot, reloading it after a version bump.
+
+    Args:
+        reload (bool): Reload even if the version didn't change.
+    """
+    global _snapshot, _checked_at
+    now = time.monotonic()
+    snapshot = _snapshot
+    if snapshot is not None and not reload and now - _checked_at < VERSION_CHECK_INTERVAL:
+        return snapshot
+
+    version = current_versions([REFERENCE_KEY])[REFERENCE_KEY]
+    with _lock:
+        expired = (
+            _snapshot is not None and process_local_cache() and now - _snapshot.loaded_at >= LOCAL_CACHE_MAX_AGE
+        )
+        if reload or expired or _snapshot is None or _snapshot.version != version:
+            _snapshot = ReferenceData(version)
+        _checked_at = now
+        return _snapshot
+
+
+def _lookup(attribute, pk):
+    items = getattr(reference_data(), attribute)
+    if pk not in items:
+        items = getattr(reference_data(reload=True), attribute)
+    return items[pk]
+
+
+def team_name(team_id):
+    return _lookup('teams', team_id)
+
+
+def league_data(league_id):
+    """Returns the league as the dict nested in serialized seasons."""
+    return _lookup('leagues', league_id)
+
+
+def season_data(season_id):
+    """Returns the (league id, year, start year) of a season."""
+    return _lookup('seasons', season_id)
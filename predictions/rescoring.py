@@ -0,0 +1,185 @@
+"""
+Vectorized recomputation of points for whole seasons or the whole table.
+
+Used after a change or fix of the scoring rules, when every historical prediction
+has to be rescored. Predictions are streamed in id ranges of `chunk_size` rows as
+plain (id, predicted home, predicted away, fixture id, points) columns, fixture
+results are joined from arrays indexed by fixture id, points are computed with
+NumPy vector operations and written back with one UPDATE ... WHERE id IN (...)
+per distinct points value. Only predictions whose points change are written.
+The UPDATEs bypass the delta maintenance of the group standings, so the standings
+of affected groups are rebuilt and the round snapshots of the rescored seasons
+(see predictions.snapshots) are rewritten at the end.
+
+Chunks can be fanned out to a process pool; every worker opens its own database
+connection, so data must be committed before a run with workers > 1.
+
+Requires:
+    numpy: Imported lazily, the rest of the app doesn't depend on it.
+
+Example:
+    >>> from predictions.rescoring import rescore_predictions
+    >>> rescore_predictions(season=season, workers=4)
+    {'predictions': 1000000, 'changed': 1523}
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db import connections
+from django.db.models import Max, Min
+
+from predictions.models import Fixture, Prediction
+from predictions.snapshots import snapshot_all_rounds
+from predictions.standings import rebuild_standings
+
+
+CHUNK_SIZE = 20_000  # ids per UPDATE stay below the 65535 bind parameters of PostgreSQL
+NO_POINTS = -1  # NULL in the points arrays
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as exc:
+        raise ImportError("Vectorized rescoring requires numpy (pip install numpy).") from exc
+    return numpy
+
+
+def fixture_results(season_id=None):
+    """
+    Loads final scores of finished fixtures into arrays indexed by fixture id.
+
+    Returns:
+        tuple: (home_scores, away_scores, finished) arrays.
+    """
+    np = _numpy()
+    fixtures = Fixture.objects.filter(status='FT', home_score__isnull=False, away_score__isnull=False)
+    if season_id is not None:
+        fixtures = fixtures.filter(season_id=season_id)
+    rows = np.array(list(fixtures.values_list('id', 'home_score', 'away_score')), dtype=np.int64).reshape(-1, 3)
+
+    size = int(Fixture.objects.aggregate(max_id=Max('id'))['max_id'] or 0) + 1
+    home_scores = np.zeros(size, dtype=np.int64)
+    away_scores = np.zeros(size, dtype=np.int64)
+    finished = np.zeros(size, dtype=bool)
+    home_scores[rows[:, 0]] = rows[:, 1]
+    away_scores[rows[:, 0]] = rows[:, 2]
+    finished[rows[:, 0]] = True
+    return home_scores, away_scores, finished
+
+
+def compute_points(predicted_home, predicted_away, home_scores, away_scores, finished):
+    """
+    Applies the rules of Prediction.calculate_points() to whole arrays.
+
+    Returns:
+        ndarray: 3, 1 or 0 points, NO_POINTS for unfinished fixtures.
+    """
+    np = _numpy()
+    exact = (predicted_home == home_scores) & (predicted_away == away_scores)
+    outcome = np.sign(predicted_home - predicted_away) == np.sign(home_scores - away_scores)
+    points = np.where(exact, 3, np.where(outcome, 1, 0))
+    return np.where(finished, points, NO_POINTS)
+
+
+def rescore_chunk(start_id, stop_id, results, season_id=None):
+    """
+    Rescores predictions with start_id <= id < stop_id.
+
+    Args:
+        start_id (int): The first prediction id of the chunk.
+        stop_id (int): The id after the last one of the chunk.
+        results (tuple): Arrays returned by fixture_results().
+        season_id (int): Only rescore predictions of this season.
+
+    Returns:
+        tuple: (number of predictions, number of changed predictions).
+    """
+    np = _numpy()
+    home_scores, away_scores, finished = results
+
+    predictions = Prediction.objects.filter(id__gte=start_id, id__lt=stop_id)
+    if season_id is not None:
+        predictions = predictions.filter(fixture__season_id=season_id)
+    rows = list(predictions.values_list(
+        'id', 'predicted_home_score', 'predicted_away_score', 'fixture_id', 'points_awarded',
+    ))
+    if not rows:
+        return 0, 0
+
+    columns = np.array(
+        [row[:4] + (NO_POINTS if row[4] is None else row[4],) for row in rows], dtype=np.int64,
+    )
+    ids, predicted_home, predicted_away, fixture_ids, current = columns.T
+    scored = np.array([row[4] is not None for row in rows], dtype=bool)
+    points = compute_points(
+        predicted_home, predicted_away,
+        home_scores[fixture_ids], away_scores[fixture_ids], finished[fixture_ids],
+    )
+
+    # a stored NO_POINTS value isn't NULL, it has to be cleared too
+    changed = (points != current) | ((points == NO_POINTS) & scored)
+    for value in np.unique(points[changed]):
+        Prediction.objects.filter(id__in=ids[changed & (points == value)].tolist()).update(
+            points_awarded=None if value == NO_POINTS else int(value)
+        )
+    return len(rows), int(changed.sum())
+
+
+_worker_results = None
+
+
+def _init_worker(results):
+    """Sets up Django in a pool process and keeps the fixture arrays for all its chunks."""
+    global _worker_results
+    import django
+    django.setup()
+    _worker_results = results
+
+
+def _rescore_chunk_in_worker(start_id, stop_id, season_id):
+    return rescore_chunk(start_id, stop_id, _worker_results, season_id)
+
+
+def rescore_predictions(season=None, workers=1, chunk_size=CHUNK_SIZE):
+    """
+    Recomputes the points of all predictions (or of one season) in vectorized chunks.
+
+    Args:
+        season (Season): Only rescore predictions of this season.
+        workers (int): The number of processes rescoring chunks (1 runs in the current process).
+        chunk_size (int): The number of prediction ids per chunk.
+
+    Returns:
+        dict: The number of 'predictions' processed and 'changed' predictions.
+    """
+    season_id = season.pk if season is not None else None
+    predictions = Prediction.objects.all()
+    if season_id is not None:
+        predictions = predictions.filter(fixture__season_id=season_id)
+    bounds = predictions.aggregate(first=Min('id'), last=Max('id'))
+    if bounds['first'] is None:
+        return {'predictions': 0, 'changed': 0}
+
+    results = fixture_results(season_id)
+    starts = range(bounds['first'], bounds['last'] + 1, chunk_size)
+
+    if workers > 1:
+        connections.close_all()  # forked workers mustn't share the parent's connection
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(results,)) as pool:
+            counts = list(pool.map(
+                _rescore_chunk_in_worker,
+                starts,
+                [start + chunk_size for start in starts],
+                [season_id] * len(starts),
+            ))
+    else:
+        counts = [rescore_chunk(start, start + chunk_size, results, season_id) for start in starts]
+
+    changed = sum(chunk_changed for _, chunk_changed in counts)
+    if changed:
+        rebuild_standings(
+            user_group_ids=None if season_id is None else set(predictions.values_list('user_group_id', flat=True))
+        )
+        snapshot_all_rounds(season_ids=None if season_id is None else [season_id])
+    return {'predictions': sum(count for count, _ in counts), 'changed': changed}
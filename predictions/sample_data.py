@@ -0,0 +1,85 @@
+"""
+Throwaway sample data and measurement helpers for the benchmark scripts and the tests.
+
+Sample leagues, teams and fixtures use negative api_ids, which API-Football never
+assigns, so they can't collide with ingested rows. Scripts that run against a
+development database create them inside rolled_back(), which leaves nothing behind.
+
+Example:
+    >>> with rolled_back():
+    ...     season = create_season(-5, "Serializer benchmark")
+    ...     teams = create_teams(20, first_api_id=-5001)
+    ...     fixtures = Fixture.objects.bulk_create([sample_fixture(season, teams, i, -50_000) for i in range(100)])
+    ...     _, queries, seconds = measure(serialize_fixtures, fixture_values(season.fixtures.all()), context)
+"""
+
+import time
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from predictions.models import League, Season, Team, Fixture, UserGroup
+
+
+class Rollback(Exception):
+    """Raised at the end of rolled_back() to roll its transaction back."""
+
+
+@contextmanager
+def rolled_back():
+    """Runs the block in a transaction that is always rolled back."""
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+def measure(func, *args):
+    """Runs func and returns (result, number of queries, seconds)."""
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - started
+    return result, len(queries), elapsed
+
+
+def create_season(league_api_id, name):
+    """Creates a sample league and its 2023-2024 season."""
+    league = League.objects.create(name=name, country="Sample", level=1, api_id=league_api_id)
+    return Season.objects.create(league=league, year="2023-2024", start_year=2023)
+
+
+def create_teams(count, first_api_id, name="Sample team"):
+    """Creates `count` teams with api_ids counting down from first_api_id."""
+    return Team.objects.bulk_create([Team(name=f"{name} {i}", api_id=first_api_id - i) for i in range(count)])
+
+
+def create_group(season, access_code, members=()):
+    """Creates a group of the season with the given members."""
+    user_group = UserGroup.objects.create(name=access_code, access_code=access_code, season=season)
+    if members:
+        user_group.members.add(*members)
+    return user_group
+
+
+def sample_fixture(season, teams, i, first_api_id, **fields):
+    """
+    Returns the i-th unsaved sample fixture of the season.
+
+    The teams play in turns and the api_id counts down from first_api_id;
+    `fields` override any attribute (status, scores, round, date...).
+    """
+    attributes = {
+        'season': season,
+        'date': timezone.now(),
+        'home_team': teams[i % len(teams)],
+        'away_team': teams[(i + 1) % len(teams)],
+        'status': 'NS',
+        'api_id': first_api_id - i,
+    }
+    attributes.update(fields)
+    return Fixture(**attributes)
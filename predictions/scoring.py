@@ -0,0 +1,140 @@
+"""
+Set-based scoring of predictions.
+
+Prediction.calculate_points() is the reference implementation of the scoring
+rules, but it needs two queries per prediction (fixture lookup and save). The
+functions here apply the same rules to any number of predictions with a single
+UPDATE ... FROM joining predictions to their fixtures:
+    - exact score: 3
+    - correct outcome (win/loss/draw): 1
+    - otherwise: 0
+
+The outcome rule compares SIGN(home - away) of the prediction and of the result,
+which is equivalent to the product/draw test of calculate_points().
+ScoringEquivalenceTests (predictions/tests.py) compares both implementations on every score combination.
+
+Besides the global pass over unscored predictions, score_fixtures() rescores
+only the predictions of given fixtures. Ingestion, the live poller and the admin
+call it when a fixture reaches FT, leaves FT or its final score is corrected
+(see result_changed), so corrections also update already awarded points.
+Both queries also update the group standings by delta (see predictions.standings).
+Fixtures that close their round without a result (CANC, PST, see closes_round)
+aren't rescored, so their callers snapshot the round themselves.
+
+Example:
+    >>> from predictions.scoring import score_pending_predictions, score_fixtures
+    >>> score_pending_predictions()
+    1048576
+    >>> score_fixtures([fixture.id])
+    42
+"""
+
+from django.db import connection
+
+from predictions.models import Fixture, Prediction
+from predictions.snapshots import snapshot_finished_rounds
+from predictions.standings import with_standing_deltas
+from predictions.versions import bump_standings
+
+
+POINTS_SQL = """
+    CASE
+        WHEN p.predicted_home_score = f.home_score AND p.predicted_away_score = f.away_score THEN 3
+        WHEN SIGN(p.predicted_home_score - p.predicted_away_score) = SIGN(f.home_score - f.away_score) THEN 1
+        ELSE 0
+    END
+"""
+
+# points of a prediction, NULL until the fixture is finished with a known score
+FINAL_POINTS_SQL = f"""
+    CASE
+        WHEN f.status = 'FT' AND f.home_score IS NOT NULL AND f.away_score IS NOT NULL THEN {POINTS_SQL}
+    END
+"""
+
+RESULT_FIELDS = ['status', 'home_score', 'away_score']
+
+SCORE_PENDING_SQL = with_standing_deltas(f"""
+    UPDATE {Prediction._meta.db_table} AS p
+    SET points_awarded = {POINTS_SQL}
+    FROM {Fixture._meta.db_table} AS f
+    WHERE p.fixture_id = f.id
+        AND p.points_awarded IS NULL
+        AND f.status = 'FT'
+        AND f.home_score IS NOT NULL
+        AND f.away_score IS NOT NULL
+    RETURNING p.user_group_id, p.user_id, p.fixture_id, NULL::integer AS old_points, p.points_awarded AS new_points
+""")
+
+
+def score_pending_predictions():
+    """
+    Awards points to all unscored predictions of finished fixtures with one UPDATE
+    and adds them to the group standings in the same statement. Rounds of the
+    scored fixtures that are over are snapshotted (see predictions.snapshots).
+
+    Returns:
+        int: The number of scored predictions.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(SCORE_PENDING_SQL)
+        scored, user_group_ids, fixture_ids = cursor.fetchone()
+    bump_standings(user_group_ids)
+    snapshot_finished_rounds(fixture_ids)
+    return scored
+
+
+# the second scan of the prediction table ("old") sees the points from before the update
+SCORE_FIXTURES_SQL = with_standing_deltas(f"""
+    UPDATE {Prediction._meta.db_table} AS p
+    SET points_awarded = {FINAL_POINTS_SQL}
+    FROM {Fixture._meta.db_table} AS f, {Prediction._meta.db_table} AS old
+    WHERE p.fixture_id = f.id
+        AND old.id = p.id
+        AND f.id = ANY(%s)
+        AND p.points_awarded IS DISTINCT FROM {FINAL_POINTS_SQL}
+    RETURNING
+        p.user_group_id, p.user_id, p.fixture_id, old.points_awarded AS old_points, p.points_awarded AS new_points
+""")
+
+
+def result_changed(previous, current):
+    """
+    Tells whether a fixture change affects the points of its predictions.
+
+    Args:
+        previous (tuple): (status, home_score, away_score) before the change, None for a new fixture.
+        current (tuple): (status, home_score, away_score) after the change.
+
+    Returns:
+        bool: True if the fixture reached or left FT, or its final score changed.
+    """
+    if previous is None:  # a new fixture has no predictions yet
+        return False
+    return tuple(previous) != tuple(current) and 'FT' in (previous[0], current[0])
+
+
+def score_fixtures(fixture_ids):
+    """
+    Recomputes the points of all predictions of the given fixtures with one UPDATE.
+
+    Predictions of fixtures that aren't finished get NULL points. Only rows whose
+    points actually change are written, and their differences are applied to the
+    group standings in the same statement. Rounds that are over afterwards are
+    snapshotted (see predictions.snapshots).
+
+    Args:
+        fixture_ids (iterable): Primary keys of the fixtures.
+
+    Returns:
+        int: The number of predictions whose points changed.
+    """
+    fixture_ids = list(fixture_ids)
+    if not fixture_ids:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(SCORE_FIXTURES_SQL, [fixture_ids])
+        changed, user_group_ids, _ = cursor.fetchone()
+    bump_standings(user_group_ids)
+    snapshot_finished_rounds(fixture_ids)
+    return changed
@@ -0,0 +1,257 @@
+"""Benchmark of fixture ingestion paths on synthetic API-Football payloads.
+
+Every measurement runs inside a transaction that is rolled back, so the
+benchmark can be run against a development database without leaving data behind.
+
+Example:
+    python manage.py runscript bench_ingestion
+    python manage.py runscript bench_ingestion --script-args 10 100 1000
+    python manage.py runscript bench_ingestion --script-args memory 1000 10000 50000
+    python manage.py runscript bench_ingestion --script-args standin 20 0.05
+
+The standin mode runs the real fetch-and-save functions against the in-process
+API-Football stand-in (see predictions.api_standin): the arguments are the number
+of synthetic leagues and the latency of every response in seconds.
+"""
+
+import json
+import os
+import tempfile
+import tracemalloc
+from datetime import datetime, timezone as dt_timezone
+
+from django.test.utils import override_settings
+from predictions.models import League, Season, Team, Fixture
+from predictions.ingestion import parse_fixture, bulk_upsert_fixtures
+from predictions.json_stream import iter_array_items, batched
+from predictions.api_football import client
+from predictions.api_standin import Faults, Standin, StandinData, standin_transport
+from predictions.scripts.fetch_fixtures import save_fixtures_to_db
+from predictions.utils import (
+    fetch_and_save_fixtures_for_seasons, fetch_and_save_teams_from_api, fetch_and_save_teams_for_seasons,
+)
+from predictions.sample_data import create_season, create_teams, measure, rolled_back
+
+BENCH_LEAGUE_API_ID = -1
+BENCH_SPLIT_DATE = "2023-10-02"
+
+
+def make_fixture_payload(count, team_api_ids, first_api_id=1):
+    """
+    Builds a synthetic /fixtures 'response' list.
+
+    Args:
+        count (int): The number of fixtures.
+        team_api_ids (list): api_ids of the teams playing the fixtures.
+        first_api_id (int): api_id of the first fixture.
+
+    Returns:
+        list: Items shaped like the API-Football /fixtures response.
+    """
+    payload = []
+    teams = len(team_api_ids)
+    for i in range(count):
+        round_number = i // (teams // 2) + 1
+        payload.append({
+            'fixture': {
+                'id': first_api_id + i,
+                'date': f"2023-{8 + round_number // 5 % 5:02d}-{round_number % 28 + 1:02d}T18:00:00+00:00",
+            },
+            'league': {'round': f"Regular Season - {round_number}"},
+            'teams': {
+                'home': {'id': team_api_ids[i % teams]},
+                'away': {'id': team_api_ids[(i + 1) % teams]},
+            },
+            'goals': {'home': i % 4, 'away': i % 3},
+        })
+    return payload
+
+
+def create_bench_season(teams=18):
+    """Creates a throwaway league, season and teams used by the benchmark."""
+    season = create_season(BENCH_LEAGUE_API_ID, "Benchmark")
+    return season, [team.api_id for team in create_teams(teams, first_api_id=-1, name="Team")]
+
+
+def save_per_row(season, fixtures, split_date):
+    """The original ingestion loop: two team lookups and update_or_create per fixture."""
+    count = 0
+    for fixture_info in fixtures:
+        data = parse_fixture(fixture_info, split_date)
+        if data is None:
+            continue
+        try:
+            home_team = Team.objects.get(api_id=data['home_team_api_id'])
+            away_team = Team.objects.get(api_id=data['away_team_api_id'])
+        except Team.DoesNotExist:
+            continue
+        Fixture.objects.update_or_create(
+            api_id=data['api_id'],
+            defaults={
+                'season': season,
+                'date': data['date'],
+                'home_team': home_team,
+                'away_team': away_team,
+                'home_score': data['home_score'],
+                'away_score': data['away_score'],
+                'status': data['status'],
+                'round': data['round'],
+                'round_name': data['round_name'],
+            }
+        )
+        count += 1
+    return count
+
+
+def bench_fixture_paths(sizes):
+    """Prints queries and time of the per-row and bulk paths for every batch size."""
+    print(f"{'path':<10}{'fixtures':>10}{'queries':>10}{'q/fixture':>12}{'fixtures/s':>14}")
+    for size in sizes:
+        for name, func in (('per-row', save_per_row), ('bulk', bulk_upsert_fixtures)):
+            with rolled_back():
+                season, team_api_ids = create_bench_season()
+                payload = make_fixture_payload(size, team_api_ids, first_api_id=-10_000_000)
+                _, queries, elapsed = measure(func, season, payload, BENCH_SPLIT_DATE)
+            print(f"{name:<10}{size:>10}{queries:>10}{queries / size:>12.3f}{size / elapsed:>14.0f}")
+
+
+def write_recorded_payload(path, count, team_api_ids):
+    """Writes a /fixtures body of `count` fixtures shaped like a recorded API-Football response."""
+    body = {
+        'get': 'fixtures',
+        'parameters': {'league': str(BENCH_LEAGUE_API_ID), 'season': '2023'},
+        'errors': [],
+        'results': count,
+        'paging': {'current': 1, 'total': 1},
+        'response': make_fixture_payload(count, team_api_ids, first_api_id=-10_000_000),
+    }
+    with open(path, 'w') as f:
+        json.dump(body, f)
+
+
+def load_and_save(path, season):
+    """Loads the whole body like response.json() does and saves it in one batch."""
+    with open(path, 'rb') as f:
+        fixtures = json.load(f)['response']
+    return bulk_upsert_fixtures(season, fixtures, BENCH_SPLIT_DATE)
+
+
+def stream_and_save(path, season, batch_size=500):
+    """Parses the body item by item and saves it in batches."""
+    with open(path, 'rb') as f:
+        for batch in batched(iter_array_items(iter(lambda: f.read(64 * 1024), b'')), batch_size):
+            bulk_upsert_fixtures(season, batch, BENCH_SPLIT_DATE)
+
+
+def bench_memory(sizes):
+    """Prints the peak Python memory of full and streaming parsing for every payload size."""
+    print(f"{'path':<10}{'fixtures':>10}{'payload MB':>12}{'peak MB':>10}")
+    with tempfile.TemporaryDirectory() as directory, override_settings(DEBUG=False):  # DEBUG keeps every SQL in memory
+        for size in sizes:
+            for name, func in (('load', load_and_save), ('stream', stream_and_save)):
+                with rolled_back():
+                    season, team_api_ids = create_bench_season()
+                    path = os.path.join(directory, f"fixtures-{size}.json")
+                    if not os.path.exists(path):
+                        write_recorded_payload(path, size, team_api_ids)
+                    tracemalloc.start()
+                    func(path, season)
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                payload_mb = os.path.getsize(path) / 2**20
+                print(f"{name:<10}{size:>10}{payload_mb:>12.1f}{peak / 2**20:>10.1f}")
+
+
+STANDIN_SEASON_YEAR = 2023
+STANDIN_NOW = datetime(2023, 10, 2, 12, tzinfo=dt_timezone.utc)
+
+
+def create_standin_seasons(data):
+    """Creates the leagues and seasons served by a StandinData."""
+    leagues = League.objects.bulk_create([
+        League(name=f"Stand-in {api_id}", country="Stand-in", level=1, api_id=api_id)
+        for api_id in data.league_api_ids
+    ])
+    seasons = Season.objects.bulk_create([
+        Season(league=league, year=f"{STANDIN_SEASON_YEAR}-{STANDIN_SEASON_YEAR + 1}", start_year=STANDIN_SEASON_YEAR)
+        for league in leagues
+    ])
+    for season, league in zip(seasons, leagues):
+        season.league = league
+    return seasons
+
+
+def fixtures_per_row(seasons):
+    for season in seasons:
+        save_fixtures_to_db(season.league.api_id, STANDIN_SEASON_YEAR, "2023-01-01", "2024-12-31", BENCH_SPLIT_DATE)
+
+
+def fixtures_bulk(seasons):
+    for season in seasons:
+        save_fixtures_to_db(season.league.api_id, STANDIN_SEASON_YEAR, "2023-01-01", "2024-12-31", BENCH_SPLIT_DATE,
+                            bulk=True)
+
+
+def fixtures_stream(seasons):
+    for season in seasons:
+        save_fixtures_to_db(season.league.api_id, STANDIN_SEASON_YEAR, "2023-01-01", "2024-12-31", BENCH_SPLIT_DATE,
+                            stream=True)
+
+
+def fixtures_concurrent(seasons):
+    fetch_and_save_fixtures_for_seasons(seasons, "2023-01-01", "2024-12-31", BENCH_SPLIT_DATE)
+
+
+def teams_per_row(seasons):
+    for season in seasons:
+        fetch_and_save_teams_from_api(season.league.api_id, STANDIN_SEASON_YEAR)
+
+
+def teams_bulk(seasons):
+    fetch_and_save_teams_for_seasons(seasons, bulk=True)
+
+
+def bench_standin(leagues, latency):
+    """
+    Prints throughput and queries of every ingestion path fetching from the stand-in.
+
+    Fixture paths run on seasons whose teams are already saved, so only fixture
+    writes are measured; the teams are saved outside of the measurement.
+    """
+    data = StandinData(leagues=leagues, season_years=[STANDIN_SEASON_YEAR], now=STANDIN_NOW)
+    standin = Standin(data, faults=Faults(latency=latency))
+    paths = (
+        ('teams', 'per-row', teams_per_row),
+        ('teams', 'bulk', teams_bulk),
+        ('fixtures', 'per-row', fixtures_per_row),
+        ('fixtures', 'bulk', fixtures_bulk),
+        ('fixtures', 'stream', fixtures_stream),
+        ('fixtures', 'parallel', fixtures_concurrent),
+    )
+
+    print(f"{leagues} leagues, {latency * 1000:.0f} ms latency")
+    print(f"{'resource':<10}{'path':<10}{'rows':>8}{'queries':>10}{'q/row':>8}{'rows/s':>10}")
+    with standin_transport(client, standin), override_settings(DEBUG=False):
+        for resource, name, func in paths:
+            with rolled_back():
+                seasons = create_standin_seasons(data)
+                if resource == 'fixtures':
+                    teams_bulk(seasons)
+                _, queries, elapsed = measure(func, seasons)
+                model = Fixture if resource == 'fixtures' else Team
+                rows = model.objects.filter(season__in=seasons).count()
+            print(f"{resource:<10}{name:<10}{rows:>8}{queries:>10}{queries / max(rows, 1):>8.3f}{rows / elapsed:>10.0f}")
+
+
+def run(*args):
+    """Entry point for django-extensions runscript."""
+    if args and args[0] == 'memory':
+        bench_memory([int(arg) for arg in args[1:]] or [1000, 10000, 50000])
+        return
+    if args and args[0] == 'standin':
+        leagues = int(args[1]) if len(args) > 1 else 5
+        latency = float(args[2]) if len(args) > 2 else 0.05
+        bench_standin(leagues, latency)
+        return
+    sizes = [int(arg) for arg in args] or [10, 100, 1000]
+    bench_fixture_paths(sizes)
@@ -0,0 +1,103 @@
+"""Benchmark of prediction scoring engines.
+
+Creates a throwaway league with `fixtures` finished fixtures and `predictions`
+predictions spread over them, rescores them with every engine and deletes
+everything afterwards. The data is committed, because process pool workers of
+the vectorized engine use their own database connections. The per-instance path
+(Prediction.calculate_points) is measured on at most PER_INSTANCE_LIMIT predictions.
+
+Example:
+    python manage.py runscript bench_scoring
+    python manage.py runscript bench_scoring --script-args 1000000 4
+"""
+
+import random
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.test.utils import override_settings
+from predictions.models import League, Team, Fixture, UserGroup, Prediction
+from predictions.scoring import score_fixtures
+from predictions.rescoring import rescore_predictions
+from predictions.sample_data import create_group, create_season, create_teams, measure, sample_fixture
+
+BENCH_LEAGUE_API_ID = -3
+PER_INSTANCE_LIMIT = 10_000
+FIXTURES = 380
+USERS = 50
+
+
+def create_bench_predictions(count, seed=0):
+    """Creates finished fixtures and `count` predictions of USERS users in one group."""
+    rng = random.Random(seed)
+    season = create_season(BENCH_LEAGUE_API_ID, "Scoring benchmark")
+    teams = create_teams(2, first_api_id=-3001, name="Bench team")
+    users = User.objects.bulk_create([User(username=f"scoring-bench-{i}") for i in range(USERS)])
+    user_group = create_group(season, "scoring-bench")
+
+    fixtures = Fixture.objects.bulk_create([
+        sample_fixture(
+            season, teams, i, first_api_id=-30_000,
+            home_score=rng.randint(0, 4), away_score=rng.randint(0, 4), status='FT',
+        )
+        for i in range(FIXTURES)
+    ])
+
+    # (user, group, fixture) is unique, so every user predicts a different fixture in each of many groups
+    groups_needed = -(-count // (USERS * FIXTURES))
+    groups = [user_group] + UserGroup.objects.bulk_create([
+        UserGroup(name=f"Scoring benchmark {i}", access_code=f"scoring-bench-{i}", season=season)
+        for i in range(1, groups_needed)
+    ])
+    keys = ((user, group, fixture) for group in groups for user in users for fixture in fixtures)
+    Prediction.objects.bulk_create(
+        (
+            Prediction(
+                user=user, user_group=group, fixture=fixture,
+                predicted_home_score=rng.randint(0, 4), predicted_away_score=rng.randint(0, 4),
+            )
+            for user, group, fixture in islice(keys, count)
+        ),
+        batch_size=5000,
+    )
+    return season, fixtures
+
+
+def delete_bench_predictions():
+    League.objects.filter(api_id=BENCH_LEAGUE_API_ID).delete()
+    UserGroup.objects.filter(access_code__startswith="scoring-bench").delete()
+    User.objects.filter(username__startswith="scoring-bench-").delete()
+    Team.objects.filter(api_id__in=[-3001, -3002]).delete()
+
+
+def per_instance(season):
+    predictions = Prediction.objects.filter(fixture__season=season).select_related('fixture')[:PER_INSTANCE_LIMIT]
+    for prediction in predictions:
+        prediction.calculate_points()
+    return len(predictions)
+
+
+def run(*args):
+    """Entry point for django-extensions runscript."""
+    count = int(args[0]) if args else 100_000
+    workers = int(args[1]) if len(args) > 1 else 4
+
+    with override_settings(DEBUG=False):
+        delete_bench_predictions()
+        try:
+            season, fixtures = create_bench_predictions(count)
+            fixture_ids = [fixture.id for fixture in fixtures]
+            engines = (
+                ('per-instance', per_instance, season),
+                ('sql', score_fixtures, fixture_ids),
+                ('numpy', lambda season: rescore_predictions(season)['predictions'], season),
+                (f'numpy x{workers}', lambda season: rescore_predictions(season, workers)['predictions'], season),
+            )
+
+            print(f"{'engine':<14}{'predictions':>12}{'queries':>10}{'seconds':>10}{'predictions/s':>16}")
+            for name, func, arg in engines:
+                Prediction.objects.filter(fixture__season=season).update(points_awarded=None)
+                scored, queries, elapsed = measure(func, arg)
+                print(f"{name:<14}{scored:>12}{queries:>10}{elapsed:>10.2f}{scored / elapsed:>16.0f}")
+        finally:
+            delete_bench_predictions()
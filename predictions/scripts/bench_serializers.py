@@ -0,0 +1,106 @@
+"""Benchmark of the DRF serializers against the values() fast path.
+
+Creates a throwaway season with `fixtures` fixtures and a prediction of the user
+for every other fixture, serializes fixtures and predictions with both paths,
+checks that the rendered JSON is byte-identical and prints rows per second.
+Everything runs inside a transaction that is rolled back.
+
+Example:
+    python manage.py runscript bench_serializers
+    python manage.py runscript bench_serializers --script-args 5000
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test.utils import override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+from predictions.models import Fixture, Prediction
+from predictions.serializers import FixtureSerializer, PredictionSerializer
+from predictions.fast_serializers import fixture_values, prediction_values, serialize_fixtures, serialize_predictions
+from predictions.sample_data import create_group, create_season, create_teams, measure, rolled_back, sample_fixture
+
+BENCH_LEAGUE_API_ID = -5
+TEAMS = 20
+
+
+def create_bench_fixtures(count):
+    """Creates `count` fixtures and predictions for every other one; returns the user and the group."""
+    season = create_season(BENCH_LEAGUE_API_ID, "Serializer benchmark")
+    teams = create_teams(TEAMS, first_api_id=-5001, name="Bench team")
+    user = User.objects.create(username="serializer-bench")
+    user_group = create_group(season, "serializer-bench", members=[user])
+
+    kickoff = timezone.now()
+    fixtures = Fixture.objects.bulk_create(
+        [
+            sample_fixture(
+                season, teams, i, first_api_id=-50_000, date=kickoff + timedelta(hours=i),
+                round=i // 10 + 1, round_name=f"Regular Season - {i // 10 + 1}",
+            )
+            for i in range(count)
+        ],
+        batch_size=5000,
+    )
+    Prediction.objects.bulk_create(
+        [
+            Prediction(user=user, user_group=user_group, fixture=fixture, predicted_home_score=2, predicted_away_score=1)
+            for fixture in fixtures[::2]
+        ],
+        batch_size=5000,
+    )
+    return user, user_group
+
+
+def make_request(user, user_group):
+    request = APIRequestFactory().get('/api/fixtures/', {'access_code': user_group.access_code})
+    force_authenticate(request, user)
+    request.user = user
+    return Request(request)
+
+
+def render(func):
+    """Runs func and returns its data rendered to JSON."""
+    return JSONRenderer().render(func())
+
+
+def run(*args):
+    """Entry point for django-extensions runscript."""
+    count = int(args[0]) if args else 2000
+    identical = True
+
+    with override_settings(DEBUG=False):
+        with rolled_back():
+            user, user_group = create_bench_fixtures(count)
+            request = make_request(user, user_group)
+            context = {'request': request}
+            fixtures = Fixture.objects.filter(season=user_group.season).order_by('date', 'id')
+            predictions = Prediction.objects.filter(user=user).order_by('-created_at', '-id')
+
+            paths = (
+                ('fixtures', 'serializer', lambda: FixtureSerializer(
+                    fixtures.select_related('season'),
+                    many=True, context=context,
+                ).data),
+                ('fixtures', 'fast', lambda: serialize_fixtures(fixture_values(fixtures), context)),
+                ('predictions', 'serializer', lambda: PredictionSerializer(
+                    predictions.select_related('user', 'fixture__season'),
+                    many=True, context=context,
+                ).data),
+                ('predictions', 'fast', lambda: serialize_predictions(prediction_values(predictions), context)),
+            )
+
+            print(f"{'list':<13}{'path':<12}{'rows':>8}{'queries':>10}{'seconds':>10}{'rows/s':>12}")
+            rendered = {}
+            for name, path, func in paths:
+                content, queries, elapsed = measure(render, func)
+                rows = fixtures.count() if name == 'fixtures' else predictions.count()
+                print(f"{name:<13}{path:<12}{rows:>8}{queries:>10}{elapsed:>10.3f}{rows / elapsed:>12.0f}")
+                if name in rendered and rendered[name] != content:
+                    identical = False
+                    print(f"FAILED: the fast path renders different {name} JSON")
+                rendered[name] = content
+    print("OK" if identical else "FAILED")
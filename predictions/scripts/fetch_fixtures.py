@@ -8,11 +8,11 @@ Example:
 
 
 from predictions.models import Season,  Team, Fixture
-import requests
-from decouple import config
-
-API_KEY = config('API_FOOTBALL_KEY')
-API_URL = "https://v3.football.api-sports.io"
+from predictions.ingestion import parse_fixture, bulk_upsert_fixtures
+from predictions.api_football import get_json, stream_json
+from predictions.json_stream import batched
+from predictions.scoring import RESULT_FIELDS, result_changed, score_fixtures
+from predictions.snapshots import closes_round, snapshot_finished_rounds
 
 def fetch_fixtures(league_id, season_year, start_date, end_date):
     """
@@ -27,21 +27,47 @@ def fetch_fixtures(league_id, season_year, start_date, end_date):
         split_date (str): The date simulating today in "YYYY-MM-DD" format - only in demo version without payment plan.
         
     Returns:
-        int: The number of fixtures added to the database.
+        list: Items of the API-Football /fixtures 'response' list.
+        0 for seasons outside of the demo version or an empty date range.
+
+    Raises:
+        ApiFootballError: If the request fails after retries.
     """
     if season_year not in [2021, 2022, 2023]:
         return 0    #in main app it will be deleted
     
-    headers = {'x-apisports-key': API_KEY}
     params = {'league': league_id, 'season': season_year, 'from': start_date, 'to': end_date}
-    response = requests.get(f"{API_URL}/fixtures", headers=headers, params=params)
+    data = get_json('/fixtures', params)
     
-    if response.status_code != 200 or not response.json().get('response'):
+    if not data.get('response'):
         return 0
     
-    return response.json().get('response', [])
+    return data['response']
+
+def stream_fixtures(league_id, season_year, start_date, end_date):
+    """
+    Streams fixtures for a given league and season from API-Football from a given date range.
+    Unlike fetch_fixtures the response is parsed item by item, so it is never held in memory as a whole.
+
+    Args:
+        league_id (int): The ID of the league (e.g., 106 for Ekstraklasa).
+        season_year (int): The starting year of the season (e.g., 2023 for 2023-2024).
+        start_date (str): The start date in "YYYY-MM-DD" format.
+        end_date (str): The end date in "YYYY-MM-DD" format.
+
+    Yields:
+        dict: Items of the API-Football /fixtures 'response' list.
+
+    Raises:
+        ApiFootballError: If the request fails after retries.
+    """
+    if season_year not in [2021, 2022, 2023]:
+        return    #in main app it will be deleted
+
+    params = {'league': league_id, 'season': season_year, 'from': start_date, 'to': end_date}
+    yield from stream_json('/fixtures', params)
 
-def save_fixtures_to_db(league_id, season_year, start_date, end_date, split_date):    
+def save_fixtures_to_db(league_id, season_year, start_date, end_date, split_date, bulk=False, stream=False, batch_size=500):    
     """
     Fetches and saves fixtures for a given league and season from API-Football from a given date range to the database.
     
@@ -50,7 +76,28 @@ def save_fixtures_to_db(league_id, season_year, start_date, end_date, split_date
         season_year (int): The starting year of the season (e.g., 2023 for 2023-2024).
         start_date (str): The start date in "YYYY-MM-DD" format.
         end_date (str): The end date in "YYYY-MM-DD" format.
-        split_date (str): The date simulating today in "YYYY-MM-DD" format - only in demo version without payment plan."""
+        split_date (str): The date simulating today in "YYYY-MM-DD" format - only in demo version without payment plan.
+        bulk (bool): Writes the whole response with a constant number of queries (see predictions.ingestion).
+        stream (bool): Parses the response item by item and bulk writes it in batches of batch_size,
+            so peak memory doesn't depend on the size of the date range.
+        batch_size (int): The number of fixtures written at once in stream mode.
+
+    Returns:
+        int: The number of fixtures saved.
+        dict: Numbers of 'inserted', 'updated', 'unchanged' and 'skipped' fixtures when bulk or stream is True.
+    """
+
+    if stream:
+        try:
+            season = Season.objects.get(league__api_id=league_id, start_year=season_year)
+        except Season.DoesNotExist:
+            return 0
+
+        totals = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
+        for batch in batched(stream_fixtures(league_id, season_year, start_date, end_date), batch_size):
+            for name, value in bulk_upsert_fixtures(season, batch, split_date).items():
+                totals[name] += value
+        return totals
     
 
     fixtures = fetch_fixtures(league_id, season_year, start_date, end_date)
@@ -61,62 +108,59 @@ def save_fixtures_to_db(league_id, season_year, start_date, end_date, split_date
         season = Season.objects.get(league__api_id=league_id, start_year=season_year)
     except Season.DoesNotExist:
         return 0
+
+    if bulk:
+        return bulk_upsert_fixtures(season, fixtures, split_date)
     
     count = 0
+    previous_results = {
+        row['api_id']: [row[name] for name in RESULT_FIELDS]
+        for row in Fixture.objects.filter(
+            api_id__in=[fixture_info.get('fixture', {}).get('id') for fixture_info in fixtures]
+        ).values('api_id', *RESULT_FIELDS)
+    }
+    rescore_ids = []
+    closed_ids = []
 
     for fixture_info in fixtures:
-        fixture_data = fixture_info.get('fixture', {})
-        teams_data = fixture_info.get('teams', {})
-        goals_data = fixture_info.get('goals', {})
-        league_data = fixture_info.get('league', {})
-        
-        home_team_data = teams_data.get('home', {})
-        away_team_data = teams_data.get('away', {})
+        data = parse_fixture(fixture_info, split_date)
+        if data is None:
+            continue
+
         try:        
-            home_team = Team.objects.get(api_id=home_team_data.get('id'))
+            home_team = Team.objects.get(api_id=data['home_team_api_id'])
         except Team.DoesNotExist:
             continue
         try:
-            away_team = Team.objects.get(api_id=away_team_data.get('id'))
+            away_team = Team.objects.get(api_id=data['away_team_api_id'])
         except Team.DoesNotExist:
             continue
-    
-        if fixture_data.get('date'):  
-            if fixture_data.get('date')[:10] > split_date: # in demo version without payment plan
-                status = 'NS'
-                home_score = None
-                away_score = None
-            else:
-                status = 'FT'
-                home_score = goals_data.get('home')
-                away_score = goals_data.get('away')
-        else:
-            continue
-        
-        if league_data.get('round'):
-            try:
-                round=int(league_data.get('round').split('-')[-1].strip())
-            except ValueError:
-                round=None
-        else:
-            round=None
             
-        Fixture.objects.update_or_create(
-            api_id=fixture_data.get('id'),
+        fixture, _ = Fixture.objects.update_or_create(
+            api_id=data['api_id'],
             defaults={
                 'season': season,
-                'date': fixture_data.get('date'),
+                'date': data['date'],
                 'home_team': home_team,
                 'away_team': away_team,
-                'home_score': home_score,
-                'away_score': away_score,
-                'status': status,
-                'round': round,
-                'round_name': league_data.get('round'),
+                'home_score': data['home_score'],
+                'away_score': data['away_score'],
+                'status': data['status'],
+                'round': data['round'],
+                'round_name': data['round_name'],
+                'payload_hash': data['payload_hash'],
                 
             }
         )
+        previous = previous_results.get(data['api_id'])
+        if result_changed(previous, [data[name] for name in RESULT_FIELDS]):
+            rescore_ids.append(fixture.id)
+        elif previous is not None and closes_round(previous[0], data['status']):
+            closed_ids.append(fixture.id)
         count += 1
+
+    score_fixtures(rescore_ids)
+    snapshot_finished_rounds(closed_ids)
     return count
 
 def run():
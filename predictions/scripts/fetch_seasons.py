@@ -8,45 +8,36 @@ Example:
     python manage.py runscript fetch_seasons
 """
 
-import requests
-from decouple import config
-from predictions.models import Season, League
+from predictions.ingestion import seed_seasons
+from predictions.api_football import get_json
 
 
-API_KEY = config('API_FOOTBALL_KEY')
-API_URL = "https://v3.football.api-sports.io"
-
 def fetch_seasons():
     """
     Fetches available seasons from API-Football.
     
     Returns:
         list: A list of seasons years (e.g. [2008, ..., 2027]) 
-        Empty list if request fails.
+
+    Raises:
+        ApiFootballError: If the request fails after retries.
     """
     
-    headers = {'x-apisports-key': API_KEY}
-    response = requests.get(f"{API_URL}/leagues/seasons", headers=headers)
-    if response.status_code == 200:
-        return response.json().get('response')
-    else:
-        return []
+    return get_json('/leagues/seasons').get('response', [])
     
 def save_seasons_to_db():
     """ 
-    Saves selected seasons (2021, 2022, 2023) to the database.
+    Saves selected seasons (2021, 2022, 2023) of all leagues to the database.
+    Missing seasons are found and inserted with a constant number of queries (see seed_seasons).
      
     Returns:
-        None
+        int: The number of seasons created.
     """
 
-    leagues = League.objects.all()
     seasons = fetch_seasons()
     seasons = [year for year in seasons if year in [2021, 2022, 2023]]
 
-    for league in leagues:
-        for year in seasons:
-            Season.objects.get_or_create(league=league, start_year=year, defaults={'year':f"{year}-{year+1}"})
+    return seed_seasons(seasons)
 
 def run():
     """Entry point for django-extensions runscript."""
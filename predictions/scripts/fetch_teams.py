@@ -8,12 +8,10 @@ Example:
     python manage.py runscript fetch_teams
 """
 
-import requests
-from decouple import config
-from predictions.models import Season, League, Team
-
-API_KEY = config('API_FOOTBALL_KEY')
-API_URL = "https://v3.football.api-sports.io"
+from predictions.models import Season
+from predictions.ingestion import bulk_upsert_teams
+from predictions.fetch_executor import FetchExecutor
+from predictions.api_football import get_json
 
 def fetch_teams(league_id, season_year):
     """
@@ -25,40 +23,31 @@ def fetch_teams(league_id, season_year):
     
     Returns:
         list: A list of team data dictionaries from the API (e.g., [{"team": {"id": 553, "name": "Legia Warszawa"}}])..
-        Empty list if request fails.
+
+    Raises:
+        ApiFootballError: If the request fails after retries.
     """
     
-    headers = {'x-apisports-key': API_KEY}
     params = {'league': league_id, 'season': season_year}
-    response = requests.get(f"{API_URL}/teams", headers=headers, params=params)
-    if response.status_code == 200:
-        return response.json().get('response', [])
-    else:
-        return []
+    return get_json('/teams', params).get('response', [])
 
 def save_teams_to_db():
     """ 
     Fetches and saves teams for all leagues and seasons (2021,2022,2023) to the database.
     Teams are stored with unique api_id and linked to seasons via ManyToManyField.
+    Requests for all (league, season) pairs are sent concurrently by FetchExecutor
+    and every season is written with a fixed number of queries (see bulk_upsert_teams).
 
     Returns:
         None
     """
 
-    leagues = League.objects.all()
-    seasons = Season.objects.filter(start_year__in=[2021, 2022, 2023])
+    seasons = Season.objects.filter(start_year__in=[2021, 2022, 2023]).select_related('league')
+    seasons_by_key = {(season.league.api_id, season.start_year): season for season in seasons}
 
-    for league in leagues:
-        for season in seasons.filter(league=league):
-            teams_data = fetch_teams(league.api_id, season.start_year)
-            for team_info in teams_data:
-                team_data = team_info.get('team', {})
-                if team_data:
-                    team, created = Team.objects.get_or_create(
-                        api_id=team_data['id'],
-                        defaults={'name': team_data['name']}
-                    )
-                    team.season.add(season)  
+    # fetches overlap in worker threads, writes happen here one season at a time
+    for key, teams_data in FetchExecutor().map(fetch_teams, seasons_by_key.keys()):
+        bulk_upsert_teams(seasons_by_key[key], teams_data)
 
 def run():
     """Entry point for django-extensions runscript."""
@@ -0,0 +1,20 @@
+"""Script to incrementally sync fixtures still in play from API-Football to the database.
+
+Only the date window from the earliest unfinished fixture of every season up to a week
+ahead is requested (see predictions.sync), so a refresh costs O(changed fixtures)
+instead of O(season).
+
+Example:
+    python manage.py runscript sync_fixtures
+    python manage.py runscript sync_fixtures --script-args 2023-10-02  # simulated today in demo version
+"""
+
+from datetime import date
+
+from predictions.sync import sync_fixtures
+
+
+def run(*args):
+    """Entry point for django-extensions runscript."""
+    today = date.fromisoformat(args[0]) if args else None
+    sync_fixtures(today=today)
@@ -2,7 +2,10 @@ from rest_framework import serializers
 from rest_framework.reverse import reverse
 from django.contrib.auth.models import User
 from django.contrib.auth import authenticate, get_user_model
-from .models import League, Season, Team, Fixture , Prediction, UserGroup
+from .models import League, Season, Team, Fixture , Prediction, UserGroup, Job, GroupStanding, RoundStanding
+from .groups import resolve_group
+from .reference import league_data, team_name
+from .batch import MAX_BATCH_SIZE, save_matchday_predictions
 
 
 class SeasonSerializer(serializers.HyperlinkedModelSerializer):
@@ -17,13 +20,7 @@ class SeasonSerializer(serializers.HyperlinkedModelSerializer):
         fields = ['url','id','league', 'year', 'start_year']
 
     def get_league(self, obj):
-        return {
-            'id': obj.league.id,
-            'name': obj.league.name,
-            'country': obj.league.country,
-            'level': obj.league.level,
-            'api_id': obj.league.api_id
-        }
+        return league_data(obj.league_id)  # from the in-process reference data, without a query
 
     def validate_year(self, value):
         """Validating the year field to have the format 'start_year-(start_year+1)'"""
@@ -46,40 +43,84 @@ class LeagueSerializer(serializers.HyperlinkedModelSerializer):
         model = League
         fields = ['url','name', 'country', 'level', 'api_id', 'seasons']
 
+def prediction_data(prediction):
+    return {
+        'predicted_home_score': prediction.predicted_home_score,
+        'predicted_away_score': prediction.predicted_away_score,
+        'created_at': prediction.created_at,
+        'id': prediction.id
+    }
+
+def context_user_group(context):
+    """Returns the group passed in the context or resolved from the request's access code."""
+    user_group = context.get('user_group')
+    if user_group is None and 'request' in context:
+        user_group = resolve_group(context['request'], context.get('access_code'))
+    return user_group
+
+class FixtureListSerializer(serializers.ListSerializer):
+    """
+    Serializes many fixtures with a constant number of queries.
+    The user group is resolved once and the user's predictions for all fixtures
+    are loaded with one query into a fixture id map in the serializer context,
+    which FixtureSerializer.get_user_prediction reads instead of querying per fixture.
+    """
+
+    def to_representation(self, data):
+        fixtures = list(data.all() if hasattr(data, 'all') else data)
+        self.context['predictions_by_fixture'] = self.predictions_by_fixture(fixtures)
+        return super().to_representation(fixtures)
+
+    def predictions_by_fixture(self, fixtures):
+        user = getattr(self.context.get('request'), 'user', None)
+        if user is None or not user.is_authenticated or not fixtures:
+            return {}
+
+        user_group = context_user_group(self.context)
+        if user_group is None:
+            return {}
+
+        predictions = Prediction.objects.filter(
+            user=user, user_group=user_group, fixture__in=[fixture.id for fixture in fixtures]
+        )
+        return {prediction.fixture_id: prediction_data(prediction) for prediction in predictions}
+
 class FixtureSerializer(serializers.HyperlinkedModelSerializer):
     """
     Serializer for the Fixture model, including season details.
     Also includes user-specific prediction data if available.
+    Lists should select_related('season'), team names and leagues come from the
+    reference data cache and predictions are prefetched by FixtureListSerializer.
     """
     # id = serializers.IntegerField(read_only=True)
     season = SeasonSerializer(read_only=True)
-    home_team = serializers.StringRelatedField(source='home_team.name', read_only=True)
-    away_team = serializers.StringRelatedField(source='away_team.name', read_only=True)
+    home_team = serializers.SerializerMethodField()
+    away_team = serializers.SerializerMethodField()
     user_prediction = serializers.SerializerMethodField()
     url = serializers.SerializerMethodField()
     formatted_date = serializers.SerializerMethodField()
 
+    def get_home_team(self, obj):
+        return team_name(obj.home_team_id)
+
+    def get_away_team(self, obj):
+        return team_name(obj.away_team_id)
+
     def get_user_prediction(self, obj):
+        predictions_by_fixture = self.context.get('predictions_by_fixture')
+        if predictions_by_fixture is not None:
+            return predictions_by_fixture.get(obj.id)
+
         try:
             user = self.context['request'].user
         except (KeyError, AttributeError):
             return None
         
-        access_code = self.context.get('access_code')
-        if not access_code:
-            access_code = self.context['request'].GET.get('access_code')
-
-        if access_code:
-            user_group = UserGroup.objects.filter(access_code=access_code, members=user).first()
-            if user_group:
-                prediction = Prediction.objects.filter(user=user, fixture=obj, user_group=user_group).first()
-                if prediction:
-                    return {
-                        'predicted_home_score': prediction.predicted_home_score,
-                        'predicted_away_score': prediction.predicted_away_score,
-                        'created_at': prediction.created_at,
-                        'id': prediction.id
-                    }
+        user_group = context_user_group(self.context)
+        if user_group:
+            prediction = Prediction.objects.filter(user=user, fixture=obj, user_group=user_group).first()
+            if prediction:
+                return prediction_data(prediction)
     
     def get_url(self, obj):
         try:
@@ -110,6 +151,7 @@ class FixtureSerializer(serializers.HyperlinkedModelSerializer):
     class Meta:
         model = Fixture
         fields = ['id','url','season','formatted_date', 'home_team', 'away_team', 'home_score', 'away_score', 'status', 'round','round_name','api_id', 'user_prediction']
+        list_serializer_class = FixtureListSerializer
 
 class PredictionSerializer(serializers.ModelSerializer):
     """
@@ -149,7 +191,7 @@ class PredictionCreateSerializer(serializers.ModelSerializer):
             user = self.context['request'].user
             access_code = self.context['request'].query_params.get('access_code')
             if access_code:
-                user_groups = UserGroup.objects.filter(members=user, access_code=access_code).first()
+                user_groups = resolve_group(self.context['request'])
                 if user_groups and user_groups.season:
                     self.fields['fixture'].queryset = Fixture.objects.filter(season=user_groups.season, status='NS')
                 else:
@@ -299,6 +341,30 @@ class PredictionUpsertSerializer(serializers.ModelSerializer):
         )
 
         return prediction, created
+
+class PredictionBatchItemSerializer(serializers.Serializer):
+    fixture = serializers.IntegerField()
+    predicted_home_score = serializers.IntegerField(min_value=0, max_value=99)
+    predicted_away_score = serializers.IntegerField(min_value=0, max_value=99)
+
+class PredictionBatchSerializer(serializers.Serializer):
+    """
+    Serializer for submitting the predictions of a whole matchday at once.
+    Fixtures are validated and saved by predictions.batch.save_matchday_predictions
+    with a fixed number of queries; save() returns the per-fixture results.
+    """
+    user_group = serializers.IntegerField()
+    round = serializers.IntegerField(required=False, allow_null=True, default=None)
+    predictions = PredictionBatchItemSerializer(many=True, allow_empty=False, max_length=MAX_BATCH_SIZE)
+
+    def create(self, validated_data):
+        return save_matchday_predictions(
+            self.context['request'].user,
+            validated_data['user_group'],
+            validated_data['predictions'],
+            round_number=validated_data['round'],
+        )
+
 class CalculatePointsSerializer(serializers.ModelSerializer):
     """
     Serializer for calculating points for a user's predictions in a specific user group.
@@ -310,15 +376,43 @@ class CalculatePointsSerializer(serializers.ModelSerializer):
         model = Prediction
         fields = ['id','points_awarded','predicted_home_score', 'predicted_away_score']
 
+class JobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the status of a background job.
+    """
+    class Meta:
+        model = Job
+        fields = ['id', 'kind', 'status', 'result', 'attempts', 'created_at', 'started_at', 'finished_at']
+
 class UserRankingSerializer(serializers.ModelSerializer):
     """
-    Serializer for user rankings within a group.
+    Serializer for user rankings within a group, read from the group standings.
+    """
+    id = serializers.IntegerField(source='user_id')
+    username = serializers.CharField(source='user.username')
+    total_points = serializers.IntegerField(source='points')
+
+    class Meta:
+        model = GroupStanding
+        fields = ['id', 'username', 'total_points', 'exact_hits', 'outcome_hits', 'predictions_count']
+
+class RoundStandingSerializer(serializers.ModelSerializer):
+    """
+    Serializer for a user's standing after a round, with the movement since the previous round
+    (positive when the user climbed).
     """
-    total_points = serializers.IntegerField()
+    user_id = serializers.IntegerField()
+    username = serializers.CharField(source='user.username')
+    movement = serializers.SerializerMethodField()
 
     class Meta:
-        model = User
-        fields = ['id', 'username', 'total_points']
+        model = RoundStanding
+        fields = ['round', 'user_id', 'username', 'rank', 'movement', 'points', 'round_points', 'exact_hits', 'outcome_hits']
+
+    def get_movement(self, obj):
+        if obj.previous_rank is None:
+            return None
+        return obj.previous_rank - obj.rank
 
 class UserSerializer(serializers.ModelSerializer):
     """
@@ -0,0 +1,167 @@
+"""
+Per-round ranking snapshots of user groups.
+
+When the last fixture of a (season, round) is finished, the cumulative standings
+of every group playing the season are stored in RoundStanding with one
+INSERT ... SELECT, ranked with RANK() OVER (PARTITION BY group ...). The ranking
+history of a group is then read from the snapshots in a single query, and the
+movement between rounds comes from LAG(rank) over the same rows.
+
+A result correction in an already snapshotted round changes all later cumulative
+standings, so later snapshots of the season are rewritten as well.
+
+Example:
+    >>> from predictions.snapshots import snapshot_round
+    >>> snapshot_round(season_id=4, round_number=12)
+    240
+"""
+
+from django.db import connection
+from django.db.models import F, Window
+from django.db.models.functions import Lag
+
+from predictions.models import Fixture, Prediction, RoundStanding, UserGroup
+from predictions.standings import MEMBERS_TABLE
+
+
+# a round is over when none of its fixtures can still be played
+ROUND_CLOSED_STATUSES = ['FT', 'CANC', 'PST']
+
+SNAPSHOT_SQL = f"""
+    INSERT INTO {RoundStanding._meta.db_table} AS r
+        (user_group_id, user_id, round, points, exact_hits, outcome_hits, round_points, rank)
+    SELECT
+        user_group_id, user_id, %(round)s, points, exact_hits, outcome_hits, round_points,
+        RANK() OVER (PARTITION BY user_group_id ORDER BY points DESC, exact_hits DESC, outcome_hits DESC)
+    FROM (
+        SELECT
+            m.usergroup_id AS user_group_id,
+            m.user_id,
+            COALESCE(SUM(p.points_awarded), 0) AS points,
+            COUNT(*) FILTER (WHERE p.points_awarded = 3) AS exact_hits,
+            COUNT(*) FILTER (WHERE p.points_awarded = 1) AS outcome_hits,
+            COALESCE(SUM(p.points_awarded) FILTER (WHERE f.round = %(round)s), 0) AS round_points
+        FROM {MEMBERS_TABLE} AS m
+        JOIN {UserGroup._meta.db_table} AS g
+            ON g.id = m.usergroup_id
+            AND g.season_id = %(season)s
+            AND (g.start_round IS NULL OR g.start_round <= %(round)s)
+            AND (g.end_round IS NULL OR g.end_round >= %(round)s)
+        LEFT JOIN (
+            {Prediction._meta.db_table} AS p
+            JOIN {Fixture._meta.db_table} AS f
+                ON f.id = p.fixture_id AND f.season_id = %(season)s AND f.round <= %(round)s
+        )
+            ON p.user_group_id = m.usergroup_id
+            AND p.user_id = m.user_id
+            AND (g.start_round IS NULL OR f.round >= g.start_round)
+        GROUP BY m.usergroup_id, m.user_id
+    ) AS totals
+    ON CONFLICT (user_group_id, user_id, round) DO UPDATE SET
+        points = EXCLUDED.points,
+        exact_hits = EXCLUDED.exact_hits,
+        outcome_hits = EXCLUDED.outcome_hits,
+        round_points = EXCLUDED.round_points,
+        rank = EXCLUDED.rank
+"""
+
+
+def closes_round(previous_status, status):
+    """
+    Tells whether a status change can close the round of a fixture without rescoring it.
+
+    Reaching FT is left out: the predictions of the fixture are rescored, and
+    score_fixtures snapshots the rounds of rescored fixtures itself.
+    """
+    return previous_status != status and status in ROUND_CLOSED_STATUSES and status != 'FT'
+
+
+def snapshot_round(season_id, round_number):
+    """
+    Stores the standings of all groups of a season after a round.
+
+    Returns:
+        int: The number of written snapshots.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(SNAPSHOT_SQL, {'season': season_id, 'round': round_number})
+        return cursor.rowcount
+
+
+def snapshot_finished_rounds(fixture_ids):
+    """
+    Snapshots the rounds of the given fixtures that are over.
+
+    Called after fixtures were (re)scored or closed (see closes_round). Snapshots of later rounds of the same
+    season are rewritten too, because their cumulative points include the changed round.
+
+    Args:
+        fixture_ids (iterable): Primary keys of the changed fixtures.
+
+    Returns:
+        int: The number of written snapshots.
+    """
+    rounds = set(
+        Fixture.objects.filter(id__in=fixture_ids, round__isnull=False).values_list('season_id', 'round')
+    )
+    if not rounds:
+        return 0
+
+    open_rounds = set(
+        Fixture.objects
+        .filter(season_id__in={season_id for season_id, _ in rounds}, round__isnull=False)
+        .exclude(status__in=ROUND_CLOSED_STATUSES)
+        .values_list('season_id', 'round')
+        .distinct()
+    )
+
+    finished = rounds - open_rounds
+    to_snapshot = set(finished)
+    for season_id, round_number in finished:
+        later_rounds = (
+            RoundStanding.objects
+            .filter(user_group__season_id=season_id, round__gt=round_number)
+            .values_list('round', flat=True)
+            .distinct()
+        )
+        to_snapshot.update((season_id, number) for number in later_rounds)
+
+    return sum(snapshot_round(season_id, round_number) for season_id, round_number in sorted(to_snapshot))
+
+
+def snapshot_all_rounds(season_ids=None):
+    """
+    (Re)writes snapshots of every round that is over, e.g. after importing historical results.
+
+    Returns:
+        int: The number of written snapshots.
+    """
+    fixtures = Fixture.objects.filter(round__isnull=False)
+    if season_ids is not None:
+        fixtures = fixtures.filter(season_id__in=season_ids)
+    rounds = set(fixtures.values_list('season_id', 'round').distinct())
+    open_rounds = set(fixtures.exclude(status__in=ROUND_CLOSED_STATUSES).values_list('season_id', 'round').distinct())
+    return sum(snapshot_round(season_id, round_number) for season_id, round_number in sorted(rounds - open_rounds))
+
+
+def group_history(user_group):
+    """
+    Returns the round snapshots of a group within its start_round and end_round.
+
+    Every snapshot is annotated with `previous_rank`, the rank after the previous
+    snapshotted round (None for the first one), computed by LAG in the same query.
+
+    Returns:
+        QuerySet: RoundStanding rows ordered by round and rank.
+    """
+    history = RoundStanding.objects.filter(user_group=user_group)
+    if user_group.start_round is not None:
+        history = history.filter(round__gte=user_group.start_round)
+    if user_group.end_round is not None:
+        history = history.filter(round__lte=user_group.end_round)
+    return (
+        history
+        .select_related('user')
+        .annotate(previous_rank=Window(Lag('rank'), partition_by=[F('user_id')], order_by=F('round').asc()))
+        .order_by('round', 'rank', 'user__username')
+    )
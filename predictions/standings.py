@@ -0,0 +1,214 @@
+"""
+Materialized group standings.
+
+GroupStanding holds (points, exact hits, outcome hits, scored predictions) of
+every member of every user group, so rankings are a single indexed read instead
+of a sum over all predictions of the group.
+
+The scoring queries of predictions.scoring keep the table up to date by delta:
+their UPDATE returns the old and new points of every changed prediction, and the
+same statement adds the per-(group, user) differences to the standings
+(see with_standing_deltas). Membership changes and deleted scored predictions
+(also by a cascade from a deleted fixture) are handled by the receivers below.
+Bulk rewrites that bypass the scoring queries (e.g. the vectorized rescoring)
+call rebuild_standings(), which is also exposed as
+`python manage.py rebuild_standings` for consistency checks.
+
+Example:
+    >>> from predictions.standings import rebuild_standings, standings_mismatches
+    >>> standings_mismatches()
+    []
+    >>> rebuild_standings(user_group_ids=[3])
+"""
+
+from django.db import connection
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete
+from django.dispatch import receiver
+
+from predictions.models import GroupStanding, Prediction, UserGroup
+from predictions.versions import bump_standings
+
+
+MEMBERS_TABLE = UserGroup.members.through._meta.db_table
+STANDING_FIELDS = ['points', 'exact_hits', 'outcome_hits', 'predictions_count']
+
+STANDING_DELTAS_SQL = f"""
+    WITH changed AS (
+        {{update_sql}}
+    ),
+    deltas AS (
+        SELECT
+            user_group_id,
+            user_id,
+            SUM(COALESCE(new_points, 0) - COALESCE(old_points, 0)) AS points,
+            COUNT(*) FILTER (WHERE new_points = 3) - COUNT(*) FILTER (WHERE old_points = 3) AS exact_hits,
+            COUNT(*) FILTER (WHERE new_points = 1) - COUNT(*) FILTER (WHERE old_points = 1) AS outcome_hits,
+            COUNT(new_points) - COUNT(old_points) AS predictions_count
+        FROM changed
+        GROUP BY user_group_id, user_id
+    ),
+    applied AS (
+        INSERT INTO {GroupStanding._meta.db_table} AS s
+            (user_group_id, user_id, points, exact_hits, outcome_hits, predictions_count)
+        SELECT d.user_group_id, d.user_id, d.points, d.exact_hits, d.outcome_hits, d.predictions_count
+        FROM deltas AS d
+        WHERE EXISTS (
+            SELECT 1 FROM {MEMBERS_TABLE} AS m
+            WHERE m.usergroup_id = d.user_group_id AND m.user_id = d.user_id
+        )
+        ON CONFLICT (user_group_id, user_id) DO UPDATE SET
+            points = s.points + EXCLUDED.points,
+            exact_hits = s.exact_hits + EXCLUDED.exact_hits,
+            outcome_hits = s.outcome_hits + EXCLUDED.outcome_hits,
+            predictions_count = s.predictions_count + EXCLUDED.predictions_count
+    )
+    SELECT
+        COUNT(*),
+        ARRAY(SELECT DISTINCT user_group_id FROM changed),
+        ARRAY(SELECT DISTINCT fixture_id FROM changed)
+    FROM changed
+"""
+
+# standings computed from scratch for members of the groups matching {where}
+COMPUTED_STANDINGS_SQL = f"""
+    SELECT
+        m.usergroup_id AS user_group_id,
+        m.user_id,
+        COALESCE(SUM(p.points_awarded), 0) AS points,
+        COUNT(*) FILTER (WHERE p.points_awarded = 3) AS exact_hits,
+        COUNT(*) FILTER (WHERE p.points_awarded = 1) AS outcome_hits,
+        COUNT(p.points_awarded) AS predictions_count
+    FROM {MEMBERS_TABLE} AS m
+    LEFT JOIN {Prediction._meta.db_table} AS p
+        ON p.user_group_id = m.usergroup_id AND p.user_id = m.user_id
+    WHERE {{where}}
+    GROUP BY m.usergroup_id, m.user_id
+"""
+
+REBUILD_SQL = f"""
+    INSERT INTO {GroupStanding._meta.db_table} AS s
+        (user_group_id, user_id, points, exact_hits, outcome_hits, predictions_count)
+    {COMPUTED_STANDINGS_SQL}
+    ON CONFLICT (user_group_id, user_id) DO UPDATE SET
+        points = EXCLUDED.points,
+        exact_hits = EXCLUDED.exact_hits,
+        outcome_hits = EXCLUDED.outcome_hits,
+        predictions_count = EXCLUDED.predictions_count
+"""
+
+DELETE_FORMER_MEMBERS_SQL = f"""
+    DELETE FROM {GroupStanding._meta.db_table} AS s
+    WHERE {{where}}
+        AND NOT EXISTS (
+            SELECT 1 FROM {MEMBERS_TABLE} AS m
+            WHERE m.usergroup_id = s.user_group_id AND m.user_id = s.user_id
+        )
+"""
+
+
+def with_standing_deltas(update_sql):
+    """
+    Wraps a scoring UPDATE so the same statement applies its point changes to the standings.
+
+    The UPDATE must return user_group_id, user_id, fixture_id, old_points and
+    new_points of every changed prediction. The wrapped statement returns the
+    number of changed predictions and arrays of the ids of their groups and fixtures.
+    """
+    return STANDING_DELTAS_SQL.format(update_sql=update_sql)
+
+
+def _filter(column, ids, params):
+    if ids is None:
+        return 'TRUE'
+    params.append(list(ids))
+    return f"{column} = ANY(%s)"
+
+
+def rebuild_standings(user_group_ids=None, user_ids=None):
+    """
+    Recomputes standings from predictions and drops standings of former members.
+
+    Args:
+        user_group_ids (iterable): Only rebuild these groups (defaults to all groups).
+        user_ids (iterable): Only rebuild standings of these users.
+    """
+    insert_params, delete_params = [], []
+    insert_where = ' AND '.join([
+        _filter('m.usergroup_id', user_group_ids, insert_params),
+        _filter('m.user_id', user_ids, insert_params),
+    ])
+    delete_where = ' AND '.join([
+        _filter('s.user_group_id', user_group_ids, delete_params),
+        _filter('s.user_id', user_ids, delete_params),
+    ])
+    with connection.cursor() as cursor:
+        cursor.execute(REBUILD_SQL.format(where=insert_where), insert_params)
+        cursor.execute(DELETE_FORMER_MEMBERS_SQL.format(where=delete_where), delete_params)
+    bump_standings(user_group_ids)
+
+
+def standings_mismatches(user_group_ids=None):
+    """
+    Compares the standings table with standings computed from predictions.
+
+    Returns:
+        list: (user_group_id, user_id, stored, expected) tuples of differing standings;
+            stored or expected is None for a missing row.
+    """
+    params = []
+    where = _filter('m.usergroup_id', user_group_ids, params)
+    with connection.cursor() as cursor:
+        cursor.execute(COMPUTED_STANDINGS_SQL.format(where=where), params)
+        expected = {(row[0], row[1]): tuple(row[2:]) for row in cursor.fetchall()}
+
+    standings = GroupStanding.objects.all()
+    if user_group_ids is not None:
+        standings = standings.filter(user_group_id__in=user_group_ids)
+    stored = {
+        (row[0], row[1]): tuple(row[2:])
+        for row in standings.values_list('user_group_id', 'user_id', *STANDING_FIELDS)
+    }
+
+    return [
+        (*key, stored.get(key), expected.get(key))
+        for key in sorted(stored.keys() | expected.keys())
+        if stored.get(key) != expected.get(key)
+    ]
+
+
+@receiver(m2m_changed, sender=UserGroup.members.through)
+def update_standings_on_membership_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Creates standings of new members (with their existing points) and removes standings of former ones."""
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if action == 'post_clear':  # pk_set is not available, rebuild everything of the instance
+        pk_set = None
+    if reverse:  # user.user_groups changed
+        rebuild_standings(user_group_ids=pk_set, user_ids=[instance.pk])
+    else:
+        rebuild_standings(user_group_ids=[instance.pk], user_ids=pk_set)
+
+
+def apply_points_change(user_group_id, user_id, old_points, new_points):
+    """
+    Applies the change of the points of one prediction to the standing of its author.
+
+    For single rows written outside of the scoring queries (Prediction.calculate_points(),
+    deleted predictions); None points stand for an unscored (or deleted) prediction.
+    """
+    if old_points == new_points:
+        return
+    GroupStanding.objects.filter(user_group_id=user_group_id, user_id=user_id).update(
+        points=F('points') + (new_points or 0) - (old_points or 0),
+        exact_hits=F('exact_hits') + int(new_points == 3) - int(old_points == 3),
+        outcome_hits=F('outcome_hits') + int(new_points == 1) - int(old_points == 1),
+        predictions_count=F('predictions_count') + int(new_points is not None) - int(old_points is not None),
+    )
+    bump_standings([user_group_id])
+
+
+@receiver(post_delete, sender=Prediction)
+def update_standings_on_prediction_delete(sender, instance, **kwargs):
+    """Subtracts the points of a deleted scored prediction from the standing of its author."""
+    apply_points_change(instance.user_group_id, instance.user_id, instance.points_awarded, None)
@@ -0,0 +1,114 @@
+"""
+Incremental fixture sync driven by per-season watermarks.
+
+A full refresh re-downloads and rewrites a whole date range. The incremental
+sync instead asks API-Football only for the window that is still in play:
+from the earliest unfinished fixture of a season (but no more than
+LOOKBACK_DAYS back) up to LOOKAHEAD_DAYS ahead. Finished rounds are never
+requested again and finished seasons without open fixtures are skipped
+entirely. The window and time of every successful sync are stored in SyncState.
+
+Example:
+    >>> from predictions.sync import sync_fixtures
+    >>> sync_fixtures(today=date(2023, 10, 2))  # demo version simulates today
+    {(106, 2023): {'inserted': 0, 'updated': 2, 'unchanged': 7, 'skipped': 0}}
+"""
+
+from datetime import date, timedelta
+
+from django.db.models import Min, Q
+from django.utils import timezone
+
+from predictions.api_cache import is_finished_season
+from predictions.api_football import ApiFootballError
+from predictions.fetch_executor import FetchExecutor
+from predictions.ingestion import bulk_upsert_fixtures
+from predictions.models import Season, SyncState
+from predictions.utils import fetch_fixtures_from_api
+
+
+FINISHED_STATUSES = ['FT', 'CANC']
+LOOKBACK_DAYS = 3
+LOOKAHEAD_DAYS = 7
+
+
+def seasons_to_sync():
+    """
+    Returns the synced seasons annotated with the date of their earliest unfinished fixture.
+
+    Returns:
+        QuerySet: Seasons with league and sync_state selected and a `first_open_date` annotation.
+    """
+    return (
+        Season.objects
+        .filter(start_year__in=[2021, 2022, 2023])  # in demo version without payment plan
+        .select_related('league', 'sync_state')
+        .annotate(first_open_date=Min('fixtures__date', filter=~Q(fixtures__status__in=FINISHED_STATUSES)))
+    )
+
+
+def incremental_window(season, today, lookback_days=LOOKBACK_DAYS, lookahead_days=LOOKAHEAD_DAYS):
+    """
+    Computes the date window of a season that still has to be synced.
+
+    Args:
+        season (Season): A season from seasons_to_sync().
+        today (date): The current date.
+        lookback_days (int): How far back unfinished fixtures are re-checked.
+        lookahead_days (int): How far ahead upcoming fixtures are fetched.
+
+    Returns:
+        tuple: (start, end) dates, or None if nothing of the season is in play.
+    """
+    state = getattr(season, 'sync_state', None)
+    if state is None:  # never synced - backfill the whole season once
+        return date(season.start_year, 1, 1), date(season.start_year + 1, 12, 31)
+
+    first_open = season.first_open_date
+    if first_open is None and is_finished_season(season.start_year, today):
+        return None
+
+    start = today
+    if first_open is not None:
+        start = min(max(timezone.localdate(first_open), today - timedelta(days=lookback_days)), today)
+    return start, today + timedelta(days=lookahead_days)
+
+
+def sync_fixtures(today=None, seasons=None):
+    """
+    Fetches and saves only the fixtures still in play and advances the watermarks.
+
+    Args:
+        today (date): The current date - in demo version it also works as split_date.
+        seasons (QuerySet): Seasons annotated like seasons_to_sync() (defaults to all synced seasons).
+
+    Returns:
+        dict: Results of bulk_upsert_fixtures keyed by (league api_id, season year).
+    """
+    today = today or timezone.localdate()
+    seasons = seasons if seasons is not None else seasons_to_sync()
+
+    seasons_by_key = {}
+    jobs = []
+    for season in seasons:
+        window = incremental_window(season, today)
+        if window is None:
+            continue
+        key = (season.league.api_id, season.start_year)
+        seasons_by_key[key] = (season, window)
+        jobs.append((*key, window[0].isoformat(), window[1].isoformat()))
+
+    results = {}
+    executor = FetchExecutor()
+    for (league_id, season_year, _, _), fixtures in executor.map(fetch_fixtures_from_api, jobs, return_exceptions=True):
+        if isinstance(fixtures, ApiFootballError):  # request failed - keep the old watermark
+            continue
+        if isinstance(fixtures, Exception):
+            raise fixtures
+        season, (start, end) = seasons_by_key[(league_id, season_year)]
+        results[(league_id, season_year)] = bulk_upsert_fixtures(season, fixtures, today.isoformat())
+        SyncState.objects.update_or_create(
+            season=season,
+            defaults={'last_synced_at': timezone.now(), 'window_start': start, 'window_end': end},
+        )
+    return results
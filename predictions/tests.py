@@ -1,3 +1,411 @@
-from django.test import TestCase
+from datetime import datetime, timedelta, timezone as dt_timezone
+from importlib.util import find_spec
+from itertools import product
+from unittest import skipUnless
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django_htmx.middleware import HtmxDetails
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from predictions.jobs import HEARTBEAT_TIMEOUT, MAX_ATTEMPTS, claim_job
+from predictions.live import apply_live_updates, fixtures_to_poll
+from predictions.models import Fixture, Job, Prediction, RoundStanding
+from predictions.pagination import PredictionPagination
+from predictions.reference import reference_data
+from predictions.rescoring import rescore_predictions
+from predictions.sample_data import create_group, create_season, create_teams, sample_fixture
+from predictions.scoring import score_fixtures, score_pending_predictions
+from predictions.standings import rebuild_standings, standings_mismatches
+from predictions.views.api import FixtureListView
+from predictions.views.htmx import fixtures_partial, predictions_batch_partial
+
+
+class ScoringEquivalenceTests(TestCase):
+    """
+    The scoring engines award the same points as Prediction.calculate_points().
+
+    Every result from 0:0 to MAX_GOALS:MAX_GOALS (plus a finished fixture without
+    a score) is predicted with every score, one member of the group per predicted
+    score, which covers draws, exact hits, correct outcomes, wrong outcomes and
+    NULL scores. After every engine the standings
+    maintained by the engine must match standings computed from the predictions.
+    """
+
+    MAX_GOALS = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        season = create_season(-2, "Scoring check")
+        teams = create_teams(2, first_api_id=-1001)
+        goals = range(cls.MAX_GOALS + 1)
+        scores = list(product(goals, goals))
+        users = User.objects.bulk_create([User(username=f"scoring-check-{home}-{away}") for home, away in scores])
+        cls.users_by_score = dict(zip(scores, users))
+        cls.user_group = create_group(season, "scoring-check", members=users)
+
+        results = [*scores, (None, None)]
+        cls.fixtures = Fixture.objects.bulk_create([
+            sample_fixture(season, teams, i, first_api_id=-20_000, home_score=home, away_score=away, status='FT')
+            for i, (home, away) in enumerate(results)
+        ])
+        Prediction.objects.bulk_create([
+            Prediction(
+                user=user, user_group=cls.user_group, fixture=fixture,
+                predicted_home_score=home, predicted_away_score=away,
+            )
+            for fixture in cls.fixtures
+            for (home, away), user in cls.users_by_score.items()
+        ])
+
+        cls.expected = {}
+        for prediction in Prediction.objects.filter(user_group=cls.user_group).select_related('fixture'):
+            cls.expected[prediction.id] = prediction.compute_points()
+
+    def setUp(self):
+        self.predictions = Prediction.objects.filter(user_group=self.user_group)
+
+    def points(self, predicted, result):
+        fixture = next(f for f in self.fixtures if (f.home_score, f.away_score) == result)
+        return self.predictions.get(fixture=fixture, user=self.users_by_score[predicted]).points_awarded
+
+    def assertEngineMatches(self, engine, initial_points=None):
+        self.predictions.update(points_awarded=initial_points)
+        rebuild_standings([self.user_group.pk])
+
+        engine()
+
+        self.assertEqual(dict(self.predictions.values_list('id', 'points_awarded')), self.expected)
+        self.assertEqual(standings_mismatches([self.user_group.pk]), [])
+
+    def test_reference_rules(self):
+        self.predictions.update(points_awarded=None)
+        score_pending_predictions()
+
+        self.assertEqual(self.points((2, 1), (2, 1)), 3)
+        self.assertEqual(self.points((0, 0), (0, 0)), 3)
+        self.assertEqual(self.points((1, 1), (2, 2)), 1)
+        self.assertEqual(self.points((1, 0), (3, 1)), 1)
+        self.assertEqual(self.points((0, 2), (1, 4)), 1)
+        self.assertEqual(self.points((1, 2), (2, 1)), 0)
+        self.assertEqual(self.points((1, 1), (2, 1)), 0)
+        self.assertEqual(self.points((1, 0), (0, 0)), 0)
+        self.assertIsNone(self.points((0, 0), (None, None)))
+
+    def test_pending(self):
+        self.assertEngineMatches(score_pending_predictions)
+
+    def test_fixtures(self):
+        self.assertEngineMatches(lambda: score_fixtures([fixture.id for fixture in self.fixtures]))
+
+    def test_correction(self):
+        # already awarded (wrong) points are rescored too
+        self.assertEngineMatches(lambda: score_fixtures([fixture.id for fixture in self.fixtures]), initial_points=-1)
+
+    def test_calculate_points(self):
+        def calculate_each():
+            for prediction in self.predictions.select_related('fixture'):
+                prediction.calculate_points()
+
+        self.assertEngineMatches(calculate_each)
+
+    @skipUnless(find_spec('numpy'), "numpy is not installed")
+    def test_vectorized(self):
+        season = self.user_group.season
+        self.assertEngineMatches(lambda: rescore_predictions(season=season, chunk_size=100), initial_points=-1)
+
+
+class StandingsConsistencyTests(TestCase):
+    """Standings stay equal to standings computed from predictions when predictions are deleted or rescored."""
+
+    @classmethod
+    def setUpTestData(cls):
+        season = create_season(-7, "Standings check")
+        teams = create_teams(2, first_api_id=-7001)
+        cls.users = User.objects.bulk_create([User(username=f"standings-check-{i}") for i in range(2)])
+        cls.user_group = create_group(season, "standings-check", members=cls.users)
+        cls.fixtures = Fixture.objects.bulk_create([
+            sample_fixture(season, teams, i, first_api_id=-70_000, home_score=i, away_score=0, status='FT')
+            for i in range(3)
+        ])
+        Prediction.objects.bulk_create([
+            Prediction(
+                user=user, user_group=cls.user_group, fixture=fixture, predicted_home_score=1, predicted_away_score=0,
+            )
+            for user in cls.users
+            for fixture in cls.fixtures
+        ])
+        score_pending_predictions()
+
+    def assertStandingsConsistent(self):
+        self.assertEqual(standings_mismatches([self.user_group.pk]), [])
+
+    def test_delete_prediction(self):
+        Prediction.objects.filter(user=self.users[0], fixture=self.fixtures[1]).delete()
+        self.assertStandingsConsistent()
+
+    def test_delete_fixture(self):
+        self.fixtures[2].delete()
+        self.assertStandingsConsistent()
+
+    def test_calculate_points(self):
+        prediction = Prediction.objects.get(user=self.users[1], fixture=self.fixtures[0])
+        Fixture.objects.filter(pk=self.fixtures[0].pk).update(home_score=1)
+        prediction.calculate_points()
+        self.assertEqual(prediction.points_awarded, 3)
+        self.assertStandingsConsistent()
+
+
+class RoundSnapshotTests(TestCase):
+    """A round is snapshotted once none of its fixtures can be played, whichever path closes it."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.season = season = create_season(-8, "Snapshot check")
+        teams = create_teams(2, first_api_id=-8001)
+        user = User.objects.create(username="snapshot-check")
+        cls.user_group = create_group(season, "snapshot-check", members=[user])
+        cls.finished, cls.open = Fixture.objects.bulk_create([
+            sample_fixture(season, teams, 0, first_api_id=-80_000, round=1, status='FT', home_score=1, away_score=0),
+            sample_fixture(season, teams, 1, first_api_id=-80_000, round=1, status='1H', home_score=0, away_score=0),
+        ])
+        Prediction.objects.create(
+            user=user, user_group=cls.user_group, fixture=cls.finished, predicted_home_score=1, predicted_away_score=0,
+        )
+
+    def snapshots(self):
+        return list(RoundStanding.objects.filter(user_group=self.user_group).values_list('round', 'points'))
+
+    def test_pending_scoring_of_a_closed_round(self):
+        Fixture.objects.filter(pk=self.open.pk).update(status='CANC')
+        score_pending_predictions()
+        self.assertEqual(self.snapshots(), [(1, 3)])
+
+    def test_live_cancellation_closes_the_round(self):
+        score_pending_predictions()
+        self.assertEqual(self.snapshots(), [])
+
+        fixtures = [fixture for fixture in fixtures_to_poll(self.open.date) if fixture['id'] == self.open.id]
+        apply_live_updates(fixtures, [
+            {'fixture': {'id': self.open.api_id, 'status': {'short': 'CANC'}}, 'goals': {'home': 0, 'away': 0}},
+        ])
+        self.assertEqual(self.snapshots(), [(1, 3)])
+
+    @skipUnless(find_spec('numpy'), "numpy is not installed")
+    def test_vectorized_rescoring_rewrites_snapshots(self):
+        Fixture.objects.filter(pk=self.open.pk).update(status='CANC')
+        score_pending_predictions()
+        Fixture.objects.filter(pk=self.finished.pk).update(home_score=2)  # a corrected result, scored in bulk
+
+        rescore_predictions(season=self.season)
+        self.assertEqual(self.snapshots(), [(1, 1)])
+
+    def test_live_update_clears_the_payload_hash(self):
+        Fixture.objects.filter(pk=self.open.pk).update(payload_hash='0123456789abcdef')
+        fixtures = [fixture for fixture in fixtures_to_poll(self.open.date) if fixture['id'] == self.open.id]
+        apply_live_updates(fixtures, [
+            {'fixture': {'id': self.open.api_id, 'status': {'short': '2H'}}, 'goals': {'home': 1, 'away': 0}},
+        ])
+        self.assertEqual(Fixture.objects.get(pk=self.open.pk).payload_hash, '')
+
+
+class JobClaimTests(TestCase):
+    """Running jobs are only reclaimed from dead workers, and reclaims count as attempts."""
+
+    def running_job(self, heartbeat_age, attempts=1):
+        now = timezone.now()
+        return Job.objects.create(
+            kind='score', status='running', attempts=attempts, locked_by='old-worker',
+            started_at=now - timedelta(days=1), heartbeat_at=now - heartbeat_age,
+        )
+
+    def test_slow_job_with_heartbeat_is_not_reclaimed(self):
+        self.running_job(heartbeat_age=timedelta(seconds=10))
+        self.assertIsNone(claim_job('new-worker'))
+
+    def test_abandoned_job_is_reclaimed(self):
+        job = self.running_job(heartbeat_age=HEARTBEAT_TIMEOUT * 2)
+        claimed = claim_job('new-worker')
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual((claimed.attempts, claimed.locked_by), (2, 'new-worker'))
+
+    def test_abandoned_job_fails_after_max_attempts(self):
+        job = self.running_job(heartbeat_age=HEARTBEAT_TIMEOUT * 2, attempts=MAX_ATTEMPTS)
+        self.assertIsNone(claim_job('new-worker'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+
+
+class ConditionalGetTests(TestCase):
+    """Polled lists answer 304 while their versions are unchanged, but only with a shared cache."""
+
+    @classmethod
+    def setUpTestData(cls):
+        season = create_season(-9, "ETag check")
+        cls.user = User.objects.create(username="etag-check")
+        cls.user_group = create_group(season, "etag-check", members=[cls.user])
+
+    def list_fixtures(self, **headers):
+        request = APIRequestFactory().get('/api/fixtures/', {'access_code': self.user_group.access_code}, **headers)
+        force_authenticate(request, self.user)
+        return FixtureListView.as_view()(request)
+
+    def test_not_modified(self):
+        etag = self.list_fixtures()['ETag']
+        self.assertEqual(self.list_fixtures(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_no_etag_with_process_local_cache(self):
+        self.assertNotIn('ETag', self.list_fixtures())
+
+
+class PredictionBatchPartialTests(TestCase):
+    """The "save all" partial validates like api/predictions/batch/."""
+
+    @classmethod
+    def setUpTestData(cls):
+        season = create_season(-10, "Batch check")
+        teams = create_teams(2, first_api_id=-10_001)
+        cls.user = User.objects.create(username="batch-check")
+        cls.user_group = create_group(season, "batch-check", members=[cls.user])
+        cls.fixtures = Fixture.objects.bulk_create([
+            sample_fixture(season, teams, i, first_api_id=-100_000, round=1) for i in range(3)
+        ])
+
+    def post(self, scores):
+        request = RequestFactory().post('/partial/predictions/batch/', {
+            'fixture': [fixture.id for fixture in self.fixtures],
+            'user_group': [self.user_group.id] * len(self.fixtures),
+            'predicted_home_score': [home for home, _ in scores],
+            'predicted_away_score': [away for _, away in scores],
+            'round': 1,
+        })
+        request.user = self.user
+        return predictions_batch_partial(request)
+
+    def test_saves_filled_cards(self):
+        response = self.post([('2', '1'), ('', ''), ('0', '0')])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            set(Prediction.objects.filter(user=self.user).values_list('fixture_id', flat=True)),
+            {self.fixtures[0].id, self.fixtures[2].id},
+        )
+
+    def test_rejects_invalid_scores(self):
+        self.post([('2', '1'), ('100', '0'), ('0', '')])
+        self.assertFalse(Prediction.objects.filter(user=self.user).exists())
+
+
+# a cache in process memory sends no queries (and makes render_cards render every card), so only the view queries count
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests'}})
+class FixtureListQueryTests(TestCase):
+    """Listing a matchday costs the same number of queries for any number of fixtures."""
+
+    SMALL_ROUND, LARGE_ROUND = 1, 2
+    SIZES = {SMALL_ROUND: 1, LARGE_ROUND: 50}
+
+    @classmethod
+    def setUpTestData(cls):
+        season = create_season(-4, "Query check")
+        teams = create_teams(2, first_api_id=-4001)
+        cls.user = User.objects.create(username="query-check")
+        cls.user_group = create_group(season, "query-check", members=[cls.user])
+
+        fixtures = Fixture.objects.bulk_create([
+            sample_fixture(season, teams, round_number * 100 + i, first_api_id=-40_000, round=round_number)
+            for round_number, size in cls.SIZES.items()
+            for i in range(size)
+        ])
+        Prediction.objects.bulk_create([
+            Prediction(
+                user=cls.user, user_group=cls.user_group, fixture=fixture,
+                predicted_home_score=1, predicted_away_score=0,
+            )
+            for fixture in fixtures[::2]
+        ])
+
+    def setUp(self):
+        reference_data(reload=True)  # the first request mustn't pay for loading the snapshot
+
+    def list_api(self, round_number):
+        request = APIRequestFactory().get(
+            '/api/fixtures/', {'access_code': self.user_group.access_code, 'round': round_number},
+        )
+        force_authenticate(request, self.user)
+        response = FixtureListView.as_view()(request)
+        response.render()
+        return response
+
+    def list_partial(self, round_number):
+        request = RequestFactory().get(
+            '/partial/fixtures/', {'access_code': self.user_group.access_code, 'round': round_number},
+            HTTP_HX_REQUEST='true',
+        )
+        request.user = self.user
+        request.htmx = HtmxDetails(request)
+        return fixtures_partial(request)
+
+    def assertConstantQueries(self, list_round):
+        with CaptureQueriesContext(connection) as small:
+            list_round(self.SMALL_ROUND)
+        with self.assertNumQueries(len(small)):
+            return list_round(self.LARGE_ROUND)
+
+    def test_api(self):
+        response = self.assertConstantQueries(self.list_api)
+        self.assertEqual(len(response.data['results']), self.SIZES[self.LARGE_ROUND])
+
+    def test_partial(self):
+        response = self.assertConstantQueries(self.list_partial)
+        self.assertEqual(response.status_code, 200)
+
+
+class KeysetPaginationTests(TestCase):
+    """Every row is listed exactly once, also when the last row of a page shares its millisecond with others."""
+
+    @classmethod
+    def setUpTestData(cls):
+        season = create_season(-6, "Pagination check")
+        teams = create_teams(2, first_api_id=-6001)
+        cls.user = User.objects.create(username="pagination-check")
+        user_group = create_group(season, "pagination-check", members=[cls.user])
+        fixtures = Fixture.objects.bulk_create([
+            sample_fixture(season, teams, i, first_api_id=-60_000) for i in range(10)
+        ])
+        predictions = Prediction.objects.bulk_create([
+            Prediction(
+                user=cls.user, user_group=user_group, fixture=fixture, predicted_home_score=1, predicted_away_score=1,
+            )
+            for fixture in fixtures
+        ])
+        # like a batch submission: one millisecond, distinct and equal microseconds
+        created_at = datetime(2023, 10, 2, 12, 0, 0, 123456, tzinfo=dt_timezone.utc)
+        for i, prediction in enumerate(predictions):
+            Prediction.objects.filter(pk=prediction.pk).update(created_at=created_at + timedelta(microseconds=i % 3))
+
+    def list_pages(self, page_size):
+        ids = []
+        params = {'page_size': page_size}
+        while True:
+            paginator = PredictionPagination()
+            request = Request(APIRequestFactory().get('/api/predictions/', params))
+            ids += [prediction.id for prediction in paginator.paginate_queryset(
+                Prediction.objects.filter(user=self.user), request,
+            )]
+            next_link = paginator.get_next_link()
+            if next_link is None:
+                return ids
+            params = {key: values[0] for key, values in parse_qs(urlparse(next_link).query).items()}
+
+    def test_same_millisecond_across_page_boundaries(self):
+        expected = list(
+            Prediction.objects.filter(user=self.user).order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        for page_size in (1, 3, 4):
+            with self.subTest(page_size=page_size):
+                self.assertEqual(self.list_pages(page_size), expected)
@@ -3,14 +3,17 @@ from .views.api import LeagueListView, LeagueDetailView
 from .views.api import SeasonDetailView 
 from .views.api import FixtureListView, FixtureDetailView
 from .views.api import PredictionListView, PredictionDetailView, PredictionCreateView, PredictionUpdateView
-from .views.api import GroupListView, CalculatePointsView, UserRankingView
+from .views.api import GroupListView, CalculatePointsView, UserRankingView, UserRankingHistoryView, JobStatusView
+from .views.api import CacheStatsView, PredictionBatchView
 from .views.api import LoginView
 from .views.htmx import LoginHtmlView, fixtures_partial, prediction_create_partial, matchdays_partial
+from .views.htmx import predictions_batch_partial
 
 urlpatterns = [
     path('login/', LoginHtmlView.as_view(), name='login'),
     path('partial/fixtures/', fixtures_partial, name='htmx-fixtures'),
     path('partial/predictions/create/', prediction_create_partial, name='htmx-prediction-create'),
+    path('partial/predictions/batch/', predictions_batch_partial, name='htmx-predictions-batch'),
     path('partial/matchdays/', matchdays_partial, name='htmx-matchdays'),
     path('api/login/', LoginView.as_view(), name='api-login'),
     path('api/usergroups/', GroupListView.as_view(), name='usergroup-list'),
@@ -22,8 +25,12 @@ urlpatterns = [
     path('api/predictions/', PredictionListView.as_view(), name='prediction-list'),
     path('api/predictions/<int:pk>/', PredictionDetailView.as_view(), name='prediction-detail'),
     path('api/predictions/create/', PredictionCreateView.as_view(), name='prediction-create'),
+    path('api/predictions/batch/', PredictionBatchView.as_view(), name='prediction-batch'),
     path('api/predictions/<int:pk>/update/', PredictionUpdateView.as_view(), name='prediction-update'),
     path('api/predictions/calculate_points/', CalculatePointsView.as_view(), name='prediction-calculate-points'),
     path('api/user_rankings/', UserRankingView.as_view(), name='user-ranking-list'),
+    path('api/user_rankings/history/', UserRankingHistoryView.as_view(), name='user-ranking-history'),
+    path('api/jobs/<int:pk>/', JobStatusView.as_view(), name='job-detail'),
+    path('api/cache_stats/', CacheStatsView.as_view(), name='cache-stats'),
 
 ]
\ No newline at end of file
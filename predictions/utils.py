@@ -10,48 +10,81 @@ Example:
         >>> from predictions.utils import fetch_and_save_seasons_from_api, fetch_and_save_teams_from_api
         >>> fetch_and_save_seasons_from_api()  # Fetches and saves all seasons for all leagues
         >>> fetch_and_save_teams_from_api(league_id=106, season_year=2023)  # Fetches teams for Ekstraklasa 2023    
+        >>> fetch_and_save_teams_for_seasons(Season.objects.select_related('league'))  # Fetches teams of many seasons concurrently
 """
 
-import requests
-from decouple import config
-from predictions.models import Season, League, Team, Fixture
+from predictions.models import Season, Team, Fixture
+from predictions.ingestion import parse_fixture, bulk_upsert_fixtures, bulk_upsert_teams, seed_seasons
+from predictions.fetch_executor import FetchExecutor
+from predictions.api_football import get_json
 from datetime import datetime, timedelta
 
 
-API_KEY = config('API_FOOTBALL_KEY')
-API_URL = "https://v3.football.api-sports.io"
-
 def fetch_and_save_seasons_from_api():
     """
     Fetches available seasons from API-Football and save them to the database.
     
     Returns:
         int: The number of seasons added to the database.
+
+    Raises:
+        ApiFootballError: If the request fails after retries.
     """
     
-    headers = {'x-apisports-key': API_KEY}
-    response = requests.get(f"{API_URL}/leagues/seasons", headers=headers)
+    seasons = get_json('/leagues/seasons').get('response', [])
 
-    if response.status_code != 200:
+    return seed_seasons(seasons)
 
-        return 0
+def fetch_teams_from_api(league_id, season_year):
+    """
+    Fetches teams for a given league and season from API-Football.
+
+    Args:
+        league_id (int): The ID of the league (e.g., 106 for Ekstraklasa).
+        season_year (int): The starting year of the season (e.g., 2021 for 2021-2022).
+
+    Returns:
+        list: A list of team data dictionaries from the API.
+
+    Raises:
+        ApiFootballError: If the request fails after retries.
+    """
+
+    params = {'league': league_id, 'season': season_year}
+    return get_json('/teams', params).get('response', [])
+
+def save_teams(season, teams, bulk=False):
+    """
+    Saves teams from an API-Football /teams response and links them to the season.
+
+    Args:
+        season (Season): The season the teams play in.
+        teams (list): Items of the API-Football /teams 'response' list.
+        bulk (bool): Upserts teams and season links with a constant number of queries (see predictions.ingestion).
+
+    Returns:
+        int: The number of teams added to the database.
+    """
+
+    if bulk:
+        return bulk_upsert_teams(season, teams)['inserted']
 
-    seasons = response.json().get('response')
-    leagues = League.objects.all()
     count = 0
 
-    for league in leagues:
-        for year in seasons:
-            Season.objects.get_or_create(
-                league=league,
-                start_year=year,
-                defaults={'year':f"{year}-{year+1}"}
-                )
-            count += 1
+    for team_info in teams:
+        team_data = team_info.get('team', {})
+        if team_data:
+            team, created  = Team.objects.get_or_create(
+                api_id=team_data['id'],
+                defaults={'name': team_data['name']}
+            )
+            team.season.add(season)  
+            if created:
+                count += 1
     
     return count
 
-def fetch_and_save_teams_from_api(league_id, season_year):
+def fetch_and_save_teams_from_api(league_id, season_year, bulk=False):
     """
     Fetches teams for a given league and season from(2021,2022,2023) API-Football and saves them to the database.
     Teams are stored with unique api_id and linked to seasons via ManyToManyField..
@@ -59,127 +92,170 @@ def fetch_and_save_teams_from_api(league_id, season_year):
     Args:
         league_id (int): The ID of the league (e.g., 106 for Ekstraklasa).
         season_year (int): The starting year of the season (e.g., 2021 for 2021-2022).
+        bulk (bool): Upserts teams and season links with a constant number of queries.
     
     Returns:
         int: The number of teams added to the database.
     """
     
-    headers = {'x-apisports-key': API_KEY}
-    params = {'league': league_id, 'season': season_year}
-    response = requests.get(f"{API_URL}/teams", headers=headers, params=params)
-    if response.status_code != 200:
-        return 0
-    
-    teams = response.json().get('response', [])
+    teams = fetch_teams_from_api(league_id, season_year)
 
     try:
         season = Season.objects.get(league__api_id=league_id, start_year=season_year)
     except Season.DoesNotExist:
         return 0
 
+    return save_teams(season, teams, bulk=bulk)
+
+def fetch_and_save_teams_for_seasons(seasons, bulk=True):
+    """
+    Fetches teams of many seasons concurrently and saves them from the calling thread.
+
+    Args:
+        seasons (iterable): Season instances (with league selected).
+        bulk (bool): Upserts every season with a constant number of queries.
+
+    Returns:
+        int: The number of teams added to the database.
+    """
+
+    seasons_by_key = {(season.league.api_id, season.start_year): season for season in seasons}
     count = 0
 
-    for team_info in teams:
-        team_data = team_info.get('team', {})
-        if team_data:
-            team, created  = Team.objects.get_or_create(
-                api_id=team_data['id'],
-                defaults={'name': team_data['name']}
-            )
-            team.season.add(season)  
-            if created:
-                count += 1
-    
+    for key, teams in FetchExecutor().map(fetch_teams_from_api, seasons_by_key.keys()):
+        if teams:
+            count += save_teams(seasons_by_key[key], teams, bulk=bulk)
+
     return count
 
-def fetch_and_save_fixtures_from_api(league_id, season_year, start_date, end_date, split_date):
+def fetch_fixtures_from_api(league_id, season_year, start_date, end_date):
     """
-    Fetches fixtures for a given league and season from API-Football from a given date range and saves them to the database.
-    Fixtures are stored with unique api_id and linked to seasons via ForeignKey.
-    
+    Fetches fixtures for a given league and season from API-Football from a given date range.
+
     Args:
         league_id (int): The ID of the league (e.g., 106 for Ekstraklasa).
         season_year (int): The starting year of the season (e.g., 2023 for 2023-2024).
         start_date (str): The start date in "YYYY-MM-DD" format.
         end_date (str): The end date in "YYYY-MM-DD" format.
-        split_date (str): The date simulating today in "YYYY-MM-DD" format - only in demo version without payment plan.
-        
+
     Returns:
-        int: The number of fixtures added to the database.
+        list: Items of the API-Football /fixtures 'response' list.
+        None for seasons outside of the demo version.
+
+    Raises:
+        ApiFootballError: If the request fails after retries.
     """
     if season_year not in [2021, 2022, 2023]:
 
-        return 0    #in main app it will be deleted
+        return None    #in main app it will be deleted
     
-    headers = {'x-apisports-key': API_KEY}
     params = {'league': league_id, 'season': season_year, 'from': start_date, 'to': end_date}
-    response = requests.get(f"{API_URL}/fixtures", headers=headers, params=params)
-    
-    if response.status_code != 200:
-        return 0
-    
-    fixtures = response.json().get('response', [])
+    return get_json('/fixtures', params).get('response', [])
 
-    try:
-        season = Season.objects.get(league__api_id=league_id, start_year=season_year)
-    except Season.DoesNotExist:
-        return 0
+def save_fixtures(season, fixtures, split_date, bulk=False):
+    """
+    Saves fixtures from an API-Football /fixtures response to the database.
+
+    Args:
+        season (Season): The season the fixtures belong to.
+        fixtures (list): Items of the API-Football /fixtures 'response' list.
+        split_date (str): The date simulating today in "YYYY-MM-DD" format - only in demo version without payment plan.
+        bulk (bool): Upserts the whole response with a constant number of queries (see predictions.ingestion).
+
+    Returns:
+        int: The number of fixtures added to the database.
+        dict: Numbers of 'inserted', 'updated', 'unchanged' and 'skipped' fixtures when bulk is True.
+    """
+
+    if bulk:
+        return bulk_upsert_fixtures(season, fixtures, split_date)
     
     count = 0
 
     for fixture_info in fixtures:
-        fixture_data = fixture_info.get('fixture', {})
-        teams_data = fixture_info.get('teams', {})
-        goals_data = fixture_info.get('goals', {})
-        league_data = fixture_info.get('league', {})
-        
-        home_team_data = teams_data.get('home', {})
-        away_team_data = teams_data.get('away', {})
+        data = parse_fixture(fixture_info, split_date)
+        if data is None:
+            continue
+
         try:        
-            home_team = Team.objects.get(api_id=home_team_data.get('id'))
+            home_team = Team.objects.get(api_id=data['home_team_api_id'])
         except Team.DoesNotExist:
             continue
         try:
-            away_team = Team.objects.get(api_id=away_team_data.get('id'))
+            away_team = Team.objects.get(api_id=data['away_team_api_id'])
         except Team.DoesNotExist:
             continue
-        
-        # status = fixture_data['status']['short'] it will be used in main app with payment plan
-
-        if fixture_data.get('date'):  
-            if fixture_data.get('date')[:10] > split_date: # in demo version without payment plan
-                status = 'NS'
-                home_score = None
-                away_score = None
-            else:
-                status = 'FT'
-                home_score = goals_data.get('home')
-                away_score = goals_data.get('away')
-        else:
-            continue
-        
-        if league_data.get('round'):
-            try:
-                round=int(league_data.get('round').split('-')[-1].strip())
-            except ValueError:
-                round=None
-        else:
-            round=None
             
         Fixture.objects.get_or_create(
-            api_id=fixture_data.get('id'),
+            api_id=data['api_id'],
             defaults={
                 'season': season,
-                'date': fixture_data.get('date'),
+                'date': data['date'],
                 'home_team': home_team,
                 'away_team': away_team,
-                'home_score': home_score,
-                'away_score': away_score,
-                'status': status,
-                'round': round,
-                'round_name': league_data.get('round'),
+                'home_score': data['home_score'],
+                'away_score': data['away_score'],
+                'status': data['status'],
+                'round': data['round'],
+                'round_name': data['round_name'],
+                'payload_hash': data['payload_hash'],
                 
             }
         )
         count += 1
-    return count
\ No newline at end of file
+    return count
+
+def fetch_and_save_fixtures_from_api(league_id, season_year, start_date, end_date, split_date, bulk=False):
+    """
+    Fetches fixtures for a given league and season from API-Football from a given date range and saves them to the database.
+    Fixtures are stored with unique api_id and linked to seasons via ForeignKey.
+    
+    Args:
+        league_id (int): The ID of the league (e.g., 106 for Ekstraklasa).
+        season_year (int): The starting year of the season (e.g., 2023 for 2023-2024).
+        start_date (str): The start date in "YYYY-MM-DD" format.
+        end_date (str): The end date in "YYYY-MM-DD" format.
+        split_date (str): The date simulating today in "YYYY-MM-DD" format - only in demo version without payment plan.
+        bulk (bool): Upserts the whole response with a constant number of queries (see predictions.ingestion).
+        
+    Returns:
+        int: The number of fixtures added to the database.
+        dict: Numbers of 'inserted', 'updated', 'unchanged' and 'skipped' fixtures when bulk is True.
+    """
+
+    fixtures = fetch_fixtures_from_api(league_id, season_year, start_date, end_date)
+    if fixtures is None:
+        return 0
+
+    try:
+        season = Season.objects.get(league__api_id=league_id, start_year=season_year)
+    except Season.DoesNotExist:
+        return 0
+
+    return save_fixtures(season, fixtures, split_date, bulk=bulk)
+
+def fetch_and_save_fixtures_for_seasons(seasons, start_date, end_date, split_date, bulk=True):
+    """
+    Fetches fixtures of many seasons concurrently and saves them from the calling thread.
+
+    Args:
+        seasons (iterable): Season instances (with league selected).
+        start_date (str): The start date in "YYYY-MM-DD" format.
+        end_date (str): The end date in "YYYY-MM-DD" format.
+        split_date (str): The date simulating today in "YYYY-MM-DD" format - only in demo version without payment plan.
+        bulk (bool): Upserts every response with a constant number of queries.
+
+    Returns:
+        dict: Results of save_fixtures keyed by (league api_id, season year).
+    """
+
+    seasons_by_key = {(season.league.api_id, season.start_year): season for season in seasons}
+    jobs = [(league_id, season_year, start_date, end_date) for league_id, season_year in seasons_by_key]
+    results = {}
+
+    for (league_id, season_year, _, _), fixtures in FetchExecutor().map(fetch_fixtures_from_api, jobs):
+        if fixtures:
+            season = seasons_by_key[(league_id, season_year)]
+            results[(league_id, season_year)] = save_fixtures(season, fixtures, split_date, bulk=bulk)
+
+    return results
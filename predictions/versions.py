@@ -0,0 +1,156 @@
+"""
+Versions of cached data, maintained on write.
+
+A version is a random token stored in the default cache. Writers replace the
+token, so everything cached under the old one (e.g. rendered fixture cards, see
+predictions.fragments) is simply never read again, and ETags built from tokens
+(see predictions.conditional) stop matching. Tokens missing from a cold or
+evicted cache are created on read, which can only cause cache misses.
+
+Versions:
+    fixture_key: one fixture (fixture cards).
+    round_key / season_key: the fixtures of a (season, round) / of a season.
+    predictions_key: the predictions of a user in a group.
+    standings_key / STANDINGS_KEY: the standings of a group / of all groups.
+    REFERENCE_KEY: leagues, seasons and teams.
+
+ORM saves and deletes bump versions from the signal receivers below; bulk
+writes that bypass signals (ingestion upserts, live score updates) call the
+bump functions themselves. Bumps are deferred until the transaction commits,
+so a concurrent reader never caches uncommitted data under the new token.
+
+Ingestion, the live score poller and the workers run in other processes than
+the web server, so the cache backend must be shared (Redis or the database
+cache, see CACHES in settings). With a process-local cache (LocMemCache) their
+bumps never reach the web server: the users of the versions check
+process_local_cache() and don't cache across requests then.
+
+Example:
+    >>> from predictions.versions import fixture_key, REFERENCE_KEY, current_versions
+    >>> current_versions([fixture_key(7), REFERENCE_KEY])
+    {'version:fixture:7': '3f9c1a2b04de', 'version:reference': '81b2c0e9aa17'}
+"""
+
+import secrets
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from predictions.models import Fixture, League, Prediction, Season, Team
+
+
+REFERENCE_KEY = 'version:reference'  # leagues, seasons and teams
+STANDINGS_KEY = 'version:standings'  # bumped by rebuilds of all groups
+
+
+def process_local_cache():
+    """Tells whether the default cache lives in this process, out of reach of bumps made by other processes."""
+    return isinstance(caches['default'], LocMemCache)
+
+
+def fixture_key(fixture_id):
+    return f'version:fixture:{fixture_id}'
+
+
+def round_key(season_id, round_number):
+    return f'version:round:{season_id}:{round_number}'
+
+
+def season_key(season_id):
+    return f'version:season:{season_id}'
+
+
+def predictions_key(user_id, user_group_id):
+    return f'version:predictions:{user_group_id}:{user_id}'
+
+
+def standings_key(user_group_id):
+    return f'version:standings:{user_group_id}'
+
+
+def new_token():
+    return secrets.token_hex(6)
+
+
+def current_versions(keys):
+    """
+    Returns the current token of every version key.
+
+    Args:
+        keys (iterable): Version keys (e.g. fixture_key(7), REFERENCE_KEY).
+
+    Returns:
+        dict: Tokens by key; missing tokens are created.
+    """
+    keys = list(keys)
+    versions = cache.get_many(keys)
+    missing = {key: new_token() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return versions
+
+
+def bump(keys):
+    """Replaces the tokens of the version keys once the current transaction commits."""
+    keys = list(keys)
+    if keys:
+        transaction.on_commit(lambda: cache.set_many(dict.fromkeys(keys, new_token()), timeout=None))
+
+
+def bump_fixtures(fixture_ids):
+    bump(fixture_key(fixture_id) for fixture_id in fixture_ids)
+
+
+def bump_rounds(rounds):
+    """Bumps the versions of (season id, round) pairs and of their seasons."""
+    rounds = set(rounds)
+    bump(
+        [round_key(season_id, round_number) for season_id, round_number in rounds]
+        + [season_key(season_id) for season_id in {season_id for season_id, _ in rounds}]
+    )
+
+
+def bump_predictions(user_group_users):
+    """Bumps the prediction versions of (user id, user group id) pairs."""
+    bump({predictions_key(user_id, user_group_id) for user_id, user_group_id in user_group_users})
+
+
+def bump_standings(user_group_ids=None):
+    """Bumps the standings versions of the groups (of all groups for None)."""
+    bump([STANDINGS_KEY] if user_group_ids is None else [standings_key(pk) for pk in user_group_ids])
+
+
+def bump_reference():
+    bump([REFERENCE_KEY])
+
+
+@receiver(pre_save, sender=Fixture)
+def remember_fixture_round(sender, instance, raw=False, **kwargs):
+    """Keeps the stored (season, round) of an updated fixture, whose old round changes too."""
+    if instance.pk is not None and not instance._state.adding and not raw:
+        instance._stored_round = Fixture.objects.filter(pk=instance.pk).values_list('season_id', 'round').first()
+
+
+@receiver([post_save, post_delete], sender=Fixture)
+def bump_fixture_on_write(sender, instance, **kwargs):
+    bump_fixtures([instance.pk])
+    rounds = [(instance.season_id, instance.round)]
+    if getattr(instance, '_stored_round', None):
+        rounds.append(instance._stored_round)
+    bump_rounds(rounds)
+
+
+@receiver([post_save, post_delete], sender=Prediction)
+def bump_predictions_on_write(sender, instance, **kwargs):
+    bump_predictions([(instance.user_id, instance.user_group_id)])
+
+
+@receiver([post_save, post_delete], sender=League)
+@receiver([post_save, post_delete], sender=Season)
+@receiver([post_save, post_delete], sender=Team)
+def bump_reference_on_write(sender, instance, **kwargs):
+    bump_reference()
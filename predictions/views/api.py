@@ -2,23 +2,40 @@ from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from urllib3 import request
-from ..models import League, Season, Fixture, Prediction, UserGroup, User
+from ..models import League, Season, Fixture, Prediction, UserGroup, User, Job, GroupStanding
 from ..serializers import LeagueSerializer, SeasonSerializer, FixtureSerializer, UserGroupSerializer
 from ..serializers import PredictionSerializer, PredictionCreateSerializer, PredictionUpdateSerializer, PredictionUpsertSerializer
-from ..serializers import CalculatePointsSerializer, UserRankingSerializer
-from ..serializers import LoginSerializer, UserSerializer
-from rest_framework.permissions import IsAuthenticated
+from ..serializers import PredictionBatchSerializer
+from ..serializers import CalculatePointsSerializer, UserRankingSerializer, RoundStandingSerializer
+from ..serializers import LoginSerializer, UserSerializer, JobSerializer
+from ..jobs import enqueue
+from ..snapshots import group_history
+from ..fast_serializers import fixture_values, prediction_values, serialize_fixtures, serialize_leagues, serialize_predictions
+from ..pagination import PredictionPagination, FixturePagination, RankingPagination
+from ..groups import resolve_group
+from ..fragments import hit_stats
+from ..conditional import ConditionalGetMixin
+from ..versions import REFERENCE_KEY, STANDINGS_KEY, predictions_key, round_key, season_key, standings_key
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.exceptions import ValidationError
 from django.db import models
 from django.contrib.auth import authenticate, login
 from django.utils.http import url_has_allowed_host_and_scheme
 from django_htmx.http import HttpResponseClientRedirect
 from django.http import HttpResponse
+from django.urls import reverse
 
-class LeagueListView(generics.ListAPIView):
+class LeagueListView(ConditionalGetMixin, generics.ListAPIView):
     queryset = League.objects.all()
     serializer_class = LeagueSerializer
 
+    def get_version_keys(self, request):
+        return [REFERENCE_KEY]
+
+    def list(self, request, *args, **kwargs):
+        # served from the in-process reference data, renders the same JSON as LeagueSerializer
+        return Response(serialize_leagues(self.get_serializer_context()))
+
 class LeagueDetailView(generics.RetrieveAPIView):
     queryset = League.objects.all()
     serializer_class = LeagueSerializer
@@ -27,36 +44,62 @@ class SeasonDetailView(generics.RetrieveAPIView):
     queryset = Season.objects.all()
     serializer_class = SeasonSerializer
 
-class FixtureListView(generics.ListAPIView):
+class FixtureListView(ConditionalGetMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = FixtureSerializer
+    pagination_class = FixturePagination
+
+    def get_version_keys(self, request):
+        user_group = resolve_group(request)
+        if not (user_group and user_group.season_id):
+            return None
+        round_param = request.query_params.get('round')
+        if round_param and round_param.isdigit():
+            fixtures_key = round_key(user_group.season_id, int(round_param))
+        else:
+            fixtures_key = season_key(user_group.season_id)
+        return [fixtures_key, REFERENCE_KEY, predictions_key(request.user.pk, user_group.pk)]
     
     def get_queryset(self):
-        access_code = self.request.query_params.get('access_code')
         round_param = self.request.query_params.get('round')
 
-        if access_code:
-            user_group = UserGroup.objects.filter(
-                access_code=access_code, members=self.request.user).first()
-            if user_group and user_group.season:
-                base = Fixture.objects.filter(season=user_group.season, status='NS')
-                if round_param and round_param.isdigit():
-                    round_num = int(round_param)
-                    base = base.filter(round=round_num)
-                return base
+        user_group = resolve_group(self.request)
+        if user_group and user_group.season:
+            base = (
+                Fixture.objects
+                .filter(season=user_group.season, status='NS')
+                .select_related('season')
+            )
+            if round_param and round_param.isdigit():
+                round_num = int(round_param)
+                base = base.filter(round=round_num)
+            return base
+
+    def list(self, request, *args, **kwargs):
+        # read-only fast path, renders the same JSON as FixtureSerializer
+        page = self.paginate_queryset(fixture_values(self.get_queryset()))
+        return self.get_paginated_response(serialize_fixtures(page, self.get_serializer_context()))
 
 class FixtureDetailView(generics.RetrieveAPIView):
-    queryset = Fixture.objects.all()
+    queryset = Fixture.objects.select_related('season')
     serializer_class = FixtureSerializer
 
 class PredictionListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = PredictionSerializer
+    pagination_class = PredictionPagination
     
     def get_queryset(self):
         return Prediction.objects.filter(user=self.request.user)
+
+    def list(self, request, *args, **kwargs):
+        # read-only fast path, renders the same JSON as PredictionSerializer
+        page = self.paginate_queryset(prediction_values(self.get_queryset()))
+        return self.get_paginated_response(serialize_predictions(page, self.get_serializer_context()))
+
 class PredictionCreateView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = PredictionPagination
 
 
     def get_serializer_class(self):
@@ -65,20 +108,32 @@ class PredictionCreateView(generics.ListCreateAPIView):
         return PredictionSerializer
     
     def get_queryset(self):
-        access_code = self.request.query_params.get('access_code')
-        if access_code:
-            user_group = UserGroup.objects.filter(
-                access_code=access_code, members=self.request.user).first()
-            if user_group and user_group.season:
-                return Prediction.objects.filter(
-                    user=self.request.user,
-                    user_group=user_group
-                ).select_related('fixture', 'fixture__season', 'fixture__season__league','user_group')
+        user_group = resolve_group(self.request)
+        if user_group and user_group.season:
+            return Prediction.objects.filter(
+                user=self.request.user,
+                user_group=user_group
+            ).select_related('fixture', 'fixture__season', 'user_group')
         
-        return Prediction.objects.filter(user=self.request.user).select_related('fixture', 'fixture__season', 'fixture__season__league')
+        return Prediction.objects.filter(user=self.request.user).select_related('fixture', 'fixture__season')
     
     def perform_create(self, serializer):
         serializer.save()
+class PredictionBatchView(APIView):
+    """Creates or updates the user's predictions for all fixtures of a matchday in one request."""
+    permission_classes = [IsAuthenticated]
+    serializer_class = PredictionBatchSerializer
+
+    def post(self, request):
+        serializer = self.serializer_class(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+        return Response({
+            'saved': sum(1 for result in results if result['result'] != 'rejected'),
+            'rejected': sum(1 for result in results if result['result'] == 'rejected'),
+            'results': results,
+        })
+
 class PredictionUpdateView(generics.UpdateAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = PredictionUpdateSerializer
@@ -114,32 +169,61 @@ class CalculatePointsView(APIView):
     serializer_class = CalculatePointsSerializer
 
     def post(self, request):
-        predictions = Prediction.objects.filter(points_awarded__isnull=True, fixture__status='FT')
-        predictions_list = []
-        for prediction in predictions:
-            fixture = prediction.fixture
-            prediction.calculate_points()
-            predictions_list.append(prediction)
-        Prediction.objects.bulk_update(predictions_list, ['points_awarded'])
-
-        return Response(status=204)
+        job = enqueue('score', user=request.user, unique=True)
+        return Response(
+            JobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': reverse('job-detail', args=[job.id])},
+        )
+
+class JobStatusView(generics.RetrieveAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = JobSerializer
+
+    def get_queryset(self):
+        if self.request.user.is_staff:
+            return Job.objects.all()
+        return Job.objects.filter(created_by=self.request.user)
     
-class UserRankingView(generics.ListAPIView):
+class CacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({'fixture_cards': hit_stats()})
+
+class UserRankingView(ConditionalGetMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = UserRankingSerializer
+    pagination_class = RankingPagination  # orders by points with tie-breakers
+
+    def get_version_keys(self, request):
+        user_group = resolve_group(request)  # without a valid group get_queryset raises the error
+        if user_group is None:
+            return None
+        return [standings_key(user_group.pk), STANDINGS_KEY]
 
     def get_queryset(self):
-        access_code = self.request.query_params.get('access_code')
-        if not access_code:
+        if not self.request.query_params.get('access_code'):
             raise ValidationError("Access code is required to view rankings.")
         
-        user_group = UserGroup.objects.filter(
-            access_code=access_code, members=self.request.user).first()
+        user_group = resolve_group(self.request)
         if not user_group:
             raise ValidationError("Invalid access code or you are not a member of this group.")
-        users = User.objects.filter(user_groups__id=user_group.id).annotate(total_points=models.Sum('predictions__points_awarded')).order_by('-total_points')
-        return users
+        return GroupStanding.objects.filter(user_group=user_group).select_related('user')
         
+class UserRankingHistoryView(generics.ListAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = RoundStandingSerializer
+
+    def get_queryset(self):
+        if not self.request.query_params.get('access_code'):
+            raise ValidationError("Access code is required to view rankings.")
+
+        user_group = resolve_group(self.request)
+        if not user_group:
+            raise ValidationError("Invalid access code or you are not a member of this group.")
+        return group_history(user_group)
+
 def upsert_prediction(request):
     """
     Backendowa funkcja odpowiedzialna za upsert predykcji.
@@ -10,8 +10,15 @@ from django.contrib.auth.decorators import login_required
 from django.http import QueryDict, HttpResponse
 from django_htmx.http import HttpResponseClientRefresh
 from ..models import Fixture, Prediction, UserGroup
-from predictions.serializers import FixtureSerializer, PredictionCreateSerializer, PredictionUpsertSerializer
+from predictions.serializers import (
+    FixtureSerializer, PredictionBatchSerializer, PredictionCreateSerializer, PredictionUpsertSerializer,
+)
 from predictions.views.api import FixtureListView, PredictionCreateView, upsert_prediction
+from predictions.pagination import FixturePagination
+from predictions.fast_serializers import fixture_values, serialize_fixtures
+from predictions.fragments import render_cards
+from rest_framework.exceptions import ValidationError
+from predictions.groups import resolve_group
 
 from rest_framework.test import APIRequestFactory
 
@@ -32,33 +39,29 @@ def fixtures_partial(request):
 
     drf_view.request = drf_request
     access_code = request.GET.get('access_code')
-    user_group = UserGroup.objects.filter(
-        access_code=access_code, 
-        members=request.user
-    ).first()
+    user_group = resolve_group(request)  # shared with FixtureListView and the serializer
     
-    fixtures = drf_view.get_queryset()
-    if fixtures is None:
-        fixtures = Fixture.objects.none()
+    fixtures = fixture_values(drf_view.get_queryset())
 
-    params = request.GET.copy()  # Django GET (mutable!)
-    params['round'] = ''
-    
-    all_request = Request(request, parsers=drf_request.parsers)
-    all_request.user = request.user
-    all_request.GET = params
-    
-    drf_view_all = FixtureListView()
-    drf_view_all.request = all_request
-    all_fixtures = drf_view_all.get_queryset()
-    rounds = all_fixtures.values('round').distinct().order_by('round') if all_fixtures else []
+    rounds = []
+    if user_group and user_group.season:
+        rounds = (
+            Fixture.objects
+            .filter(season=user_group.season, status='NS')
+            .values('round').distinct().order_by('round')
+        )
 
-    serializer = FixtureSerializer(fixtures, many=True, context={'request': drf_request, 'user_group': user_group})
+    paginator = FixturePagination()
+    page = paginator.paginate_queryset(fixtures, drf_request)
+
+    fixtures = serialize_fixtures(page, {'request': drf_request, 'user_group': user_group})
 
     context = {
-        'fixtures': serializer.data,
+        'cards': render_cards(fixtures, user_group),
+        'next_page_url': paginator.get_next_link(),
+        'first_page': not request.GET.get(paginator.cursor_query_param),
         'user_group': user_group,
-        'rounds': rounds,  # Z FixtureListView!
+        'rounds': rounds,
         'selected_round': request.GET.get('round', ''),
         'access_code': access_code
     }
@@ -81,18 +84,59 @@ def prediction_create_partial(request):
         access_code = request.GET.get('access_code') or request.POST.get('access_code')
         
         context = {
-            'fixtures': [prediction.fixture],
+            'fixture': prediction.fixture,
             'user_group': prediction.user_group,
             'current_prediction': prediction,
             'just_saved': True,
             'was_created': created
         }
-        html = render_to_string('partials/fixtures_results_only.html', context, request=request)
+        html = render_to_string('partials/fixture_card.html', context, request=request)
         return HttpResponse(html)
     else:
         html = "<div style='color: red; font-weight: bold; padding: 10px;'>✗ Błąd zapisu.</div>"
         return HttpResponse(html, content_type="text/html")
     
+@login_required
+def predictions_batch_partial(request):
+    """HTMX view saving the predictions of all fixture cards on the page ("save all")."""
+
+    if request.method != 'POST':
+        return HttpResponse("Metoda nieobsługiwana", status=405)
+
+    # every card form posts fixture, user_group and both scores, so the lists are parallel;
+    # validation is left to the serializer of api/predictions/batch/
+    predictions = [
+        {'fixture': fixture_id, 'predicted_home_score': home, 'predicted_away_score': away}
+        for fixture_id, home, away in zip(
+            request.POST.getlist('fixture'),
+            request.POST.getlist('predicted_home_score'),
+            request.POST.getlist('predicted_away_score'),
+        )
+        if home or away  # cards left empty aren't submitted
+    ]
+    if not predictions:
+        return HttpResponse("<div style='color: red; font-weight: bold; padding: 10px;'>✗ Brak typów do zapisania.</div>")
+
+    serializer = PredictionBatchSerializer(
+        data={
+            'user_group': request.POST.get('user_group'),
+            'round': request.POST.get('round') or None,
+            'predictions': predictions,
+        },
+        context={'request': request},
+    )
+    if not serializer.is_valid():
+        return HttpResponse("<div style='color: red; font-weight: bold; padding: 10px;'>✗ Błędne typy.</div>")
+    try:
+        results = serializer.save()
+    except ValidationError:
+        return HttpResponse("<div style='color: red; font-weight: bold; padding: 10px;'>✗ Błąd zapisu.</div>")
+
+    return render(request, 'partials/batch_results.html', {
+        'saved': [result for result in results if result['result'] != 'rejected'],
+        'rejected': [result for result in results if result['result'] == 'rejected'],
+    })
+
 @login_required
 def matchdays_partial(request):
     """HTMX view returning matchdays for a given season and league."""
@@ -107,7 +151,7 @@ def matchdays_partial(request):
     if fixtures is None:
         return HttpResponse("")  # PUSTY!
     
-    serializer = FixtureSerializer(fixtures, many=True, context={'request': drf_request})
+    fixtures = serialize_fixtures(fixture_values(fixtures), {'request': drf_request})
 
-    return render(request, 'partials/fixtures_list.html', {'fixtures': serializer.data})
+    return render(request, 'partials/fixtures_list.html', {'fixtures': fixtures})
 